@@ -0,0 +1,75 @@
+"""Compare two benchmark result files written by run_benchmarks.py.
+
+For each topology, size, and phase which occurs in both files, the time and peak memory of the
+second (new) result are reported relative to the first (baseline) result. Changes larger than the
+threshold are marked as regressions or improvements.
+
+Usage: python benchmarks/compare_benchmarks.py baseline.json new.json [--threshold 0.1]
+
+The exit status is 1 if there is at least one regression, 0 otherwise.
+"""
+
+import argparse
+import json
+import sys
+
+METRICS = [('seconds', 'time', '.4f'), ('peak_bytes', 'memory', ',.0f')]
+
+def parse_command_line_arguments(command_line_arguments):
+    """Parse command line arguments.
+
+    Returns: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description='Compare benchmark results')
+    parser.add_argument("baseline", help="Baseline benchmark results (JSON)")
+    parser.add_argument("new", help="New benchmark results (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative change which counts as a regression or improvement "
+                             "(default: 0.1)")
+    return parser.parse_args(command_line_arguments)
+
+def main(command_line_arguments):
+    """Main entry point."""
+    # pylint:disable=too-many-locals
+    arguments = parse_command_line_arguments(command_line_arguments)
+    baseline = read_results(arguments.baseline)
+    new = read_results(arguments.new)
+    nr_regressions = 0
+    for key, new_result in new.items():
+        baseline_result = baseline.get(key)
+        if baseline_result is None:
+            continue
+        for metric, metric_name, value_format in METRICS:
+            if metric not in new_result or metric not in baseline_result:
+                continue
+            old_value = baseline_result[metric]
+            new_value = new_result[metric]
+            ratio = new_value / old_value if old_value > 0 else 1.0
+            if ratio > 1.0 + arguments.threshold:
+                verdict = "REGRESSION"
+                nr_regressions += 1
+            elif ratio < 1.0 - arguments.threshold:
+                verdict = "improvement"
+            else:
+                verdict = ""
+            topology, nr_routers, phase = key
+            print(f"{topology:>16} {nr_routers:>8} {phase:>16} {metric_name:>6}: "
+                  f"{old_value:>14{value_format}} -> {new_value:>14{value_format}} "
+                  f"({ratio:6.2f}x) {verdict}")
+    return 1 if nr_regressions else 0
+
+def read_results(filename):
+    """Read a benchmark result file.
+
+    Args:
+        filename (str): Filename of the benchmark result file.
+    Returns:
+        A dictionary of results indexed by (topology, nr_routers, phase).
+    """
+    with open(filename, 'r') as file:
+        report = json.load(file)
+    return {(result['topology'], result['nr_routers'], result['phase']): result
+            for result in report['results']}
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""Memory benchmark for the network and demand model objects.
+
+Reports the number of bytes used per Router, Link, and Path object (including the per-object
+storage of the network and the demand that contain them).
+
+Usage: python benchmarks/memory_model.py [nr-routers]
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "qpce"))
+
+# pylint:disable=wrong-import-position
+from demand import Demand
+from link import Link
+from network import Network
+from path import Path
+from router import Router
+
+LINKS_PER_ROUTER = 3
+PATHS_PER_ROUTER = 2
+
+def measure(function):
+    """Measure the memory allocated by a function, and still in use after it returns.
+
+    Args:
+        function: The function, which must return the objects it created.
+    Returns:
+        A (result, bytes) tuple.
+    """
+    tracemalloc.start()
+    before, _peak = tracemalloc.get_traced_memory()
+    result = function()
+    after, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (result, after - before)
+
+def main():
+    """Main entry point."""
+    nr_routers = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    generator = random.Random(1)
+    names = [f"router-{number}" for number in range(nr_routers)]
+    network = Network()
+    routers, router_bytes = measure(lambda: [Router(network, name) for name in names])
+    endpoints = [(generator.choice(routers), generator.choice(routers))
+                 for _ in range(LINKS_PER_ROUTER * nr_routers)]
+    _links, link_bytes = measure(lambda: [Link(router_1, router_2, 100)
+                                          for router_1, router_2 in endpoints])
+    demand = Demand(network)
+    path_specs = [(f"path-{number}", generator.choice(routers), generator.choice(routers))
+                  for number in range(PATHS_PER_ROUTER * nr_routers)]
+    _paths, path_bytes = measure(lambda: [Path(demand, name, end_point_1, end_point_2, 10, 0.9)
+                                          for name, end_point_1, end_point_2 in path_specs])
+    print(f"routers: {nr_routers}, links: {len(endpoints)}, paths: {len(path_specs)}")
+    print(f"bytes per router: {router_bytes / nr_routers:.1f}")
+    print(f"bytes per link:   {link_bytes / len(endpoints):.1f}")
+    print(f"bytes per path:   {path_bytes / len(path_specs):.1f}")
+
+if __name__ == "__main__":
+    main()
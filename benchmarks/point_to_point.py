@@ -0,0 +1,128 @@
+"""Benchmark for point-to-point shortest path queries: unidirectional, bidirectional, and A* search.
+
+For each topology kind, a synthetic network is generated and the shortest path between random pairs
+of routers is computed using unidirectional Dijkstra (stopping when the target is settled), using
+bidirectional Dijkstra, and (for topologies with router coordinates) using A* search guided by the
+router coordinates. The average number of settled routers and the average query time are reported
+for each search.
+
+Usage: python benchmarks/point_to_point.py [--kinds grid,ring] [--size 100000] [--queries 100]
+"""
+
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "qpce"))
+
+# pylint:disable=wrong-import-position
+import instrumentation
+import topology_generator
+from shortest_path import astar_shortest_path, bidirectional_shortest_path
+
+def unidirectional_shortest_path(index, source_id, target_id):
+    """Compute the shortest path between two routers using Dijkstra's algorithm, stopping as soon
+    as the target router is settled. This is the baseline against which the searches in module
+    shortest_path are compared.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+    Returns:
+        A (length, router_ids, link_ids) tuple, where router_ids is the list of router ids from the
+        source to the target (inclusive) and link_ids is the list of link ids traversed, or None if
+        the target is not reachable.
+    """
+    # pylint:disable=too-many-locals
+    offsets = index.offsets
+    neighbors = index.neighbors
+    link_ids = index.link_ids
+    lengths = index.lengths
+    distances = {source_id: 0}
+    parents = {source_id: None}
+    settled = set()
+    heap = [(0, source_id)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    nr_heap_pushes = 1
+    while heap:
+        distance, router_id = heappop(heap)
+        if router_id in settled:
+            continue
+        settled.add(router_id)
+        if router_id == target_id:
+            break
+        for position in range(offsets[router_id], offsets[router_id + 1]):
+            neighbor = neighbors[position]
+            new_distance = distance + lengths[position]
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                parents[neighbor] = (router_id, link_ids[position])
+                heappush(heap, (new_distance, neighbor))
+                nr_heap_pushes += 1
+    instrumentation.count('settled-routers', len(settled))
+    instrumentation.count('heap-pushes', nr_heap_pushes)
+    if target_id not in settled:
+        return None
+    router_ids = [target_id]
+    path_link_ids = []
+    router_id = target_id
+    while parents[router_id] is not None:
+        router_id, link_id = parents[router_id]
+        router_ids.append(router_id)
+        path_link_ids.append(link_id)
+    router_ids.reverse()
+    path_link_ids.reverse()
+    return (distances[target_id], router_ids, path_link_ids)
+
+SEARCHES = [('unidirectional', unidirectional_shortest_path),
+            ('bidirectional', bidirectional_shortest_path),
+            ('astar', astar_shortest_path)]
+
+def parse_command_line_arguments(command_line_arguments):
+    """Parse command line arguments.
+
+    Returns: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description='Point-to-point shortest path benchmark')
+    parser.add_argument("--kinds", default=",".join(topology_generator.TOPOLOGY_KINDS),
+                        help="Comma-separated list of topology kinds (default: all)")
+    parser.add_argument("--size", type=int, default=100000,
+                        help="Number of routers (default: 100000)")
+    parser.add_argument("--queries", type=int, default=100,
+                        help="Number of random router pairs (default: 100)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the topology and the pairs")
+    return parser.parse_args(command_line_arguments)
+
+def main(command_line_arguments):
+    """Main entry point."""
+    arguments = parse_command_line_arguments(command_line_arguments)
+    for kind in arguments.kinds.split(","):
+        topology = topology_generator.generate_topology(kind, arguments.size, arguments.seed)
+        index = topology.network().index()
+        generator = random.Random(arguments.seed)
+        pairs = [(generator.randrange(index.nr_routers), generator.randrange(index.nr_routers))
+                 for _ in range(arguments.queries)]
+        results = {}
+        for name, search in SEARCHES:
+            if search is astar_shortest_path and index.positions is None:
+                continue
+            metrics = instrumentation.start_metrics()
+            start_time = time.perf_counter()
+            lengths = [search(index, source_id, target_id) for source_id, target_id in pairs]
+            seconds = time.perf_counter() - start_time
+            instrumentation.stop_metrics()
+            results[name] = [None if length is None else length[0] for length in lengths]
+            print(f"{kind:>16} {index.nr_routers:>8} routers {name:>14}: "
+                  f"{metrics.counters.get('settled-routers', 0) / len(pairs):12.1f} settled, "
+                  f"{1000.0 * seconds / len(pairs):10.3f} ms per query")
+        for lengths in results.values():
+            assert lengths == results['unidirectional']
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
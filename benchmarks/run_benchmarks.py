@@ -0,0 +1,239 @@
+"""Benchmark suite for loading networks and demands and computing routes.
+
+For each topology kind and size, a synthetic network and demand are generated and written to YAML
+files. Then each phase is timed, and its peak memory use is measured in a separate run:
+
+ * network-parse: parse the network YAML file into Python objects.
+ * network-validate: validate the parsed routers and links.
+ * network-build: create the network from the parsed and validated routers and links.
+ * network-load: read the network YAML file (parse, validate, and build while streaming).
+ * demand-load: read the demand YAML file.
+ * route: compute the routes for all paths in the demand.
+
+The results are written as JSON, so that the results for different commits can be compared using
+compare_benchmarks.py.
+
+Usage: python benchmarks/run_benchmarks.py [--kinds grid,ring] [--sizes 1000,10000] [-o file]
+       python benchmarks/compare_benchmarks.py baseline.json benchmark-results.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:   # pragma: no cover
+    resource = None
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "qpce"))
+
+# pylint:disable=wrong-import-position
+import yaml
+
+import demand_yaml
+import network_yaml
+import topology_generator
+from route_computation import compute_routes
+from yaml_stream import SafeLoader
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_NR_PATHS = 200
+
+# The unit of the maximum resident set size reported by getrusage: kilobytes, except on macOS.
+MAX_RSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+def parse_command_line_arguments(command_line_arguments):
+    """Parse command line arguments.
+
+    Returns: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description='Quantum Path Computation Engine benchmarks')
+    parser.add_argument("--kinds", default=",".join(topology_generator.TOPOLOGY_KINDS),
+                        help="Comma-separated list of topology kinds (default: all)")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated list of numbers of routers (default: "
+                             f"{','.join(str(size) for size in DEFAULT_SIZES)})")
+    parser.add_argument("--paths", type=int, default=DEFAULT_NR_PATHS,
+                        help="Number of paths between random routers in the demand (default: "
+                             f"{DEFAULT_NR_PATHS})")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Number of times each phase is timed; the fastest time is reported "
+                             "(default: 1)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Do not measure the peak memory use of each phase")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the topology generator")
+    parser.add_argument("-o", "--output", default="benchmark-results.json",
+                        help="JSON file to write the results to (default: benchmark-results.json)")
+    return parser.parse_args(command_line_arguments)
+
+def main(command_line_arguments):
+    """Main entry point."""
+    arguments = parse_command_line_arguments(command_line_arguments)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in arguments.kinds.split(","):
+            for size in [int(size) for size in arguments.sizes.split(",")]:
+                results.extend(benchmark_topology(kind, size, arguments, directory))
+    report = {
+        'commit': git_commit(),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(arguments.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    return 0
+
+def benchmark_topology(kind, size, arguments, directory):
+    """Run all phases for one topology kind and size.
+
+    Args:
+        kind (str): The kind of topology.
+        size (int): The number of routers.
+        arguments: The parsed command line arguments.
+        directory (str): Directory for the generated YAML files.
+    Returns:
+        A list of result dictionaries, one per phase.
+    """
+    topology = topology_generator.generate_topology(kind, size, arguments.seed)
+    synthetic_demand = topology_generator.random_demand(topology, arguments.paths, arguments.seed)
+    network_file = os.path.join(directory, f"{kind}-{size}-network.yaml")
+    demand_file = os.path.join(directory, f"{kind}-{size}-demand.yaml")
+    topology.write_yaml_file(network_file)
+    synthetic_demand.write_yaml_file(demand_file)
+    state = {}
+    phases = [
+        ('network-parse', lambda: parse_yaml_file(network_file)),
+        ('network-validate', lambda: validate_network_model(state['network-parse'])),
+        ('network-build',
+         lambda: network_yaml.read_network_from_parsed_yaml(state['network-parse'])),
+        ('network-load', lambda: network_yaml.read_network_from_yaml_file(network_file)),
+        ('demand-load',
+         lambda: demand_yaml.read_demand_from_yaml_file(demand_file, state['network-load'])),
+        ('route', lambda: compute_routes(state['network-load'], state['demand-load'])),
+    ]
+    results = []
+    for phase, function in phases:
+        seconds, state[phase] = time_phase(function, arguments.repeat)
+        result = {
+            'topology': kind,
+            'nr_routers': topology.nr_routers,
+            'nr_links': topology.nr_links,
+            'nr_paths': synthetic_demand.nr_paths,
+            'phase': phase,
+            'seconds': seconds,
+        }
+        if not arguments.no_memory:
+            result['peak_bytes'] = peak_memory(function)
+        print(f"{kind:>16} {topology.nr_routers:>8} routers {phase:>16}: {seconds:10.4f} s",
+              file=sys.stderr)
+        results.append(result)
+    return results
+
+def time_phase(function, repeat):
+    """Time a phase.
+
+    Args:
+        function: The function which runs the phase.
+        repeat (int): The number of times the phase is run.
+    Returns:
+        A (seconds, result) tuple, where seconds is the fastest time and result is the result of
+        the last run.
+    """
+    best_seconds = None
+    result = None
+    for _ in range(max(1, repeat)):
+        start_time = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start_time
+        if best_seconds is None or seconds < best_seconds:
+            best_seconds = seconds
+    return (best_seconds, result)
+
+def peak_memory(function):
+    """Measure the peak memory used while a phase runs.
+
+    Where possible, the phase is run in a forked child process and the growth of the peak resident
+    set size of the child is measured. This includes memory which is not allocated by Python (e.g.
+    NumPy arrays) and does not slow the phase down. Otherwise, the peak memory allocated by Python
+    is measured by tracing the memory allocations of the phase.
+
+    Args:
+        function: The function which runs the phase.
+    Returns:
+        The peak number of bytes used by the phase, in addition to what was used before it started.
+    """
+    if not hasattr(os, 'fork') or resource is None:
+        tracemalloc.start()
+        before, _peak = tracemalloc.get_traced_memory()
+        function()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak - before
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:   # pragma: no cover
+        os.close(read_fd)
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        function()
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        os.write(write_fd, str((peak - before) * MAX_RSS_UNIT).encode('ascii'))
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as pipe:
+        output = pipe.read()
+    os.waitpid(pid, 0)
+    return int(output)
+
+def parse_yaml_file(filename):
+    """Parse a YAML file without validating it.
+
+    Args:
+        filename (str): Filename of the YAML file.
+    Returns:
+        The parsed YAML document.
+    """
+    with open(filename, 'r') as file:
+        return yaml.load(file, Loader=SafeLoader)
+
+def validate_network_model(network_model):
+    """Validate the routers and links in a parsed network YAML document.
+
+    Args:
+        network_model: The parsed network YAML document.
+    Returns:
+        True if all routers and links are valid.
+    """
+    return all(all(network_yaml.SECTION_VALIDATORS[section](model) for model in models)
+               for section, models in network_model.items())
+
+def git_commit():
+    """Get the commit of the source tree which is benchmarked.
+
+    Returns:
+        The commit hash (with a "-dirty" suffix if there are uncommitted changes), or None if it
+        cannot be determined.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directory, check=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                universal_newlines=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                cwd=directory, check=True, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + "-dirty" if status.strip() else commit
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,26 +1,313 @@
-"""Entry point for quantum path computation engine. Parse command line and run path computation."""
+"""Entry point for quantum path computation engine. Parse command line and run path computation.
+
+The command line interface is started many times, often for small networks, so startup time
+matters. Only the modules needed by every run are imported here. The other modules are imported in
+the code path which needs them: e.g. the YAML parser is not imported when a network snapshot is
+read without a demand, and NumPy is only imported for all-pairs shortest paths."""
+
+# pylint:disable=import-outside-toplevel
 
 import argparse
 import sys
+import time
 
-import network_yaml
+import instrumentation
+import network_snapshot
 
 def parse_command_line_arguments(command_line_arguments):
     """Parse command line arguments.
 
     Returns: Parsed arguments.
     """
-    parser = argparse.ArgumentParser(description='Quantum Path Computation Engine')
-    parser.add_argument("network_file", metavar="network-file", help="Network YAML file")
+    parser = argparse.ArgumentParser(description='Quantum Path Computation Engine',
+                                     epilog="Use 'serve network-file' as the arguments to run a "
+                                            "path computation server (see 'serve --help').")
+    parser.add_argument("network_file", metavar="network-file",
+                        help="Network YAML file or network snapshot file")
+    parser.add_argument("demand_file", metavar="demand-file", nargs="?", help="Demand YAML file")
+    parser.add_argument("-r", "--route-file", metavar="route-file",
+                        help="Route YAML file (default: standard output)")
+    parser.add_argument("-f", "--route-format", choices=["yaml", "jsonl"],
+                        help="Format of the routes: YAML or JSON Lines (default: determined by the "
+                             "extension of the route file, YAML for standard output); the route "
+                             "file is compressed if its name ends with .gz")
+    parser.add_argument("-d", "--delta-file", metavar="delta-file", action="append", default=[],
+                        help="Network delta YAML file to apply to the network before computing "
+                             "routes or writing a snapshot (may be repeated; applied in order)")
+    parser.add_argument("--technology-file", metavar="technology-file",
+                        help="Technology YAML file; if given, routes meet the fidelity of their "
+                             "path and links without a capacity get the elementary Bell pair rate "
+                             "of the technology as their capacity")
+    parser.add_argument("-s", "--write-snapshot", metavar="snapshot-file",
+                        help="Write a binary snapshot of the network to a file")
+    parser.add_argument("-c", "--capacity", action="store_true",
+                        help="Place paths without exceeding the capacity of any link")
+    parser.add_argument("-o", "--optimize", action="store_true",
+                        help="Place paths without exceeding the capacity of any link (like "
+                             "--capacity, which it can not be combined with), and then improve the "
+                             "placement by ripping up and re-routing paths until the time budget "
+                             "is exhausted or no further improvement is found; with --timing, the "
+                             "objective of each iteration is reported on standard error")
+    parser.add_argument("--time-budget", metavar="seconds", type=float, default=10.0,
+                        help="Time after which --optimize stops improving the placement "
+                             "(default: 10.0)")
+    parser.add_argument("-a", "--all-pairs", action="store_true",
+                        help="Route paths using all-pairs shortest path matrices, for demands "
+                             "which cover most router pairs")
+    parser.add_argument("--all-pairs-file", metavar="all-pairs-file",
+                        help="Reuse the all-pairs shortest path matrices in a file if they belong "
+                             "to the same network, otherwise compute them and write them to the "
+                             "file (implies --all-pairs)")
+    parser.add_argument("--cache-size", metavar="cache-size", type=int, default=10000,
+                        help="Maximum number of entries in the route cache (default: 10000)")
+    parser.add_argument("-j", "--jobs", metavar="jobs", type=int, default=1,
+                        help="Number of worker processes for route computation (default: 1, "
+                             "not used with --capacity or --optimize)")
+    parser.add_argument("-t", "--timing", action="store_true",
+                        help="Report route computation time and throughput on standard error")
+    parser.add_argument("--metrics-json", metavar="metrics-file",
+                        help="Write the time spent in each phase and counters (e.g. the number of "
+                             "heap pushes) to a JSON file")
+    parser.add_argument("--profile", metavar="profile-file",
+                        help="Run under the cProfile profiler and write the profile statistics "
+                             "to a file (which can be read using the pstats module)")
+    parser.add_argument("-w", "--watch", action="store_true",
+                        help="Keep running, and re-route the paths which are affected whenever "
+                             "the network file or the demand file changes (the routes are written "
+                             "again after every change)")
+    parser.add_argument("--watch-interval", metavar="seconds", type=float, default=1.0,
+                        help="Interval at which the files are checked for changes in watch mode, "
+                             "if inotify is not available (default: 1.0)")
+    parser.add_argument("--debounce", metavar="seconds", type=float, default=0.2,
+                        help="Time for which the files must not change before the routes are "
+                             "updated in watch mode (default: 0.2)")
     parsed_arguments = parser.parse_args(command_line_arguments)
+    if parsed_arguments.optimize and parsed_arguments.capacity:
+        parser.error("--optimize can not be combined with --capacity (it implies it)")
+    if parsed_arguments.watch:
+        if parsed_arguments.demand_file is None:
+            parser.error("--watch requires a demand file")
+        if (parsed_arguments.capacity or parsed_arguments.optimize or
+                parsed_arguments.all_pairs or parsed_arguments.all_pairs_file is not None or
+                parsed_arguments.delta_file):
+            parser.error("--watch can not be combined with --capacity, --optimize, --all-pairs, "
+                         "--all-pairs-file, or --delta-file")
     return parsed_arguments
 
 def main(command_line_arguments):
     """Main entry point."""
     # TODO: Catch exception and report error
+    if command_line_arguments[:1] == ['serve']:
+        import server
+        return server.main(command_line_arguments[1:])
     parsed_arguments = parse_command_line_arguments(command_line_arguments)
-    _network = network_yaml.read_network_from_yaml_file(parsed_arguments.network_file)
+    if parsed_arguments.metrics_json is not None:
+        instrumentation.start_metrics()
+    try:
+        if parsed_arguments.profile is None:
+            status = run(parsed_arguments)
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            try:
+                status = profiler.runcall(run, parsed_arguments)
+            finally:
+                profiler.dump_stats(parsed_arguments.profile)
+    finally:
+        metrics = instrumentation.stop_metrics()
+    if metrics is not None:
+        metrics.write_json_file(parsed_arguments.metrics_json)
+    return status
+
+def run(parsed_arguments):
+    """Read the network and demand, compute the routes, and write the routes.
+
+    Args:
+        parsed_arguments: The parsed command line arguments.
+    Returns:
+        The exit status.
+    """
+    if parsed_arguments.watch:
+        return watch_routes(parsed_arguments)
+    network = network_snapshot.read_network_file(parsed_arguments.network_file)
+    if parsed_arguments.delta_file:
+        import network_delta
+        for delta_file in parsed_arguments.delta_file:
+            network_delta.apply_network_delta_file(network, delta_file)
+    if parsed_arguments.write_snapshot is not None:
+        with instrumentation.span('snapshot-write'):
+            network_snapshot.write_network_snapshot_file(parsed_arguments.write_snapshot, network)
+    if parsed_arguments.demand_file is None:
+        return 0
+    import demand_yaml
+    import route_output
+    demand = demand_yaml.read_demand_from_yaml_file(parsed_arguments.demand_file, network)
+    if parsed_arguments.technology_file is None:
+        technology = None
+    else:
+        import technology_yaml
+        technology = technology_yaml.read_technology_from_yaml_file(
+            parsed_arguments.technology_file)
+    # Each route is written as soon as it has been computed. The time spent computing the routes
+    # is measured separately from the time spent writing them.
+    start_time = time.perf_counter()
+    routes = instrumentation.IterationTimer(compute_routes(network, demand, parsed_arguments,
+                                                                technology))
+    if parsed_arguments.route_file is None:
+        route_format = parsed_arguments.route_format or route_output.YAML
+        nr_routes = route_output.write_routes_to_stream(sys.stdout, routes, route_format)
+    else:
+        nr_routes = route_output.write_routes_to_file(parsed_arguments.route_file, routes,
+                                                      parsed_arguments.route_format)
+    elapsed_time = time.perf_counter() - start_time
+    instrumentation.add_time('route-computation', routes.seconds)
+    instrumentation.add_time('route-output', elapsed_time - routes.seconds)
+    if parsed_arguments.timing:
+        report_timing(nr_routes, routes.seconds)
+    return 0
+
+def watch_routes(parsed_arguments):
+    """Compute the routes, and keep them current while the network and demand files are edited,
+    until interrupted. The routes are written after every update: the route file is replaced
+    atomically, so readers never see a partially written file, and on standard output each version
+    of the routes is a separate YAML document.
+
+    Args:
+        parsed_arguments: The parsed command line arguments.
+    Returns:
+        The exit status.
+    """
+    import os
+    import route_output
+    import watch
+    if parsed_arguments.technology_file is None:
+        technology = None
+    else:
+        import technology_yaml
+        technology = technology_yaml.read_technology_from_yaml_file(
+            parsed_arguments.technology_file)
+    route_file = parsed_arguments.route_file
+    route_format = parsed_arguments.route_format
+    if route_file is None:
+        route_format = route_format or route_output.YAML
+    elif route_format is None:
+        route_format = route_output.route_format_of_filename(route_file)
+    def write_routes(routes):
+        if route_file is None:
+            if route_format == route_output.YAML:
+                sys.stdout.write('---\n')
+            route_output.write_routes_to_stream(sys.stdout, routes, route_format)
+            sys.stdout.flush()
+        else:
+            directory, basename = os.path.split(route_file)
+            partial_file = os.path.join(directory, '.partial-' + basename)
+            route_output.write_routes_to_file(partial_file, routes, route_format)
+            os.replace(partial_file, route_file)
+    try:
+        watch.watch(parsed_arguments.network_file, parsed_arguments.demand_file, write_routes,
+                    technology, poll_interval=parsed_arguments.watch_interval,
+                    debounce_time=parsed_arguments.debounce)
+    except KeyboardInterrupt:
+        pass
     return 0
 
+def compute_routes(network, demand, parsed_arguments, technology=None):
+    """Compute the routes for the paths in a demand, as selected by the command line arguments.
+
+    Args:
+        network (Network): The network on which the paths are routed.
+        demand (Demand): The demand containing the paths to be routed.
+        parsed_arguments: The parsed command line arguments.
+        technology (Technology): The technology of the network, which determines the fidelity of
+            the routes and the capacity of the links without a capacity, or None to ignore
+            fidelity and to not limit the capacity of those links.
+    Returns:
+        A generator of Route objects. Unless the routes are placed with capacity constraints or
+        computed from all-pairs shortest paths, each route is generated as soon as it has been
+        computed (see route_computation.iter_routes).
+    """
+    if parsed_arguments.optimize:
+        import optimization
+        link_rates, link_fidelities = placement_link_values(network, technology)
+        report = report_optimization_iteration if parsed_arguments.timing else None
+        optimized_placement = optimization.optimize_placement(network, demand, link_rates,
+                                                              link_fidelities,
+                                                              parsed_arguments.time_budget,
+                                                              report=report)
+        yield from optimized_placement.routes.values()
+    elif parsed_arguments.capacity:
+        import placement
+        link_rates, link_fidelities = placement_link_values(network, technology)
+        yield from placement.place_demand(network, demand, link_rates,
+                                          link_fidelities).routes.values()
+    elif parsed_arguments.all_pairs or parsed_arguments.all_pairs_file is not None:
+        all_pairs_paths = all_pairs_shortest_paths(network, parsed_arguments.all_pairs_file)
+        yield from all_pairs_paths.compute_routes(demand, technology).values()
+    else:
+        import route_cache
+        import route_computation
+        cache = route_cache.RouteCache(network, parsed_arguments.cache_size)
+        yield from route_computation.iter_routes(network, demand, technology, cache,
+                                                 parsed_arguments.jobs)
+
+def placement_link_values(network, technology):
+    """Get the link values which constrain the placement of paths with capacity constraints.
+
+    Args:
+        network (Network): The network on which the paths are placed.
+        technology (Technology): The technology of the network, or None.
+    Returns:
+        A (link_rates, link_fidelities) tuple of lists indexed by link id, which are both None if
+        no technology is given.
+    """
+    if technology is None:
+        return (None, None)
+    return (technology.link_rates(network), technology.link_fidelities(network))
+
+def all_pairs_shortest_paths(network, filename):
+    """Get the all-pairs shortest paths of a network, reusing the matrices in a file if possible.
+
+    Args:
+        network (Network): The network.
+        filename (str): Filename of the all-pairs shortest paths file, or None to not use a file.
+    Returns:
+        An AllPairsShortestPaths object.
+    """
+    import all_pairs
+    if filename is not None:
+        all_pairs_paths = all_pairs.read_all_pairs_file(filename, network)
+        if all_pairs_paths is not None:
+            return all_pairs_paths
+    all_pairs_paths = all_pairs.AllPairsShortestPaths(network)
+    if filename is not None:
+        all_pairs.write_all_pairs_file(filename, all_pairs_paths)
+    return all_pairs_paths
+
+def report_optimization_iteration(iteration):
+    """Report the objective after an iteration of the placement optimizer on standard error.
+
+    Args:
+        iteration (OptimizationIteration): The result of the iteration.
+    Returns:
+        None
+    """
+    print(iteration.summary(), file=sys.stderr)
+
+def report_timing(nr_paths, elapsed_time):
+    """Report the route computation time and throughput on standard error.
+
+    Args:
+        nr_paths (int): The number of paths for which a route was computed.
+        elapsed_time (float): The route computation time in seconds.
+    Returns:
+        None
+    """
+    if elapsed_time > 0.0:
+        throughput = f"{nr_paths / elapsed_time:.1f} paths/second"
+    else:
+        throughput = "throughput not measurable"
+    print(f"Computed routes for {nr_paths} paths in {elapsed_time:.6f} seconds ({throughput})",
+          file=sys.stderr)
+
 if __name__ == "__main__":   # pragma: no cover
     sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,295 @@
+"""All-pairs shortest paths of a quantum network, for demands which cover most router pairs."""
+
+import collections
+import zipfile
+
+import numpy
+
+from route import Route
+from route_computation import make_route, route_meeting_fidelity
+from shortest_path import ShortestPathTree
+
+FLOYD_WARSHALL = 'floyd-warshall'
+DIJKSTRA = 'dijkstra'
+METHODS = [FLOYD_WARSHALL, DIJKSTRA]
+
+# Floyd-Warshall performs nr_routers^3 vectorized element operations, repeated Dijkstra performs
+# nr_routers * (nr_routers + nr_adjacencies) * log2(nr_routers) interpreted operations. Measured on
+# random networks, an interpreted operation costs roughly as much as this many vectorized element
+# operations.
+DIJKSTRA_COST_FACTOR = 10
+
+# The number of pivot routers per block in the blocked Floyd-Warshall algorithm, and the number of
+# rows which are updated together for each block of pivot routers.
+FLOYD_WARSHALL_BLOCK_SIZE = 64
+FLOYD_WARSHALL_TILE_SIZE = 256
+
+NO_PREDECESSOR = -1
+
+class AllPairsError(Exception):
+    """Exception is thrown when there is a problem writing an all-pairs shortest paths file."""
+
+class AllPairsShortestPaths:
+    """The shortest path distances and predecessors between all pairs of routers in a network.
+
+    The distances and predecessors are stored in two nr_routers x nr_routers NumPy matrices, indexed
+    by router id (see GraphIndex): distances[s, t] is the length of the shortest path from router s
+    to router t (infinity if t is not reachable from s), and predecessors[s, t] is the router before
+    router t on that path (-1 if there is none).
+
+    The matrices are computed once and can then be used to route any number of demands on the same
+    network. They are not updated when the topology of the network changes; check current before
+    using them."""
+
+    def __init__(self, network, method=None, matrices=None):
+        """Compute the all-pairs shortest paths of a network.
+
+        Args:
+            network (Network): The network.
+            method (str): FLOYD_WARSHALL or DIJKSTRA, or None to choose the method which is expected
+                to be the fastest for the network (see choose_all_pairs_method).
+            matrices: A (distances, predecessors) tuple of previously computed matrices for the
+                same network (see read_all_pairs_file), or None to compute the matrices.
+        """
+        index = network.index()
+        if method is None:
+            method = choose_all_pairs_method(index)
+        assert method in METHODS, f"Unknown all-pairs shortest path method {method}"
+        self.network = network
+        self.index = index
+        self.generation = network.generation
+        self.method = method
+        if matrices is not None:
+            self.distances, self.predecessors = matrices
+        elif method == FLOYD_WARSHALL:
+            self.distances, self.predecessors = floyd_warshall(index)
+        else:
+            self.distances, self.predecessors = repeated_dijkstra(index)
+
+    @property
+    def current(self):
+        """True if the topology of the network has not changed since the matrices were computed."""
+        return self.generation == self.network.generation
+
+    def path_ids(self, source_id, target_id):
+        """Get the shortest path between two routers.
+
+        Args:
+            source_id (int): The router id of the source router.
+            target_id (int): The router id of the target router.
+        Returns:
+            A (router_ids, link_ids) tuple, where router_ids is the list of router ids from the
+            source to the target (inclusive) and link_ids is the list of link ids traversed, or None
+            if the target is not reachable.
+        """
+        if numpy.isinf(self.distances[source_id, target_id]):
+            return None
+        predecessors = self.predecessors[source_id]
+        router_ids = [target_id]
+        link_ids = []
+        router_id = target_id
+        while router_id != source_id:
+            predecessor = int(predecessors[router_id])
+            link_ids.append(shortest_link_id(self.index, predecessor, router_id))
+            router_ids.append(predecessor)
+            router_id = predecessor
+        router_ids.reverse()
+        link_ids.reverse()
+        return (router_ids, link_ids)
+
+    def compute_routes(self, demand, fidelity_model=None):
+        """Compute a minimum-length route for every path in a demand from the matrices.
+
+        If a fidelity model is given, the route for each path is the shortest route whose end-to-end
+        fidelity meets the fidelity requested by the path. The fidelity-constrained search is only
+        run for paths whose shortest route does not meet the requested fidelity.
+
+        Args:
+            demand (Demand): The demand containing the paths to be routed.
+            fidelity_model (FidelityModel): The fidelity model, or None to ignore fidelity.
+        Returns:
+            An OrderedDict of Route objects indexed by path name, in the same order as demand.paths.
+        """
+        # pylint:disable=too-many-locals
+        assert self.current, "The topology of the network changed after the matrices were computed"
+        network = self.network
+        index = self.index
+        if fidelity_model is None:
+            link_fidelities = None
+        else:
+            link_fidelities = fidelity_model.link_fidelities(network)
+        routes = collections.OrderedDict()
+        for path_name, path in demand.paths.items():
+            source_id = index.router_ids[path.end_point_1.name]
+            target_id = index.router_ids[path.end_point_2.name]
+            result = self._route_ids(source_id, target_id, link_fidelities, path.fidelity)
+            if result is None:
+                routes[path_name] = Route(path)
+            else:
+                length, fidelity, router_ids, link_ids = result
+                routes[path_name] = make_route(network, index, path, router_ids, link_ids, length,
+                                               fidelity, False)
+        return routes
+
+    def _route_ids(self, source_id, target_id, link_fidelities, min_fidelity):
+        path_ids = self.path_ids(source_id, target_id)
+        if path_ids is None:
+            return None
+        router_ids, link_ids = path_ids
+        length = int(self.distances[source_id, target_id])
+        return route_meeting_fidelity(self.index, (length, router_ids, link_ids), link_fidelities,
+                                      min_fidelity)
+
+def choose_all_pairs_method(index):
+    """Choose the all-pairs shortest path method which is expected to be the fastest for a network.
+    Floyd-Warshall is chosen for small or dense networks, repeated Dijkstra for large sparse ones.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+    Returns:
+        FLOYD_WARSHALL or DIJKSTRA.
+    """
+    nr_routers = index.nr_routers
+    if nr_routers < 2:
+        return FLOYD_WARSHALL
+    floyd_warshall_cost = nr_routers ** 3
+    dijkstra_cost = (DIJKSTRA_COST_FACTOR * nr_routers * (nr_routers + 2 * index.nr_links) *
+                     nr_routers.bit_length())
+    if floyd_warshall_cost <= dijkstra_cost:
+        return FLOYD_WARSHALL
+    return DIJKSTRA
+
+def floyd_warshall(index):
+    """Compute the all-pairs shortest paths using the blocked Floyd-Warshall algorithm.
+
+    The pivot routers are processed in blocks of FLOYD_WARSHALL_BLOCK_SIZE. For each block, the rows
+    of the pivot routers themselves are updated first. Then the remaining rows are updated in tiles
+    of FLOYD_WARSHALL_TILE_SIZE rows; each tile is updated for all pivots in the block while it is
+    in the cache. Each update is a vectorized min-plus operation on whole rows.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+    Returns:
+        A (distances, predecessors) tuple of matrices.
+    """
+    distances, predecessors = adjacency_matrices(index)
+    nr_routers = index.nr_routers
+    for block_start in range(0, nr_routers, FLOYD_WARSHALL_BLOCK_SIZE):
+        block_end = min(block_start + FLOYD_WARSHALL_BLOCK_SIZE, nr_routers)
+        pivots = range(block_start, block_end)
+        _relax_rows(distances, predecessors, slice(block_start, block_end), pivots)
+        for tile_start in range(0, nr_routers, FLOYD_WARSHALL_TILE_SIZE):
+            tile_end = min(tile_start + FLOYD_WARSHALL_TILE_SIZE, nr_routers)
+            if tile_start < block_start:
+                _relax_rows(distances, predecessors,
+                            slice(tile_start, min(tile_end, block_start)), pivots)
+            if tile_end > block_end:
+                _relax_rows(distances, predecessors,
+                            slice(max(tile_start, block_end), tile_end), pivots)
+    return (distances, predecessors)
+
+def _relax_rows(distances, predecessors, rows, pivots):
+    row_distances = distances[rows]
+    row_predecessors = predecessors[rows]
+    for pivot in pivots:
+        via_pivot = row_distances[:, pivot, numpy.newaxis] + distances[pivot]
+        improved = via_pivot < row_distances
+        numpy.copyto(row_distances, via_pivot, where=improved)
+        numpy.copyto(row_predecessors, predecessors[pivot], where=improved)
+
+def repeated_dijkstra(index):
+    """Compute the all-pairs shortest paths by computing a shortest path tree rooted at each router.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+    Returns:
+        A (distances, predecessors) tuple of matrices.
+    """
+    nr_routers = index.nr_routers
+    distances = numpy.empty((nr_routers, nr_routers))
+    predecessors = numpy.empty((nr_routers, nr_routers), dtype=numpy.int64)
+    for source_id in range(nr_routers):
+        tree = ShortestPathTree(index, source_id)
+        distances[source_id] = tree.distances
+        predecessors[source_id] = tree.parent_routers
+    return (distances, predecessors)
+
+def adjacency_matrices(index):
+    """Create the initial distance and predecessor matrices of a network, which only contain the
+    paths consisting of a single link.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+    Returns:
+        A (distances, predecessors) tuple of matrices.
+    """
+    nr_routers = index.nr_routers
+    distances = numpy.full((nr_routers, nr_routers), numpy.inf)
+    sources = numpy.repeat(numpy.arange(nr_routers), numpy.diff(numpy.asarray(index.offsets)))
+    neighbors = numpy.asarray(index.neighbors, dtype=numpy.int64)
+    numpy.minimum.at(distances, (sources, neighbors), numpy.asarray(index.lengths))
+    numpy.fill_diagonal(distances, 0.0)
+    predecessors = numpy.full((nr_routers, nr_routers), NO_PREDECESSOR, dtype=numpy.int64)
+    predecessors[sources, neighbors] = sources
+    numpy.fill_diagonal(predecessors, NO_PREDECESSOR)
+    return (distances, predecessors)
+
+def shortest_link_id(index, router_id, neighbor_id):
+    """Get the shortest link between two adjacent routers.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        router_id (int): The router id of the first router.
+        neighbor_id (int): The router id of the second router.
+    Returns:
+        The link id of the shortest link between the routers.
+    """
+    _length, link_id = min((length, link_id) for neighbor, link_id, length
+                           in index.adjacencies(router_id) if neighbor == neighbor_id)
+    return link_id
+
+def write_all_pairs_file(filename, all_pairs):
+    """Write the matrices of all-pairs shortest paths to a file, so that they can be reused for
+    other demands on the same network (see read_all_pairs_file).
+
+    Args:
+        filename (str): Filename of the file to write the matrices to.
+        all_pairs (AllPairsShortestPaths): The all-pairs shortest paths.
+    Returns:
+        None
+    Raises:
+        AllPairsError: There was a problem writing the file.
+    """
+    try:
+        with open(filename, 'wb') as file:
+            numpy.savez(file, digest=numpy.array(all_pairs.index.digest()),
+                        method=numpy.array(all_pairs.method), distances=all_pairs.distances,
+                        predecessors=all_pairs.predecessors)
+    except (OSError, IOError) as err:
+        message = f"Could not write all-pairs shortest paths file {filename} ({err})"
+        raise AllPairsError(message)
+
+def read_all_pairs_file(filename, network):
+    """Read the matrices of all-pairs shortest paths of a network from a file.
+
+    Args:
+        filename (str): Filename of the file to read the matrices from.
+        network (Network): The network.
+    Returns:
+        An AllPairsShortestPaths object, or None if the file does not exist, cannot be read, or
+        contains the matrices for a different network topology.
+    """
+    index = network.index()
+    try:
+        with numpy.load(filename) as contents:
+            if str(contents['digest']) != index.digest():
+                return None
+            method = str(contents['method'])
+            distances = contents['distances']
+            predecessors = contents['predecessors']
+    except (OSError, IOError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    # pylint:disable=no-member
+    if method not in METHODS or distances.shape != (index.nr_routers, index.nr_routers):
+        return None
+    return AllPairsShortestPaths(network, method, (distances, predecessors))
@@ -0,0 +1,85 @@
+"""Fidelity-constrained shortest path computation."""
+
+import heapq
+
+import instrumentation
+
+def constrained_shortest_path(index, link_fidelities, source_id, target_id, min_fidelity,
+                              residual_capacities=None, bandwidth=0):
+    # pylint:disable=too-many-arguments
+    """Compute the shortest path between two routers whose end-to-end fidelity is at least a given
+    minimum fidelity, optionally using only links with sufficient residual capacity.
+
+    This is a label-setting algorithm. Each label represents a partial path from the source with a
+    (length, fidelity) pair. Labels are settled in order of increasing length. A label at a router
+    is Pareto-dominated, and discarded, if an earlier settled label at the same router has a length
+    that is not longer and a fidelity that is not lower. Because labels are settled in order of
+    length, it is sufficient to remember the best settled fidelity per router. Labels whose fidelity
+    drops below the minimum fidelity are discarded as soon as they are created, since fidelity can
+    only decrease along a path.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        link_fidelities: The fidelity factors of the links, indexed by link id.
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+        min_fidelity (float): The minimum end-to-end fidelity of the path.
+        residual_capacities: The residual capacities of the links indexed by link id, or None to
+            ignore capacity (see placement.capacitated_route).
+        bandwidth: The bandwidth which each link on the path must be able to carry, if residual
+            capacities are given.
+    Returns:
+        A (length, fidelity, router_ids, link_ids) tuple for the shortest feasible path, or None if
+        there is no path which meets the minimum fidelity.
+    """
+    # pylint:disable=too-many-locals
+    if min_fidelity > 1.0:
+        return None
+    instrumentation.count('constrained-searches')
+    offsets, neighbors, link_ids, lengths = index.columns()
+    best_fidelities = [0.0] * index.nr_routers
+    label_routers = [source_id]
+    label_parents = [-1]
+    label_links = [-1]
+    heap = [(0, -1.0, 0)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    while heap:
+        length, negative_fidelity, label = heappop(heap)
+        fidelity = -negative_fidelity
+        router_id = label_routers[label]
+        if fidelity <= best_fidelities[router_id]:
+            continue
+        best_fidelities[router_id] = fidelity
+        if router_id == target_id:
+            instrumentation.count('heap-pushes', len(label_routers))
+            return ((length, fidelity) +
+                    _label_path(label, label_routers, label_parents, label_links))
+        for position in range(offsets[router_id], offsets[router_id + 1]):
+            link_id = link_ids[position]
+            if residual_capacities is not None and residual_capacities[link_id] < bandwidth:
+                continue
+            new_fidelity = fidelity * link_fidelities[link_id]
+            if new_fidelity < min_fidelity:
+                continue
+            neighbor = neighbors[position]
+            if new_fidelity <= best_fidelities[neighbor]:
+                continue
+            label_routers.append(neighbor)
+            label_parents.append(label)
+            label_links.append(link_id)
+            heappush(heap, (length + lengths[position], -new_fidelity, len(label_routers) - 1))
+    instrumentation.count('heap-pushes', len(label_routers))
+    return None
+
+def _label_path(label, label_routers, label_parents, label_links):
+    router_ids = []
+    path_link_ids = []
+    while label != -1:
+        router_ids.append(label_routers[label])
+        if label_parents[label] != -1:
+            path_link_ids.append(label_links[label])
+        label = label_parents[label]
+    router_ids.reverse()
+    path_link_ids.reverse()
+    return (router_ids, path_link_ids)
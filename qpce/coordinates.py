@@ -0,0 +1,169 @@
+"""Router coordinates, and lower bounds on path lengths derived from them.
+
+The routers of a network may have coordinates in one of two coordinate systems:
+
+ * PLANAR: (x, y) tuples in meters, e.g. for a network in a limited area.
+
+ * GEOGRAPHIC: (latitude, longitude) tuples in degrees, e.g. for a continental network.
+
+Links are fibers between their routers, so a link can not be shorter than the distance between its
+routers: the Euclidean distance for planar coordinates, or the great-circle distance for geographic
+coordinates. It follows that no path between two routers is shorter than the distance between them,
+which makes that distance an admissible heuristic for an A* search (see RouterPositions)."""
+
+import array
+import math
+
+PLANAR = 'planar'
+GEOGRAPHIC = 'geographic'
+COORDINATE_SYSTEMS = [PLANAR, GEOGRAPHIC]
+
+EARTH_RADIUS = 6371008.8    # Meters; the mean radius of the earth
+
+# Link lengths are whole meters, so the length of a link may be rounded down to less than the
+# distance between its routers. Links which are shorter than the distance by less than this are
+# considered consistent with the coordinates of their routers.
+LENGTH_TOLERANCE = 1.0      # Meters
+
+def planar_distance(coordinates_1, coordinates_2):
+    """Compute the Euclidean distance between two planar coordinates.
+
+    Args:
+        coordinates_1 (tuple): The first (x, y) coordinates in meters.
+        coordinates_2 (tuple): The second (x, y) coordinates in meters.
+    Returns:
+        The distance in meters.
+    """
+    return math.hypot(coordinates_1[0] - coordinates_2[0], coordinates_1[1] - coordinates_2[1])
+
+def great_circle_distance(coordinates_1, coordinates_2):
+    """Compute the great-circle distance between two geographic coordinates, using the haversine
+    formula on a spherical earth.
+
+    Args:
+        coordinates_1 (tuple): The first (latitude, longitude) coordinates in degrees.
+        coordinates_2 (tuple): The second (latitude, longitude) coordinates in degrees.
+    Returns:
+        The distance in meters.
+    """
+    latitude_1 = math.radians(coordinates_1[0])
+    latitude_2 = math.radians(coordinates_2[0])
+    half_latitude_difference = (latitude_2 - latitude_1) / 2.0
+    half_longitude_difference = math.radians(coordinates_2[1] - coordinates_1[1]) / 2.0
+    haversine = (math.sin(half_latitude_difference) ** 2 +
+                 math.cos(latitude_1) * math.cos(latitude_2) *
+                 math.sin(half_longitude_difference) ** 2)
+    return 2.0 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(haversine)))
+
+DISTANCE_FUNCTIONS = {
+    PLANAR: planar_distance,
+    GEOGRAPHIC: great_circle_distance,
+}
+
+def distance(coordinate_system, coordinates_1, coordinates_2):
+    """Compute the distance between two coordinates.
+
+    Args:
+        coordinate_system (str): PLANAR or GEOGRAPHIC.
+        coordinates_1 (tuple): The first coordinates.
+        coordinates_2 (tuple): The second coordinates.
+    Returns:
+        The distance in meters.
+    """
+    return DISTANCE_FUNCTIONS[coordinate_system](coordinates_1, coordinates_2)
+
+class RouterPositions:
+    """The positions of all routers of a network, indexed by router id, for computing lower bounds
+    on the length of the paths between routers.
+
+    The positions are stored as points in three dimensions: (x, y, 0) for planar coordinates, and
+    points on the unit sphere for geographic coordinates. The distance between two routers is then
+    computed from the straight-line distance between their points, without any trigonometry for
+    planar coordinates and with a single arcsine for geographic coordinates.
+
+    The distances are multiplied by a scale factor of at most one, which is chosen such that no link
+    is shorter than the scaled distance between its routers (links whose length was rounded down
+    make the scale factor slightly smaller than one). The scaled distances are therefore admissible
+    and consistent A* heuristics, even if some links are slightly shorter than the coordinates of
+    their routers imply."""
+
+    # pylint:disable=too-few-public-methods
+
+    def __init__(self, coordinate_system, router_coordinates, links):
+        """Compute the positions of the routers.
+
+        Args:
+            coordinate_system (str): PLANAR or GEOGRAPHIC.
+            router_coordinates (list): The coordinates of the routers, indexed by router id.
+            links: An iterable of (router 1 id, router 2 id, length) tuples, used to compute the
+                scale factor.
+        """
+        assert coordinate_system in COORDINATE_SYSTEMS, \
+               f"Unknown coordinate system {coordinate_system}"
+        self.coordinate_system = coordinate_system
+        self.xs = array.array('d')
+        self.ys = array.array('d')
+        self.zs = array.array('d')
+        if coordinate_system == PLANAR:
+            for x, y in router_coordinates:
+                self.xs.append(x)
+                self.ys.append(y)
+                self.zs.append(0.0)
+        else:
+            for latitude, longitude in router_coordinates:
+                latitude = math.radians(latitude)
+                longitude = math.radians(longitude)
+                self.xs.append(math.cos(latitude) * math.cos(longitude))
+                self.ys.append(math.cos(latitude) * math.sin(longitude))
+                self.zs.append(math.sin(latitude))
+        self.scale = 1.0
+        for router_1_id, router_2_id, length in links:
+            bound = self.distance(router_1_id, router_2_id)
+            if bound > length:
+                self.scale = min(self.scale, length / bound)
+
+    def distance(self, router_1_id, router_2_id):
+        """Compute the unscaled distance between two routers.
+
+        Args:
+            router_1_id (int): The router id of the first router.
+            router_2_id (int): The router id of the second router.
+        Returns:
+            The distance in meters.
+        """
+        chord = math.sqrt((self.xs[router_1_id] - self.xs[router_2_id]) ** 2 +
+                          (self.ys[router_1_id] - self.ys[router_2_id]) ** 2 +
+                          (self.zs[router_1_id] - self.zs[router_2_id]) ** 2)
+        if self.coordinate_system == PLANAR:
+            return chord
+        return 2.0 * EARTH_RADIUS * math.asin(min(1.0, chord / 2.0))
+
+    def lower_bounds(self, target_id):
+        """Get a function which computes a lower bound on the length of any path from a router to a
+        target router.
+
+        Args:
+            target_id (int): The router id of the target router.
+        Returns:
+            A function which takes a router id and returns the lower bound in meters.
+        """
+        xs = self.xs
+        ys = self.ys
+        zs = self.zs
+        target_x = xs[target_id]
+        target_y = ys[target_id]
+        target_z = zs[target_id]
+        scale = self.scale
+        sqrt = math.sqrt
+        if self.coordinate_system == PLANAR:
+            def planar_lower_bound(router_id):
+                return scale * sqrt((xs[router_id] - target_x) ** 2 +
+                                    (ys[router_id] - target_y) ** 2)
+            return planar_lower_bound
+        asin = math.asin
+        scale *= 2.0 * EARTH_RADIUS
+        def geographic_lower_bound(router_id):
+            chord = sqrt((xs[router_id] - target_x) ** 2 + (ys[router_id] - target_y) ** 2 +
+                         (zs[router_id] - target_z) ** 2)
+            return scale * asin(min(1.0, chord / 2.0))
+        return geographic_lower_bound
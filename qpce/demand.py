@@ -1,10 +1,12 @@
 """The demand for a quantum network: the requested paths and constraints."""
 
 import collections
+import sys
+
+from network import garbage_collection_paused
+from path import Path
 
 class Demand:
-    # TODO: Remove this when we have more methods
-    # pylint:disable=too-few-public-methods
     """The quantum demand.
 
     The quantum demand describes the set of end-to-end paths requested by the applications and the
@@ -34,3 +36,75 @@ class Demand:
         assert path.end_point_2.name in self.network.routers, \
             f"End-point 2 {path.end_point_2.name} must be a router in the network"
         self.paths[path.name] = path
+
+    def add_paths_bulk(self, names, end_point_1_ids, end_point_2_ids, bandwidths, fidelities):
+        # pylint:disable=too-many-arguments,too-many-locals
+        """Create quantum paths and add them to this quantum demand.
+
+        The paths are given as columns: the i-th path has name names[i] and connects the routers
+        with ids end_point_1_ids[i] and end_point_2_ids[i] (the position of the router in
+        network.routers). This is equivalent to creating a Path object for each path, but all paths
+        are validated in one pass before any path is created, which is much faster for large
+        demands.
+
+        Args:
+            names (list): The names of the paths.
+            end_point_1_ids (list): The router ids of the first end-points of the paths.
+            end_point_2_ids (list): The router ids of the second end-points of the paths.
+            bandwidths (list): The requested bandwidths in end-to-end Bell pairs per second.
+            fidelities (list): The requested fidelities of the generated end-to-end Bell pairs.
+        Returns:
+            A list of the newly created Path objects.
+        Raises:
+            AssertionError if the columns have different lengths, a name occurs more than once or
+            is already used by a path in the demand, an end-point id is unknown, a bandwidth is
+            not > 0, or a fidelity is not > 0.0. No paths are created in this case.
+        """
+        nr_paths = len(names)
+        assert all(len(column) == nr_paths for column in
+                   (end_point_1_ids, end_point_2_ids, bandwidths, fidelities)), \
+               "Path columns must have the same length"
+        if nr_paths == 0:
+            return []
+        names = [sys.intern(name) for name in names]
+        unique_names = set(names)
+        if len(unique_names) != nr_paths or not unique_names.isdisjoint(self.paths):
+            seen = set(self.paths)
+            for name in names:
+                assert name not in seen, f"Network already contains a path with name {name}"
+                seen.add(name)
+        nr_routers = len(self.network.routers)
+        for router_ids in (end_point_1_ids, end_point_2_ids):
+            assert min(router_ids) >= 0 and max(router_ids) < nr_routers, \
+                   "Path has an end-point id which is not the id of a router in the network"
+        assert min(bandwidths) > 0, "Requested end-to-end bandwidth must be > 0"
+        assert min(fidelities) > 0.0, "Requested end-to-end fidelity must be > 0.0"
+        # Routers are looked up by name, rather than by position in a list of all routers, so
+        # that routers which are created on demand (see SnapshotNetwork) are only created when
+        # they are an end-point of a path.
+        routers = self.network.routers
+        router_names = list(routers)
+        paths = []
+        with garbage_collection_paused():
+            for name, end_point_1_id, end_point_2_id, bandwidth, fidelity in zip(
+                    names, end_point_1_ids, end_point_2_ids, bandwidths, fidelities):
+                path = Path.__new__(Path)
+                path.name = name
+                path.end_point_1 = routers[router_names[end_point_1_id]]
+                path.end_point_2 = routers[router_names[end_point_2_id]]
+                path.bandwidth = bandwidth
+                path.fidelity = fidelity
+                self.paths[name] = path
+                paths.append(path)
+        return paths
+
+    def remove_path(self, path):
+        """Remove a quantum path from this quantum demand.
+
+        Args:
+            path(Path): The quantum path to be removed.
+        Returns:
+            None
+        """
+        assert self.paths.get(path.name) is path, f"Demand does not contain path {path.name}"
+        del self.paths[path.name]
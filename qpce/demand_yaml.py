@@ -1,10 +1,11 @@
 """Parsing of the demand YAML file."""
 
 import yaml
-import cerberus
 
+import instrumentation
 from demand import Demand
-from path import Path
+from fast_validation import compile_schema
+from yaml_stream import SafeLoader
 
 PATH_SCHEMA = {
     'name': {'type': 'string', 'required': True},
@@ -24,12 +25,11 @@ DEMAND_SCHEMA = {
     },
 }
 
+DEMAND_VALIDATOR = compile_schema(DEMAND_SCHEMA)
+
 class ReadDemandYamlError(Exception):
     """Exception is thrown when there is a problem reading the demand YAML file."""
 
-class DemandValidator(cerberus.Validator):
-    """The DemandValidator class is used to validate the correctness of a demand YAML file."""
-
 def read_demand_from_yaml_file(filename, network):
     """Read and parse a demand YAML document from a file.
 
@@ -42,7 +42,8 @@ def read_demand_from_yaml_file(filename, network):
         ReadDemandYamlError: There was a problem reading the demand model.
     """
     try:
-        file = open(filename, 'r')
+        with instrumentation.span('demand-file-open'):
+            file = open(filename, 'r')
     except (OSError, IOError) as err:
         message = f"Could not open demand file {filename} ({err})"
         raise ReadDemandYamlError(message)
@@ -61,22 +62,43 @@ def read_demand_from_yaml_stream(stream, network):
     Raises:
         ReadDemandYamlError: There was a problem reading the demand model.
     """
-    try:
-        demand_model = yaml.safe_load(stream)
-    except yaml.YAMLError as err:
-        message = f"Could not parse demand YAML document ({err})"
-        raise ReadDemandYamlError(message)
-    validator = DemandValidator(DEMAND_SCHEMA)
+    with instrumentation.span('demand-read'):
+        try:
+            with instrumentation.span('demand-yaml-parse'):
+                demand_model = yaml.load(stream, Loader=SafeLoader)
+        except yaml.YAMLError as err:
+            message = f"Could not parse demand YAML document ({err})"
+            raise ReadDemandYamlError(message)
+        with instrumentation.span('demand-validation'):
+            if not DEMAND_VALIDATOR(demand_model):
+                check_demand_yaml(demand_model)
+        demand = read_demand_from_parsed_yaml(demand_model, network)
+    instrumentation.count('paths', len(demand.paths))
+    return demand
+
+def check_demand_yaml(demand_model):
+    """Validate a parsed demand YAML document using cerberus and report the errors. This is only
+    used for documents that fail the fast validation, to produce a detailed error report.
+
+    Args:
+        demand_model: The parsed demand YAML document.
+    Returns:
+        None, if cerberus considers the document to be valid.
+    Raises:
+        ReadDemandYamlError: The document is not valid.
+    """
+    if not isinstance(demand_model, dict):
+        raise ReadDemandYamlError("Could not validate demand YAML document (must be a mapping)")
+    import cerberus   # pylint:disable=import-outside-toplevel
+    validator = cerberus.Validator(DEMAND_SCHEMA)
     if not validator.validate(demand_model, DEMAND_SCHEMA):
-        message = f"Could not validate demand YAMLdocument"
+        message = f"Could not validate demand YAML document ({validator.errors})"
         raise ReadDemandYamlError(message)
-        # TODO: Better error message, reporting validator.errors using pretty printer
-        # TODO: ... or more specific exceptions
-    demand_model = validator.normalized(demand_model)
-    return read_demand_from_parsed_yaml(demand_model, network)
+        # TODO: More specific exceptions
 
 def read_demand_from_parsed_yaml(demand_model, network):
-    """Create a Demand object from a demand_model, i.e. from parsed YAML file.
+    """Create a Demand object from a demand_model, i.e. from parsed YAML file. The paths are
+    collected in columns and added to the demand in bulk.
 
     Args:
         demand_model: The parsed demand YAML file.
@@ -87,34 +109,34 @@ def read_demand_from_parsed_yaml(demand_model, network):
         ReadDemandYamlError: There was a problem reading the demand model.
     """
     demand = Demand(network)
-    if 'paths' in demand_model:
-        for path_model in demand_model['paths']:
-            _path = read_path_from_parsed_yaml(path_model, demand)
+    with instrumentation.span('demand-normalization'):
+        router_ids = {name: router_id for router_id, name in enumerate(network.routers)}
+        columns = ([], [], [], [], [])
+        for path_model in demand_model.get('paths', []):
+            for column, value in zip(columns, read_path_from_parsed_yaml(path_model, router_ids)):
+                column.append(value)
+    with instrumentation.span('demand-construction'):
+        demand.add_paths_bulk(*columns)
     return demand
 
-def read_path_from_parsed_yaml(path_model, demand):
-    """Create a Link object from a link_model, i.e. from parsed YAML file.
+def read_path_from_parsed_yaml(path_model, router_ids):
+    """Get the attributes of a path from a path_model, i.e. from parsed YAML file.
 
     Args:
         path_model: The parsed path YAML object.
-        demand: Create the Link object in this demand.
+        router_ids (dict): The router ids (positions in network.routers) indexed by router name.
     Returns:
-        The newly created Link object.
+        A (name, end_point_1_id, end_point_2_id, bandwidth, fidelity) tuple.
+    Raises:
+        ReadDemandYamlError: One of the end-points of the path is not an existing router.
     """
     router_1_name = path_model['end-point-1']
-    if router_1_name in demand.network.routers:
-        router_1 = demand.network.routers[router_1_name]
-    else:
+    router_1_id = router_ids.get(router_1_name)
+    if router_1_id is None:
         raise ReadDemandYamlError(f"Path end-point 1 {router_1_name} must be an existing router")
     router_2_name = path_model['end-point-2']
-    if router_2_name in demand.network.routers:
-        router_2 = demand.network.routers[router_2_name]
-    else:
+    router_2_id = router_ids.get(router_2_name)
+    if router_2_id is None:
         raise ReadDemandYamlError(f"Path end-point 2 {router_2_name} must be an existing router")
-    return Path(demand=demand,
-                name=path_model['name'],
-                end_point_1=router_1,
-                end_point_2=router_2,
-                bandwidth=path_model['bandwidth'],
-                fidelity=path_model['fidelity'])
-    
\ No newline at end of file
+    return (path_model['name'], router_1_id, router_2_id, path_model['bandwidth'],
+            path_model['fidelity'])
@@ -0,0 +1,99 @@
+"""Fast validation of parsed YAML documents against cerberus schemas.
+
+Validating with cerberus is flexible, but slow: it is too slow to validate every entry of a network
+or demand file with millions of entries. This module compiles a cerberus schema, once, into a
+validation function which only checks the rules used by the schemas in this package (type,
+required, min, max, and nested schemas) in a tight loop.
+
+The compiled validation function only says whether a document is valid or not. If it is not,
+cerberus should be used to produce a detailed report of the errors."""
+
+import collections.abc
+
+# Included and excluded Python types for each cerberus type; mirrors the type definitions of
+# cerberus.
+TYPES = {
+    'boolean': ((bool,), ()),
+    'dict': ((collections.abc.Mapping,), ()),
+    'float': ((float, int), ()),
+    'integer': ((int,), ()),
+    'list': ((collections.abc.Sequence,), (str,)),
+    'number': ((int, float), (bool,)),
+    'string': ((str,), ()),
+}
+
+SUPPORTED_RULES = {'type', 'required', 'min', 'max', 'schema'}
+
+_MISSING = object()
+
+def compile_schema(schema):
+    """Compile a cerberus schema for a dictionary into a validation function.
+
+    Args:
+        schema (dict): The cerberus schema, a dictionary of rules indexed by field name.
+    Returns:
+        A function which takes a document and returns True if the document is valid.
+    """
+    known_fields = frozenset(schema)
+    fields = tuple((field, rules.get('required', False), compile_rules(rules))
+                   for field, rules in schema.items())
+
+    def validate_dict(document):
+        if not isinstance(document, collections.abc.Mapping):
+            return False
+        for field in document:
+            if field not in known_fields:
+                return False
+        for field, required, validate_value in fields:
+            value = document.get(field, _MISSING)
+            if value is _MISSING:
+                if required:
+                    return False
+            elif not validate_value(value):
+                return False
+        return True
+
+    return validate_dict
+
+def compile_rules(rules):
+    """Compile the cerberus rules for a single value into a validation function.
+
+    Args:
+        rules (dict): The cerberus rules, e.g. {'type': 'integer', 'min': 1}.
+    Returns:
+        A function which takes a value and returns True if the value is valid.
+    """
+    unsupported_rules = set(rules) - SUPPORTED_RULES
+    assert not unsupported_rules, f"Unsupported rules {unsupported_rules}"
+    type_name = rules.get('type')
+    if type_name is None:
+        included_types, excluded_types = (object,), ()
+    else:
+        included_types, excluded_types = TYPES[type_name]
+    minimum = rules.get('min')
+    maximum = rules.get('max')
+    if 'schema' not in rules:
+        validate_items = None
+    elif type_name == 'list':
+        validate_items = compile_rules(rules['schema'])
+    else:
+        validate_items = compile_schema(rules['schema'])
+    is_list = type_name == 'list'
+
+    def validate_value(value):
+        if not isinstance(value, included_types) or isinstance(value, excluded_types):
+            return False
+        if minimum is not None and value < minimum:
+            return False
+        if maximum is not None and value > maximum:
+            return False
+        if validate_items is not None:
+            if is_list:
+                for item in value:
+                    if not validate_items(item):
+                        return False
+            elif not validate_items(value):
+                return False
+        return True
+
+    return validate_value
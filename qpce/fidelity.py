@@ -0,0 +1,60 @@
+"""Model of the fidelity of Bell pairs distributed over a route."""
+
+import math
+
+class FidelityModel:
+    """A model of how the fidelity of Bell pairs decays along a route.
+
+    Each link on a route contributes a fidelity factor, which decays exponentially with the length
+    of the link and which includes a fixed factor per hop (e.g. for the entanglement swap at the end
+    of the link). The end-to-end fidelity of a route is the product of the fidelity factors of the
+    links on the route. This is a simplification of the real physics, but it has the property
+    which matters for routing: fidelity only decreases as a route gets longer."""
+
+    def __init__(self, hop_fidelity=1.0, decay_per_meter=0.0):
+        """Initialize a fidelity model.
+
+        Args:
+            hop_fidelity (float): Fidelity factor per link, independent of the length of the link.
+                Must be > 0.0 and <= 1.0.
+            decay_per_meter (float): Exponential decay rate of the fidelity per meter of link
+                length. Must be >= 0.0.
+        """
+        assert 0.0 < hop_fidelity <= 1.0, f"Invalid hop fidelity {hop_fidelity}"
+        assert decay_per_meter >= 0.0, f"Invalid decay per meter {decay_per_meter}"
+        self.hop_fidelity = hop_fidelity
+        self.decay_per_meter = decay_per_meter
+
+    def link_fidelity(self, length):
+        """Compute the fidelity factor of a link.
+
+        Args:
+            length (int): The length of the link in meters.
+        Returns:
+            The fidelity factor of the link.
+        """
+        return self.hop_fidelity * math.exp(-self.decay_per_meter * length)
+
+    def link_fidelities(self, network):
+        """Compute the fidelity factors of all links in a network.
+
+        Args:
+            network (Network): The network.
+        Returns:
+            A list of fidelity factors indexed by link id.
+        """
+        return [self.link_fidelity(link.length) for link in network.links]
+
+def route_fidelity(link_fidelities, link_ids):
+    """Compute the end-to-end fidelity of a route.
+
+    Args:
+        link_fidelities: The fidelity factors of the links, indexed by link id.
+        link_ids: The link ids of the links on the route.
+    Returns:
+        The end-to-end fidelity of the route.
+    """
+    fidelity = 1.0
+    for link_id in link_ids:
+        fidelity *= link_fidelities[link_id]
+    return fidelity
@@ -0,0 +1,144 @@
+"""Compact integer-indexed adjacency index of a quantum network."""
+
+import array
+
+from coordinates import RouterPositions
+
+class GraphIndex:
+    """A frozen, array-backed adjacency index of a quantum network.
+
+    The index stores the topology of a network in Compressed Sparse Row (CSR) form. Each router is
+    identified by an integer router id (its position in network.routers) and each link by an integer
+    link id (its position in network.links, which the link keeps in Link.link_id). The adjacencies
+    of router r are the entries offsets[r] up to (but not including) offsets[r+1] of the neighbors,
+    link_ids, and lengths arrays, in order of the local port on router r.
+
+    Links are bi-directional, so every link appears in the adjacencies of both of its routers. A
+    link from a router to itself appears twice in the adjacencies of that router.
+
+    The index is a snapshot; it is not updated when the network changes. Use Network.index() to get
+    an index which is rebuilt automatically after the topology of the network was changed.
+
+    If all routers of the network have coordinates, the index also holds the positions of the
+    routers (see RouterPositions), which guide A* searches towards their target. Otherwise the
+    positions are None.
+
+    The index does not refer to any Router or Link objects, so it can be pickled compactly (e.g. to
+    send it to worker processes)."""
+
+    # pylint:disable=too-few-public-methods
+
+    def __init__(self, network):
+        """Build an adjacency index from a network in one pass.
+
+        Args:
+            network (Network): The network to be indexed.
+        """
+        self.router_names = list(network.routers)
+        self.router_ids = {name: router_id for router_id, name in enumerate(self.router_names)}
+        self.offsets = array.array('q', [0])
+        self.neighbors = array.array('q')
+        self.link_ids = array.array('q')
+        self.lengths = array.array('q')
+        router_ids = self.router_ids
+        for router in network.routers.values():
+            for _port, link in router.link_items():
+                if link.router_1 is router:
+                    neighbor = link.router_2
+                else:
+                    neighbor = link.router_1
+                self.neighbors.append(router_ids[neighbor.name])
+                self.link_ids.append(link.link_id)
+                self.lengths.append(link.length)
+            self.offsets.append(len(self.neighbors))
+        self.positions = None
+        if network.coordinate_system is not None:
+            router_coordinates = [router.coordinates for router in network.routers.values()]
+            if None not in router_coordinates:
+                self.positions = RouterPositions(
+                    network.coordinate_system, router_coordinates,
+                    ((router_ids[link.router_1.name], router_ids[link.router_2.name], link.length)
+                     for link in network.links))
+
+    @classmethod
+    def from_arrays(cls, router_names, offsets, neighbors, link_ids, lengths):
+        """Create an index from existing arrays, e.g. arrays in a memory-mapped network snapshot.
+
+        Args:
+            router_names (list): The router names indexed by router id.
+            offsets: The CSR offsets, indexed by router id.
+            neighbors: The neighbor router ids of the adjacencies.
+            link_ids: The link ids of the adjacencies.
+            lengths: The link lengths of the adjacencies.
+        Returns:
+            A GraphIndex object.
+        """
+        index = cls.__new__(cls)
+        index.router_names = router_names
+        index.router_ids = {name: router_id for router_id, name in enumerate(router_names)}
+        index.offsets = offsets
+        index.neighbors = neighbors
+        index.link_ids = link_ids
+        index.lengths = lengths
+        index.positions = None
+        return index
+
+    def __getstate__(self):
+        # The router ids are not pickled; they are rebuilt from the router names when unpickling.
+        # Arrays which are memory views (e.g. into a memory-mapped snapshot) are pickled as arrays.
+        state = self.__dict__.copy()
+        del state['router_ids']
+        for name in ['offsets', 'neighbors', 'link_ids', 'lengths']:
+            if isinstance(state[name], memoryview):
+                state[name] = array.array('q', state[name].tobytes())
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.router_ids = {name: router_id for router_id, name in enumerate(self.router_names)}
+
+    @property
+    def nr_routers(self):
+        """The number of routers in the index."""
+        return len(self.router_names)
+
+    @property
+    def nr_links(self):
+        """The number of links in the index."""
+        return len(self.neighbors) // 2
+
+    def columns(self):
+        """Get the columns of the index, e.g. to bind them to local variables in a search loop.
+
+        Returns:
+            An (offsets, neighbors, link_ids, lengths) tuple.
+        """
+        return (self.offsets, self.neighbors, self.link_ids, self.lengths)
+
+    def digest(self):
+        """Compute a digest of the topology described by the index: the router names and the
+        adjacencies, including the link ids and lengths. Two indexes have the same digest if and
+        only if they describe the same topology (with overwhelming probability).
+
+        Returns:
+            The digest as a hexadecimal string.
+        """
+        import hashlib   # pylint:disable=import-outside-toplevel
+        digest = hashlib.sha256()
+        digest.update('\0'.join(self.router_names).encode('utf-8'))
+        for column in self.columns():
+            digest.update(b'\0')
+            digest.update(column.tobytes())
+        return digest.hexdigest()
+
+    def adjacencies(self, router_id):
+        """Iterate over the adjacencies of a router.
+
+        Args:
+            router_id (int): The id of the router.
+        Returns:
+            An iterator of (neighbor router id, link id, link length) tuples, in port order.
+        """
+        start = self.offsets[router_id]
+        end = self.offsets[router_id + 1]
+        return zip(self.neighbors[start:end], self.link_ids[start:end], self.lengths[start:end])
@@ -0,0 +1,237 @@
+"""Incremental re-routing of the paths in a demand when the topology of the network changes."""
+
+from link import Link
+from route import Route
+from route_computation import compute_path_routes
+from shortest_path import INFINITY, ShortestPathTree
+
+class IncrementalRouting:
+    """Routes for all paths in a demand, which are kept up to date as the topology changes.
+
+    Topology changes must be made through the methods of this class (rather than directly on the
+    network) so that only the routes which are affected by the change are recomputed:
+
+     * When a link is removed or gets longer, only the paths whose route traverses that link can be
+       affected. These are found using a reverse index from links to paths.
+
+     * When a link is added or gets shorter, the paths whose route traverses that link are
+       recomputed. Other paths are only recomputed if a route through the link could be shorter than
+       their current route. This is determined using the shortest path trees rooted at the two
+       routers of the link, which costs two shortest path tree computations instead of one per
+       source router in the demand."""
+
+    def __init__(self, network, demand, fidelity_model=None):
+        """Compute the initial routes for all paths in a demand.
+
+        Args:
+            network (Network): The network on which the paths are routed.
+            demand (Demand): The demand containing the paths to be routed.
+            fidelity_model (FidelityModel): The fidelity model, or None to ignore fidelity.
+        """
+        self.network = network
+        self.demand = demand
+        self.fidelity_model = fidelity_model
+        self.routes = {}
+        self._paths_by_link = {}   # Sets of path names indexed by Link object
+        self._reroute(list(demand.paths.values()))
+
+    def paths_traversing_link(self, link):
+        """Get the names of the paths whose route traverses a link.
+
+        Args:
+            link (Link): The link.
+        Returns:
+            A set of path names.
+        """
+        return set(self._paths_by_link.get(link, ()))
+
+    def add_link(self, router_1, router_2, length, capacity=None):
+        """Add a link to the network and re-route the affected paths.
+
+        Args:
+            router_1 (Router): The first router of the link.
+            router_2 (Router): The second router of the link.
+            length (int): The length of the link in meters.
+            capacity (int): The capacity of the link in Bell pairs per second, or None.
+        Returns:
+            A (link, path_names) tuple, where link is the new Link object and path_names is the list
+            of names of the paths which were re-routed.
+        """
+        link = Link(router_1, router_2, length, capacity)
+        return (link, self._reroute(self._paths_improved_by_link(link)))
+
+    def remove_link(self, link):
+        """Remove a link from the network and re-route the paths which traversed it.
+
+        Args:
+            link (Link): The link to be removed.
+        Returns:
+            The list of names of the paths which were re-routed.
+        """
+        affected_paths = self._paths_using_links([link])
+        self.network.remove_link(link)
+        return self._reroute(affected_paths)
+
+    def change_link_length(self, link, length):
+        """Change the length of a link and re-route the affected paths.
+
+        Args:
+            link (Link): The link.
+            length (int): The new length of the link in meters.
+        Returns:
+            The list of names of the paths which were re-routed.
+        """
+        old_length = link.length
+        self.network.change_link_length(link, length)
+        if length < old_length:
+            return self._reroute(self._paths_improved_by_link(link))
+        return self._reroute(self._paths_using_links([link]))
+
+    def remove_router(self, router):
+        """Remove a router, and all links attached to it, from the network and re-route the paths
+        which traversed it. Paths which have the router as an end-point become infeasible.
+
+        Args:
+            router (Router): The router to be removed.
+        Returns:
+            The list of names of the paths which were re-routed.
+        """
+        router_links = [link for _port, link in router.link_items()]
+        affected_path_names = {path.name for path in self._paths_using_links(router_links)}
+        affected_paths = [path for path_name, path in self.demand.paths.items()
+                          if path_name in affected_path_names or
+                          router in (path.end_point_1, path.end_point_2)]
+        self.network.remove_router(router)
+        return self._reroute(affected_paths)
+
+    def apply_network_changes(self, changes):
+        """Re-route the paths which are affected by changes that were already made to the network,
+        e.g. by applying a network delta. The affected paths are found in the same way as for the
+        individual changes (see the class description). If so many links were added or got shorter
+        that checking them one by one would cost more than re-routing all paths, all paths are
+        re-routed.
+
+        Paths whose end-point was removed become infeasible. Paths with an end-point which was
+        removed and then added again (i.e. a new router with the same name) are connected to the
+        new router.
+
+        Args:
+            changes (NetworkChanges): The changes.
+        Returns:
+            The list of names of the paths which were re-routed.
+        """
+        removed_links = set(changes.removed_links)
+        worse_links = list(removed_links)
+        better_links = list(changes.added_links)
+        for link, old_length, _old_capacity in changes.changed_links:
+            if link in removed_links:
+                continue
+            if link.length > old_length:
+                worse_links.append(link)
+            elif link.length < old_length:
+                better_links.append(link)
+        affected_path_names = {path.name for path in self._paths_using_links(worse_links)}
+        routers = self.network.routers
+        for path in self.demand.paths.values():
+            end_point_1 = routers.get(path.end_point_1.name)
+            end_point_2 = routers.get(path.end_point_2.name)
+            if end_point_1 is not path.end_point_1 or end_point_2 is not path.end_point_2:
+                if end_point_1 is not None and end_point_2 is not None:
+                    path.end_point_1 = end_point_1
+                    path.end_point_2 = end_point_2
+                affected_path_names.add(path.name)
+        if 2 * len(better_links) >= len(self.demand.paths):
+            affected_path_names = set(self.demand.paths)
+        else:
+            for link in better_links:
+                affected_path_names.update(path.name for path in self._paths_improved_by_link(link))
+        return self._reroute([path for path_name, path in self.demand.paths.items()
+                              if path_name in affected_path_names])
+
+    def update_demand(self, demand):
+        """Replace the demand by another version of it, e.g. the demand read again after the demand
+        YAML file was edited. Paths are matched by name. Only the paths which were added, or whose
+        end-points, bandwidth, or fidelity changed, are routed; the routes of the removed paths are
+        dropped.
+
+        Args:
+            demand (Demand): The new version of the demand, for the same network.
+        Returns:
+            The list of names of the paths which were routed.
+        """
+        assert demand.network is self.network, "Demand is for a different network"
+        old_paths = self.demand.paths
+        changed_paths = []
+        for path_name, path in demand.paths.items():
+            old_path = old_paths.get(path_name)
+            if (old_path is not None and old_path.end_point_1 is path.end_point_1 and
+                    old_path.end_point_2 is path.end_point_2 and
+                    old_path.bandwidth == path.bandwidth and old_path.fidelity == path.fidelity):
+                self.routes[path_name] = self.routes[path_name].for_path(path)
+            else:
+                changed_paths.append(path)
+        for path_name in old_paths:
+            if path_name not in demand.paths:
+                self._unindex_route(path_name)
+                del self.routes[path_name]
+        self.demand = demand
+        return self._reroute(changed_paths)
+
+    def _paths_using_links(self, links):
+        path_names = set()
+        for link in links:
+            path_names.update(self._paths_by_link.get(link, ()))
+        return [path for path_name, path in self.demand.paths.items() if path_name in path_names]
+
+    def _paths_improved_by_link(self, link):
+        # pylint:disable=too-many-locals
+        index = self.network.index()
+        tree_1 = ShortestPathTree(index, index.router_ids[link.router_1.name])
+        tree_2 = ShortestPathTree(index, index.router_ids[link.router_2.name])
+        distances_1 = tree_1.distances
+        distances_2 = tree_2.distances
+        router_ids = index.router_ids
+        affected_paths = []
+        for path_name, path in self.demand.paths.items():
+            route = self.routes[path_name]
+            if link in self._paths_by_link and path_name in self._paths_by_link[link]:
+                affected_paths.append(path)
+                continue
+            current_length = route.length if route.feasible else INFINITY
+            id_1 = router_ids.get(path.end_point_1.name)
+            id_2 = router_ids.get(path.end_point_2.name)
+            if id_1 is None or id_2 is None:
+                continue
+            via_link = link.length + min(distances_1[id_1] + distances_2[id_2],
+                                         distances_2[id_1] + distances_1[id_2])
+            if via_link < current_length:
+                affected_paths.append(path)
+        return affected_paths
+
+    def _reroute(self, paths):
+        routable_paths = []
+        for path in paths:
+            self._unindex_route(path.name)
+            if (self.network.routers.get(path.end_point_1.name) is path.end_point_1 and
+                    self.network.routers.get(path.end_point_2.name) is path.end_point_2):
+                routable_paths.append(path)
+            else:
+                self.routes[path.name] = Route(path)
+        new_routes = compute_path_routes(self.network, routable_paths, self.fidelity_model)
+        for path_name, route in new_routes.items():
+            self.routes[path_name] = route
+            if route.feasible:
+                for link in route.links:
+                    self._paths_by_link.setdefault(link, set()).add(path_name)
+        return [path.name for path in paths]
+
+    def _unindex_route(self, path_name):
+        route = self.routes.get(path_name)
+        if route is None or not route.feasible:
+            return
+        for link in route.links:
+            path_names = self._paths_by_link.get(link)
+            if path_names is not None:
+                path_names.discard(path_name)
+                if not path_names:
+                    del self._paths_by_link[link]
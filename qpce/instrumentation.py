@@ -0,0 +1,214 @@
+"""Instrumentation of the phases of path computation: timing spans and counters.
+
+Instrumentation is disabled by default. When it is disabled, spans and counters cost no more than a
+function call, so instrumented code does not need to check whether instrumentation is enabled,
+except in inner loops. Instrumentation is enabled by start_metrics(), which makes a new Metrics
+object the current metrics; all spans and counters are then recorded in that object."""
+
+import collections
+import contextlib
+import time
+
+class Metrics:
+    """Timing spans and counters collected while running path computation.
+
+    A span measures the total time spent in a named phase (e.g. parsing the network YAML file),
+    and the number of times the phase was entered. A counter counts named events or quantities
+    (e.g. the number of routers, or the number of heap pushes in shortest path searches)."""
+
+    def __init__(self):
+        self.spans = collections.OrderedDict()      # [seconds, count] lists indexed by span name
+        self.counters = collections.OrderedDict()   # Counts indexed by counter name
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Measure the time spent in a block of code.
+
+        Args:
+            name (str): The name of the span.
+        Returns:
+            A context manager which measures the time spent inside it.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start_time)
+
+    def add_time(self, name, seconds, count=1):
+        # pylint:disable=redefined-outer-name
+        """Add time to a span, e.g. time which was measured in an inner loop.
+
+        Args:
+            name (str): The name of the span.
+            seconds (float): The time to be added, in seconds.
+            count (int): The number of times the span was entered.
+        Returns:
+            None
+        """
+        totals = self.spans.get(name)
+        if totals is None:
+            self.spans[name] = [seconds, count]
+        else:
+            totals[0] += seconds
+            totals[1] += count
+
+    def count(self, name, increment=1):
+        """Increment a counter.
+
+        Args:
+            name (str): The name of the counter.
+            increment (int): The amount by which the counter is incremented.
+        Returns:
+            None
+        """
+        self.counters[name] = self.counters.get(name, 0) + increment
+
+    def merge(self, metrics_dict):
+        """Add the spans and counters of other metrics (e.g. collected in a worker process) to these
+        metrics.
+
+        Args:
+            metrics_dict (dict): The other metrics, as returned by as_dict().
+        Returns:
+            None
+        """
+        for name, totals in metrics_dict['spans'].items():
+            self.add_time(name, totals['seconds'], totals['count'])
+        for name, value in metrics_dict['counters'].items():
+            self.count(name, value)
+
+    def as_dict(self):
+        """Get the spans and counters as a dictionary which can be serialized as JSON.
+
+        Returns:
+            A dictionary with a 'spans' entry (a dictionary of {'seconds': ..., 'count': ...}
+            dictionaries indexed by span name) and a 'counters' entry (a dictionary of counts
+            indexed by counter name).
+        """
+        return {
+            'spans': {name: {'seconds': seconds, 'count': count}
+                      for name, (seconds, count) in self.spans.items()},
+            'counters': dict(self.counters),
+        }
+
+    def write_json_file(self, filename):
+        """Write the spans and counters to a JSON file.
+
+        Args:
+            filename (str): Filename of the JSON file.
+        Returns:
+            None
+        """
+        import json   # pylint:disable=import-outside-toplevel
+        with open(filename, 'w') as file:
+            json.dump(self.as_dict(), file, indent=2)
+
+class IterationTimer:
+    # pylint:disable=too-few-public-methods
+    """Measures the time spent producing the items of an iterable, excluding the time spent by the
+    consumer of the items (e.g. the time spent computing routes which are written as soon as they
+    are computed, excluding the time spent writing them)."""
+
+    def __init__(self, iterable):
+        """Initialize an iteration timer.
+
+        Args:
+            iterable: The iterable which produces the items.
+        """
+        self.iterable = iterable
+        self.seconds = 0.0
+
+    def __iter__(self):
+        iterator = iter(self.iterable)
+        while True:
+            start_time = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.seconds += time.perf_counter() - start_time
+            yield item
+
+class _NoSpan:
+    """A span which does nothing, used when instrumentation is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        return False
+
+_CURRENT_METRICS = None
+_NO_SPAN = _NoSpan()
+
+def start_metrics():
+    """Enable instrumentation, recording all spans and counters in new metrics.
+
+    Returns:
+        The new Metrics object.
+    """
+    global _CURRENT_METRICS   # pylint:disable=global-statement
+    _CURRENT_METRICS = Metrics()
+    return _CURRENT_METRICS
+
+def stop_metrics():
+    """Disable instrumentation.
+
+    Returns:
+        The Metrics object in which spans and counters were recorded, or None if instrumentation
+        was not enabled.
+    """
+    global _CURRENT_METRICS   # pylint:disable=global-statement
+    metrics = _CURRENT_METRICS
+    _CURRENT_METRICS = None
+    return metrics
+
+def current_metrics():
+    """Get the current metrics.
+
+    Returns:
+        The Metrics object in which spans and counters are recorded, or None if instrumentation is
+        disabled.
+    """
+    return _CURRENT_METRICS
+
+def span(name):
+    """Measure the time spent in a block of code, if instrumentation is enabled.
+
+    Args:
+        name (str): The name of the span.
+    Returns:
+        A context manager.
+    """
+    if _CURRENT_METRICS is None:
+        return _NO_SPAN
+    return _CURRENT_METRICS.span(name)
+
+def add_time(name, seconds, count=1):
+    # pylint:disable=redefined-outer-name
+    """Add time to a span, if instrumentation is enabled. Used for time which is measured in an
+    inner loop, where entering a span for every iteration would be too expensive.
+
+    Args:
+        name (str): The name of the span.
+        seconds (float): The time to be added, in seconds.
+        count (int): The number of times the span was entered.
+    Returns:
+        None
+    """
+    if _CURRENT_METRICS is not None:
+        _CURRENT_METRICS.add_time(name, seconds, count)
+
+def count(name, increment=1):
+    """Increment a counter, if instrumentation is enabled.
+
+    Args:
+        name (str): The name of the counter.
+        increment (int): The amount by which the counter is incremented.
+    Returns:
+        None
+    """
+    if _CURRENT_METRICS is not None:
+        _CURRENT_METRICS.count(name, increment)
@@ -0,0 +1,185 @@
+"""K shortest loopless paths between two routers of a quantum network (Yen's algorithm)."""
+
+import heapq
+
+import instrumentation
+from fidelity import route_fidelity
+from route_computation import make_route
+from shortest_path import INFINITY, ShortestPathTree
+
+class KShortestPaths:
+    # pylint:disable=too-few-public-methods
+    """The loopless paths to a target router, in order of increasing length.
+
+    The paths are computed using Yen's algorithm: each path after the first is found by deviating
+    from a previously found path at one of its routers (the spur router), using a search from the
+    spur router to the target which avoids the routers before the spur router and the links by
+    which the previously found paths with the same prefix leave the spur router. Following Lawler,
+    only the routers at or after the point where a path deviated from its predecessor are used as
+    spur routers.
+
+    The spur searches are A* searches which use the distances to the target in the whole network as
+    the heuristic. These distances are computed once, in one shortest path tree rooted at the
+    target, and shared by all spur searches and all sources. Since the searches only remove routers
+    and links from the network, the heuristic never overestimates, and the searches go almost
+    straight to the target."""
+
+    def __init__(self, index, target_id, link_filter=None):
+        """Compute the shared search state for paths to a target router.
+
+        Args:
+            index (GraphIndex): The adjacency index of the network.
+            target_id (int): The router id of the target router.
+            link_filter: A function which takes a link id and returns True if paths may use the link
+                (e.g. because it has enough residual capacity), or None to allow all links.
+        """
+        self.index = index
+        self.target_id = target_id
+        self.link_filter = link_filter
+        self.distances_to_target = ShortestPathTree(index, target_id).distances
+
+    def path_ids(self, source_id):
+        """Generate the loopless paths from a source router to the target router, in order of
+        increasing length. Each path is only computed when it is requested, so the caller can stop
+        as soon as it has found a suitable path.
+
+        Args:
+            source_id (int): The router id of the source router.
+        Returns:
+            A generator of (length, router_ids, link_ids) tuples, where router_ids is the list of
+            router ids from the source to the target (inclusive) and link_ids is the list of link
+            ids traversed.
+        """
+        # pylint:disable=too-many-locals
+        first = self._search(source_id, set(), set())
+        if first is None:
+            return
+        length, router_ids, link_ids, distances = first
+        candidates = [(length, 0, router_ids, link_ids, distances, 0)]
+        seen_link_ids = {tuple(link_ids)}
+        found_link_ids = []
+        nr_candidates = 1
+        while candidates:
+            length, _, router_ids, link_ids, distances, deviation = heapq.heappop(candidates)
+            yield (length, router_ids, link_ids)
+            found_link_ids.append(link_ids)
+            for spur_position in range(deviation, len(link_ids)):
+                root_link_ids = link_ids[:spur_position]
+                blocked_links = {other_link_ids[spur_position] for other_link_ids in found_link_ids
+                                 if other_link_ids[:spur_position] == root_link_ids}
+                blocked_routers = set(router_ids[:spur_position])
+                spur = self._search(router_ids[spur_position], blocked_routers, blocked_links)
+                if spur is None:
+                    continue
+                spur_length, spur_router_ids, spur_link_ids, spur_distances = spur
+                new_link_ids = root_link_ids + spur_link_ids
+                key = tuple(new_link_ids)
+                if key in seen_link_ids:
+                    continue
+                seen_link_ids.add(key)
+                root_distance = distances[spur_position]
+                heapq.heappush(candidates, (
+                    root_distance + spur_length, nr_candidates,
+                    router_ids[:spur_position] + spur_router_ids, new_link_ids,
+                    distances[:spur_position] + [root_distance + distance
+                                                 for distance in spur_distances],
+                    spur_position))
+                nr_candidates += 1
+
+    def _search(self, start_id, blocked_routers, blocked_links):
+        # A* search from the start router to the target, avoiding the blocked routers and links.
+        # Returns a (length, router_ids, link_ids, distances) tuple, where distances are the
+        # distances from the start router to each router on the path, or None.
+        # pylint:disable=too-many-locals
+        index = self.index
+        offsets, neighbors, link_ids, lengths = index.columns()
+        heuristic = self.distances_to_target
+        link_filter = self.link_filter
+        target_id = self.target_id
+        if heuristic[start_id] == INFINITY:
+            return None
+        distances = {start_id: 0}
+        parents = {}
+        # Ties in the estimated length are broken in favor of the router furthest from the start,
+        # which keeps the search from exploring all equally short paths (e.g. in a grid).
+        heap = [(heuristic[start_id], 0, start_id)]
+        nr_heap_pushes = 1
+        result = None
+        while heap:
+            _estimate, negative_distance, router_id = heapq.heappop(heap)
+            distance = -negative_distance
+            if distance > distances[router_id]:
+                continue
+            if router_id == target_id:
+                result = _trace_path(start_id, target_id, distances, parents)
+                break
+            for position in range(offsets[router_id], offsets[router_id + 1]):
+                neighbor = neighbors[position]
+                link_id = link_ids[position]
+                if neighbor in blocked_routers or link_id in blocked_links:
+                    continue
+                if link_filter is not None and not link_filter(link_id):
+                    continue
+                new_distance = distance + lengths[position]
+                if new_distance < distances.get(neighbor, INFINITY):
+                    distances[neighbor] = new_distance
+                    parents[neighbor] = (router_id, link_id)
+                    heapq.heappush(heap, (new_distance + heuristic[neighbor], -new_distance,
+                                          neighbor))
+                    nr_heap_pushes += 1
+        instrumentation.count('spur-searches')
+        instrumentation.count('heap-pushes', nr_heap_pushes)
+        return result
+
+def _trace_path(start_id, target_id, distances, parents):
+    router_ids = [target_id]
+    link_ids = []
+    router_id = target_id
+    while router_id != start_id:
+        router_id, link_id = parents[router_id]
+        router_ids.append(router_id)
+        link_ids.append(link_id)
+    router_ids.reverse()
+    link_ids.reverse()
+    return (distances[target_id], router_ids, link_ids,
+            [distances[router_id] for router_id in router_ids])
+
+def k_shortest_routes(network, path, fidelity_model=None, link_filter=None, search=None):
+    # pylint:disable=too-many-arguments
+    """Generate the loopless routes for a path, in order of increasing length. Each route is only
+    computed when it is requested, so the caller can stop as soon as a route is feasible, e.g.:
+
+        for route in k_shortest_routes(network, path, fidelity_model):
+            if route.fidelity >= path.fidelity:
+                break
+
+    Args:
+        network (Network): The network on which the path is routed.
+        path (Path): The path.
+        fidelity_model (FidelityModel): The fidelity model used to compute the end-to-end fidelity
+            of each route, or None to not compute the fidelity.
+        link_filter: A function which takes a link id and returns True if routes may use the link
+            (e.g. because its residual capacity is at least the bandwidth of the path), or None to
+            allow all links.
+        search (KShortestPaths): The search state for paths to end-point 2 of the path, e.g. shared
+            with other paths to the same router, or None to create it.
+    Returns:
+        A generator of Route objects, from end-point 1 to end-point 2 of the path.
+    """
+    index = network.index()
+    source_id = index.router_ids[path.end_point_1.name]
+    target_id = index.router_ids[path.end_point_2.name]
+    if search is None:
+        search = KShortestPaths(index, target_id, link_filter)
+    assert search.index is index and search.target_id == target_id, \
+           "Search state is for a different target or an outdated index"
+    if fidelity_model is None:
+        link_fidelities = None
+    else:
+        link_fidelities = fidelity_model.link_fidelities(network)
+    for length, router_ids, link_ids in search.path_ids(source_id):
+        if link_fidelities is None:
+            fidelity = None
+        else:
+            fidelity = route_fidelity(link_fidelities, link_ids)
+        yield make_route(network, index, path, router_ids, link_ids, length, fidelity, False)
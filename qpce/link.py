@@ -11,13 +11,17 @@ class Link:
     as well as a classical link (can exchange classical messages). In other words, at this point
     we assume that the quantum topology and the classical topology are the same."""
 
-    def __init__(self, router_1, router_2, length):
+    __slots__ = ('router_1', 'router_2', 'length', 'capacity', 'port_1', 'port_2', 'link_id')
+
+    def __init__(self, router_1, router_2, length, capacity=None):
         """Initialize a link.
 
         Args:
             router_1 (Router): The first router object that the link is connected to.
             router_2 (Router): The second router object that the link is connected to.
             length (int): Length of the link in meters. Must be > 0.
+            capacity (int): Capacity of the link in Bell pairs per second. Must be > 0. None means
+                that the capacity of the link is unlimited.
 
         Links are bi-directional, so router_1 and router_2 can be reversed without consequence.
 
@@ -26,10 +30,15 @@ class Link:
         router to another port on the same router.
         """
         assert length > 0, f"Invalid length {length} for link, must be > 0."
+        assert capacity is None or capacity > 0, \
+               f"Invalid capacity {capacity} for link, must be > 0."
         assert router_1.network == router_2.network, \
                "Routers of the link are not in the same network"
         self.router_1 = router_1
         self.router_2 = router_2
         self.length = length
+        self.capacity = capacity
         self.port_1 = router_1.add_link(self)
         self.port_2 = router_2.add_link(self)
+        self.link_id = None             # Position in the links of the network (see Network.links)
+        router_1.network.add_link(self)
@@ -1,10 +1,33 @@
 """Quantum network."""
 
 import collections
+import contextlib
+import gc
+import itertools
+import sys
+
+from graph_index import GraphIndex
+from link import Link
+from router import Router
+
+@contextlib.contextmanager
+def garbage_collection_paused():
+    """A context manager which pauses the cyclic garbage collector. Used while creating many model
+    objects at once: the objects refer to each other, so every garbage collection pass would
+    traverse all objects created so far without freeing any of them.
+
+    Returns:
+        A context manager.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
 
 class Network:
-    # TODO: Remove this when we have more methods
-    # pylint:disable=too-few-public-methods
     """A quantum network.
 
     A quantum network object describes the topology and available resources in a quantum network. It
@@ -12,6 +35,10 @@ class Network:
 
     def __init__(self):
         self.routers = collections.OrderedDict()   # Router objects indexed by name
+        self.links = []                            # Link objects indexed by link id
+        self.generation = 0                        # Incremented on every topology change
+        self.coordinate_system = None              # Of the router coordinates, if any
+        self._index = None
 
     def add_router(self, router):
         """Add a quantum router to this quantum network.
@@ -24,3 +51,206 @@ class Network:
         assert router.name not in self.routers, \
                f"Network already contains a router with name {router.name}"
         self.routers[router.name] = router
+        self.topology_changed()
+
+    def add_routers_bulk(self, names, coordinates=None):
+        """Create quantum routers and add them to this quantum network.
+
+        This is equivalent to creating a Router object for each name, but all routers are validated
+        in one pass before any router is created, which is much faster for large networks.
+
+        Args:
+            names (list): The names of the quantum routers to be created.
+            coordinates (list): The coordinates of the quantum routers (see Router), or None if the
+                positions of the routers are unknown.
+        Returns:
+            A list of the newly created Router objects.
+        Raises:
+            AssertionError if a name occurs more than once, if there is already a router with the
+            same name in the network, or if the number of coordinates is not the number of names.
+            No routers are created in this case.
+        """
+        names = [sys.intern(name) for name in names]
+        if coordinates is None:
+            coordinates = itertools.repeat(None, len(names))
+        else:
+            assert len(coordinates) == len(names), "Router columns must have the same length"
+        unique_names = set(names)
+        if len(unique_names) != len(names) or not unique_names.isdisjoint(self.routers):
+            seen = set(self.routers)
+            for name in names:
+                assert name not in seen, f"Network already contains a router with name {name}"
+                seen.add(name)
+        routers = []
+        with garbage_collection_paused():
+            for name, router_coordinates in zip(names, coordinates):
+                router = Router.__new__(Router)
+                router.network = self
+                router.name = name
+                router.links = {}
+                router.next_available_port = 0
+                router.coordinates = router_coordinates
+                self.routers[name] = router
+                routers.append(router)
+        self.topology_changed()
+        return routers
+
+    def add_links_bulk(self, router_1_ids, router_2_ids, lengths, capacities=None):
+        # pylint:disable=too-many-locals
+        """Create quantum links and add them to this quantum network.
+
+        The links are given as columns: the i-th link connects the routers with ids router_1_ids[i]
+        and router_2_ids[i] (the position of the router in network.routers). This is equivalent to
+        creating a Link object for each link, but all links are validated in one pass before any
+        link is created, which is much faster for large networks.
+
+        Args:
+            router_1_ids (list): The ids of the first routers of the links.
+            router_2_ids (list): The ids of the second routers of the links.
+            lengths (list): The lengths of the links in meters. Must be > 0.
+            capacities (list): The capacities of the links in Bell pairs per second. Must be > 0,
+                or None for an unlimited capacity. If capacities is None, the capacity of all
+                links is unlimited.
+        Returns:
+            A list of the newly created Link objects.
+        Raises:
+            AssertionError if the columns have different lengths, a router id is unknown, a length
+            is not > 0, or a capacity is not > 0. No links are created in this case.
+        """
+        nr_links = len(lengths)
+        if capacities is None:
+            capacities = itertools.repeat(None, nr_links)
+        else:
+            assert len(capacities) == nr_links, "Link columns must have the same length"
+            given_capacities = [capacity for capacity in capacities if capacity is not None]
+            assert not given_capacities or min(given_capacities) > 0, \
+                   f"Invalid capacity {min(given_capacities)} for link, must be > 0."
+        assert len(router_1_ids) == nr_links and len(router_2_ids) == nr_links, \
+               "Link columns must have the same length"
+        if nr_links == 0:
+            return []
+        assert min(lengths) > 0, f"Invalid length {min(lengths)} for link, must be > 0."
+        nr_routers = len(self.routers)
+        for router_ids in (router_1_ids, router_2_ids):
+            assert min(router_ids) >= 0 and max(router_ids) < nr_routers, \
+                   "Link has a router id which is not the id of a router in the network"
+        routers = list(self.routers.values())
+        first_link_id = len(self.links)
+        links = []
+        with garbage_collection_paused():
+            for router_1_id, router_2_id, length, capacity in zip(router_1_ids, router_2_ids,
+                                                                  lengths, capacities):
+                router_1 = routers[router_1_id]
+                router_2 = routers[router_2_id]
+                link = Link.__new__(Link)
+                link.router_1 = router_1
+                link.router_2 = router_2
+                link.length = length
+                link.capacity = capacity
+                port_1 = router_1.next_available_port
+                router_1.next_available_port = port_1 + 1
+                router_1.links[port_1] = link
+                link.port_1 = port_1
+                port_2 = router_2.next_available_port
+                router_2.next_available_port = port_2 + 1
+                router_2.links[port_2] = link
+                link.port_2 = port_2
+                link.link_id = first_link_id + len(links)
+                links.append(link)
+        self.links.extend(links)
+        self.topology_changed()
+        return links
+
+    def add_link(self, link):
+        """Add a quantum link to this quantum network. The link must already have been attached to
+        its routers. The link gets the next link id.
+
+        Args:
+            link(Link): The quantum link to be added.
+        Returns:
+            None
+        """
+        link.link_id = len(self.links)
+        self.links.append(link)
+        self.topology_changed()
+
+    def remove_link(self, link):
+        """Remove a quantum link from this quantum network. The link is detached from its routers.
+        The ports of the other links on those routers are not changed.
+
+        The last link of the network takes the place (and the link id) of the removed link, so
+        that removing a link takes constant time. The link ids of all other links are not changed.
+
+        Args:
+            link(Link): The quantum link to be removed.
+        Returns:
+            None
+        """
+        link_id = link.link_id
+        assert link_id is not None and self.links[link_id] is link, \
+               "Network does not contain the link"
+        link.router_1.remove_link(link)
+        if link.router_2 is not link.router_1:
+            link.router_2.remove_link(link)
+        last_link = self.links.pop()
+        if last_link is not link:
+            self.links[link_id] = last_link
+            last_link.link_id = link_id
+        link.link_id = None
+        self.topology_changed()
+
+    def remove_router(self, router):
+        """Remove a quantum router, and all links attached to it, from this quantum network.
+
+        Args:
+            router(Router): The quantum router to be removed.
+        Returns:
+            A list of the Link objects that were removed.
+        """
+        assert self.routers.get(router.name) is router, \
+               f"Network does not contain router {router.name}"
+        removed_links = []
+        for _port, link in list(router.link_items()):
+            if link.router_1 is link.router_2 and link in removed_links:
+                continue
+            self.remove_link(link)
+            removed_links.append(link)
+        del self.routers[router.name]
+        self.topology_changed()
+        return removed_links
+
+    def change_link_length(self, link, length):
+        """Change the length of a quantum link in this quantum network.
+
+        Args:
+            link(Link): The quantum link.
+            length (int): New length of the link in meters. Must be > 0.
+        Returns:
+            None
+        """
+        assert length > 0, f"Invalid length {length} for link, must be > 0."
+        link.length = length
+        self.topology_changed()
+
+    def topology_changed(self):
+        """Invalidate all state derived from the topology of the network. Called whenever a router
+        or link is added, removed, or changed. The generation of the network is incremented, so
+        that state derived from the topology outside of the network (e.g. a route cache) can detect
+        that it is stale.
+
+        Returns:
+            None
+        """
+        self.generation += 1
+        self._index = None
+
+    def index(self):
+        """Get a compact adjacency index of the network. The index is built on first use and is
+        rebuilt after the topology of the network changes.
+
+        Returns:
+            A GraphIndex object.
+        """
+        if self._index is None:
+            self._index = GraphIndex(self)
+        return self._index
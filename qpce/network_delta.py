@@ -0,0 +1,447 @@
+"""Parsing of network delta YAML files, and applying them to a network in place.
+
+A network delta describes a small change to a network, e.g. as discovered by a topology discovery
+process: routers and links which are added or removed, and links whose length or capacity changed.
+Applying a delta only touches the routers and links which it mentions, so it is much cheaper than
+reading the whole changed network again. The ports of the links which are not removed do not
+change.
+
+A network delta YAML document has the following (optional) sections, which are applied in this
+order:
+
+ * add-routers: routers to be added, with the same attributes as in the network YAML file.
+
+ * add-links: links to be added, with the same attributes as in the network YAML file.
+
+ * change-links: links whose length and/or capacity change.
+
+ * remove-links: links to be removed.
+
+ * remove-routers: routers to be removed, by name. The links of a removed router are removed too.
+
+Links are identified by the names of their two routers (in either order). If there are several
+links between the same routers, the link must also be identified by its port on router-1.
+
+The whole delta is validated before the network is changed: if the delta is not valid, the network
+is not changed at all."""
+
+import yaml
+
+import coordinates
+import instrumentation
+from fast_validation import compile_schema
+from link import Link
+from network_yaml import LINK_SCHEMA, ROUTER_SCHEMA, ReadNetworkYamlError, RouterColumns
+from router import Router
+from yaml_stream import SafeLoader
+
+LINK_REFERENCE_SCHEMA = {
+    'router-1': {'type': 'string', 'required': True},
+    'router-2': {'type': 'string', 'required': True},
+    'port-1': {'type': 'integer', 'min': 0},
+}
+
+LINK_CHANGE_SCHEMA = dict(LINK_REFERENCE_SCHEMA, **{
+    'length': {'type': 'integer', 'min': 1},
+    'capacity': {'type': 'integer', 'min': 1},
+})
+
+ROUTER_REFERENCE_SCHEMA = {
+    'name': {'type': 'string', 'required': True},
+}
+
+def _list_of(schema):
+    return {'type': 'list', 'schema': {'type': 'dict', 'schema': schema}}
+
+NETWORK_DELTA_SCHEMA = {
+    'add-routers': _list_of(ROUTER_SCHEMA),
+    'add-links': _list_of(LINK_SCHEMA),
+    'change-links': _list_of(LINK_CHANGE_SCHEMA),
+    'remove-links': _list_of(LINK_REFERENCE_SCHEMA),
+    'remove-routers': _list_of(ROUTER_REFERENCE_SCHEMA),
+}
+
+NETWORK_DELTA_VALIDATOR = compile_schema(NETWORK_DELTA_SCHEMA)
+
+class ReadNetworkDeltaError(Exception):
+    """Exception is thrown when there is a problem reading or applying a network delta YAML file."""
+
+class NetworkChanges:
+    """The changes which were made to a network by applying a network delta. Used to update state
+    derived from the network (e.g. routes) incrementally."""
+
+    def __init__(self):
+        """Initialize an empty set of changes."""
+        self.added_routers = []
+        self.removed_routers = []
+        self.added_links = []
+        self.removed_links = []     # Including the links of the removed routers
+        self.changed_links = []     # (link, old length, old capacity) tuples
+
+    def __len__(self):
+        return (len(self.added_routers) + len(self.removed_routers) + len(self.added_links) +
+                len(self.removed_links) + len(self.changed_links))
+
+    def summary(self):
+        """Describe the changes in one line, e.g. for logging.
+
+        Returns:
+            A string.
+        """
+        counts = [("routers added", len(self.added_routers)),
+                  ("routers removed", len(self.removed_routers)),
+                  ("links added", len(self.added_links)),
+                  ("links removed", len(self.removed_links)),
+                  ("links changed", len(self.changed_links))]
+        return ", ".join(f"{what}: {count}" for what, count in counts if count) or "no changes"
+
+def apply_network_delta_file(network, filename):
+    """Read a network delta YAML document from a file and apply it to a network.
+
+    Args:
+        network (Network): The network to be changed.
+        filename (str): Filename of the network delta YAML file.
+    Returns:
+        A NetworkChanges object.
+    Raises:
+        ReadNetworkDeltaError: There was a problem reading or applying the network delta.
+    """
+    try:
+        file = open(filename, 'r')
+    except (OSError, IOError) as err:
+        message = f"Could not open network delta file {filename} ({err})"
+        raise ReadNetworkDeltaError(message)
+    with file:
+        return apply_network_delta(network, file)
+
+def apply_network_delta(network, stream):
+    """Read a network delta YAML document from a stream and apply it to a network.
+
+    Args:
+        network (Network): The network to be changed.
+        stream: Stream to read the network delta YAML document from.
+    Returns:
+        A NetworkChanges object.
+    Raises:
+        ReadNetworkDeltaError: There was a problem reading or applying the network delta. The
+            network is not changed in this case.
+    """
+    with instrumentation.span('network-delta'):
+        try:
+            delta_model = yaml.load(stream, Loader=SafeLoader)
+        except yaml.YAMLError as err:
+            message = f"Could not parse network delta YAML document ({err})"
+            raise ReadNetworkDeltaError(message)
+        if delta_model is None:
+            delta_model = {}
+        if not NETWORK_DELTA_VALIDATOR(delta_model):
+            check_network_delta_yaml(delta_model)
+        return apply_parsed_network_delta(network, delta_model)
+
+def check_network_delta_yaml(delta_model):
+    """Validate a parsed network delta YAML document using cerberus and report the errors. This is
+    only used for documents that fail the fast validation, to produce a detailed error report.
+
+    Args:
+        delta_model: The parsed network delta YAML document.
+    Returns:
+        None, if cerberus considers the document to be valid.
+    Raises:
+        ReadNetworkDeltaError: The document is not valid.
+    """
+    if not isinstance(delta_model, dict):
+        raise ReadNetworkDeltaError("Could not validate network delta YAML document "
+                                    "(must be a mapping)")
+    import cerberus   # pylint:disable=import-outside-toplevel
+    validator = cerberus.Validator(NETWORK_DELTA_SCHEMA)
+    if not validator.validate(delta_model):
+        message = f"Could not validate network delta YAML document ({validator.errors})"
+        raise ReadNetworkDeltaError(message)
+
+def apply_parsed_network_delta(network, delta_model):
+    """Apply a delta_model, i.e. a parsed network delta YAML file, to a network.
+
+    Args:
+        network (Network): The network to be changed.
+        delta_model: The parsed network delta YAML file.
+    Returns:
+        A NetworkChanges object.
+    Raises:
+        ReadNetworkDeltaError: The network delta does not apply to the network. The network is not
+            changed in this case.
+    """
+    plan = NetworkDeltaPlan(network)
+    plan.add_routers(delta_model.get('add-routers', []))
+    plan.add_links(delta_model.get('add-links', []))
+    plan.change_links(delta_model.get('change-links', []))
+    plan.remove_links(delta_model.get('remove-links', []))
+    plan.remove_routers(delta_model.get('remove-routers', []))
+    return plan.apply()
+
+class NetworkDeltaPlan:
+    """The validated changes of a network delta, which have not been applied to the network yet.
+
+    Routers which are added by the delta do not exist yet while the delta is validated, so routers
+    are referred to by name until the plan is applied."""
+
+    def __init__(self, network):
+        """Initialize an empty plan.
+
+        Args:
+            network (Network): The network to which the delta applies.
+        """
+        self.network = network
+        self.router_columns = RouterColumns()
+        self.router_columns.coordinate_system = network.coordinate_system
+        self.router_coordinates = {}     # Coordinates of the added routers, indexed by name
+        self.link_models = []            # Parsed YAML objects of the added links
+        self.link_changes = []           # (link, length, capacity) tuples
+        self.removed_links = []
+        self.removed_routers = []
+
+    def add_routers(self, router_models):
+        """Plan to add routers.
+
+        Args:
+            router_models: The parsed router YAML objects.
+        Returns:
+            None
+        Raises:
+            ReadNetworkDeltaError: A router already exists, or has invalid coordinates.
+        """
+        for router_model in router_models:
+            name = router_model['name']
+            if name in self.network.routers or name in self.router_coordinates:
+                raise ReadNetworkDeltaError(f"Cannot add router {name}, it already exists")
+            try:
+                self.router_coordinates[name] = self.router_columns.read_coordinates(router_model)
+            except ReadNetworkYamlError as err:
+                raise ReadNetworkDeltaError(str(err))
+
+    def add_links(self, link_models):
+        """Plan to add links.
+
+        Args:
+            link_models: The parsed link YAML objects.
+        Returns:
+            None
+        Raises:
+            ReadNetworkDeltaError: A router of a link does not exist, or a link is shorter than the
+                distance between its routers.
+        """
+        for link_model in link_models:
+            for field in ['router-1', 'router-2']:
+                name = link_model[field]
+                if name not in self.network.routers and name not in self.router_coordinates:
+                    raise ReadNetworkDeltaError(f"Link to be added has non-existent {field} {name}")
+            self.check_length(link_model['router-1'], link_model['router-2'],
+                              link_model['length'])
+            self.link_models.append(link_model)
+
+    def change_links(self, link_models):
+        """Plan to change the length and/or capacity of links.
+
+        Args:
+            link_models: The parsed link change YAML objects.
+        Returns:
+            None
+        Raises:
+            ReadNetworkDeltaError: A link does not exist, is changed twice, or a new length is
+                shorter than the distance between the routers of the link.
+        """
+        for link_model in link_models:
+            link = self.find_link(link_model, "change")
+            if any(changed_link is link for changed_link, _, _ in self.link_changes):
+                raise ReadNetworkDeltaError(f"Cannot change link between routers "
+                                            f"{link_model['router-1']} and "
+                                            f"{link_model['router-2']} twice")
+            length = link_model.get('length', link.length)
+            self.check_length(link.router_1.name, link.router_2.name, length)
+            self.link_changes.append((link, length, link_model.get('capacity', link.capacity)))
+
+    def remove_links(self, link_models):
+        """Plan to remove links.
+
+        Args:
+            link_models: The parsed link reference YAML objects.
+        Returns:
+            None
+        Raises:
+            ReadNetworkDeltaError: A link does not exist, or is removed twice.
+        """
+        for link_model in link_models:
+            link = self.find_link(link_model, "remove")
+            if link in self.removed_links:
+                raise ReadNetworkDeltaError(f"Cannot remove link between routers "
+                                            f"{link_model['router-1']} and "
+                                            f"{link_model['router-2']} twice")
+            self.removed_links.append(link)
+
+    def remove_routers(self, router_models):
+        """Plan to remove routers.
+
+        Args:
+            router_models: The parsed router reference YAML objects.
+        Returns:
+            None
+        Raises:
+            ReadNetworkDeltaError: A router does not exist, or is removed twice.
+        """
+        for router_model in router_models:
+            name = router_model['name']
+            router = self.network.routers.get(name)
+            if router is None:
+                raise ReadNetworkDeltaError(f"Cannot remove router {name}, it does not exist")
+            if router in self.removed_routers:
+                raise ReadNetworkDeltaError(f"Cannot remove router {name} twice")
+            self.removed_routers.append(router)
+
+    def find_link(self, link_model, action):
+        """Find an existing link.
+
+        Args:
+            link_model: The parsed YAML object which identifies the link.
+            action (str): What is done to the link, for error messages.
+        Returns:
+            The Link object.
+        Raises:
+            ReadNetworkDeltaError: There is no such link, or the link is ambiguous.
+        """
+        router_1_name = link_model['router-1']
+        router_2_name = link_model['router-2']
+        description = f"link between routers {router_1_name} and {router_2_name}"
+        router_1 = self.network.routers.get(router_1_name)
+        router_2 = self.network.routers.get(router_2_name)
+        if router_1 is None or router_2 is None:
+            raise ReadNetworkDeltaError(f"Cannot {action} {description}, router does not exist")
+        port_1 = link_model.get('port-1')
+        links = [(port, link) for port, link in router_1.link_items()
+                 if {link.router_1, link.router_2} == {router_1, router_2} and
+                 port_1 in (None, port)]
+        if not links:
+            raise ReadNetworkDeltaError(f"Cannot {action} {description}, link does not exist")
+        if len({link for _port, link in links}) > 1:
+            raise ReadNetworkDeltaError(f"Cannot {action} {description}, there are several such "
+                                        f"links (use port-1 to select one)")
+        return links[0][1]
+
+    def check_length(self, router_1_name, router_2_name, length):
+        """Check that a link is not shorter than the distance between its routers (see
+        LinkColumns.check_lengths).
+
+        Args:
+            router_1_name (str): The name of the first router of the link.
+            router_2_name (str): The name of the second router of the link.
+            length (int): The length of the link in meters.
+        Returns:
+            None
+        Raises:
+            ReadNetworkDeltaError: The link is shorter than the distance between its routers.
+        """
+        coordinate_system = self.router_columns.coordinate_system
+        if coordinate_system is None:
+            return
+        coordinates_1 = self.coordinates_of_router(router_1_name)
+        coordinates_2 = self.coordinates_of_router(router_2_name)
+        if coordinates_1 is None or coordinates_2 is None:
+            return
+        router_distance = coordinates.distance(coordinate_system, coordinates_1, coordinates_2)
+        if length + coordinates.LENGTH_TOLERANCE < router_distance:
+            raise ReadNetworkDeltaError(
+                f"Link between routers {router_1_name} and {router_2_name} has length {length}, "
+                f"which is shorter than the distance {router_distance:.0f} between the routers")
+
+    def coordinates_of_router(self, name):
+        """Get the coordinates of an existing or added router.
+
+        Args:
+            name (str): The name of the router.
+        Returns:
+            The coordinates of the router, or None if the router has no coordinates.
+        """
+        if name in self.router_coordinates:
+            return self.router_coordinates[name]
+        return self.network.routers[name].coordinates
+
+    def apply(self):
+        """Apply the planned changes to the network.
+
+        Returns:
+            A NetworkChanges object.
+        """
+        network = self.network
+        changes = NetworkChanges()
+        if self.router_coordinates:
+            network.coordinate_system = self.router_columns.coordinate_system
+        for name, router_coordinates in self.router_coordinates.items():
+            changes.added_routers.append(Router(network, name, router_coordinates))
+        for link_model in self.link_models:
+            changes.added_links.append(Link(network.routers[link_model['router-1']],
+                                            network.routers[link_model['router-2']],
+                                            link_model['length'], link_model.get('capacity')))
+        for link, length, capacity in self.link_changes:
+            changes.changed_links.append((link, link.length, link.capacity))
+            if length != link.length:
+                network.change_link_length(link, length)
+            link.capacity = capacity
+        for link in self.removed_links:
+            network.remove_link(link)
+            changes.removed_links.append(link)
+        for router in self.removed_routers:
+            changes.removed_links.extend(network.remove_router(router))
+            changes.removed_routers.append(router)
+        return changes
+
+def plan_network_update(network, new_network):
+    """Plan the changes which turn a network into another version of the same network, e.g. the
+    network read again after its network YAML file was edited.
+
+    Routers are matched by name, and links by the names of their routers. Parallel links between
+    the same routers are matched in the order in which they were added to the network.
+
+    Args:
+        network (Network): The network to be changed.
+        new_network (Network): The new version of the network. It is not changed.
+    Returns:
+        A NetworkDeltaPlan object, or None if the networks differ in a way which can not be applied
+        as a delta (i.e. the coordinates of a router changed).
+    """
+    # pylint:disable=too-many-locals
+    plan = NetworkDeltaPlan(network)
+    if new_network.coordinate_system is not None:
+        if network.coordinate_system not in (None, new_network.coordinate_system):
+            return None
+        plan.router_columns.coordinate_system = new_network.coordinate_system
+    routers = network.routers
+    for name, new_router in new_network.routers.items():
+        router = routers.get(name)
+        if router is None:
+            plan.router_coordinates[name] = new_router.coordinates
+        elif router.coordinates != new_router.coordinates:
+            return None
+    plan.removed_routers = [router for name, router in routers.items()
+                            if name not in new_network.routers]
+    links_by_routers = {}
+    for link in network.links:
+        links_by_routers.setdefault(_routers_key(link), []).append(link)
+    for new_link in new_network.links:
+        links = links_by_routers.get(_routers_key(new_link))
+        if not links:
+            plan.link_models.append({'router-1': new_link.router_1.name,
+                                     'router-2': new_link.router_2.name,
+                                     'length': new_link.length,
+                                     'capacity': new_link.capacity})
+            continue
+        link = links.pop(0)
+        if link.length != new_link.length or link.capacity != new_link.capacity:
+            plan.link_changes.append((link, new_link.length, new_link.capacity))
+    removed_routers = set(plan.removed_routers)
+    plan.removed_links = [link for links in links_by_routers.values() for link in links
+                          if link.router_1 not in removed_routers and
+                          link.router_2 not in removed_routers]
+    return plan
+
+def _routers_key(link):
+    name_1 = link.router_1.name
+    name_2 = link.router_2.name
+    return (name_1, name_2) if name_1 <= name_2 else (name_2, name_1)
@@ -0,0 +1,374 @@
+"""Binary snapshots of quantum networks.
+
+A snapshot is a compact binary representation of a network, which can be loaded much faster than a
+network YAML file: the snapshot is memory-mapped, the adjacency index of the network is used
+directly from the memory-mapped file, and Router and Link objects are only created when they are
+touched.
+
+All integers in a snapshot are 64-bit signed integers in the native byte order of the machine that
+wrote the snapshot. The layout of a snapshot is:
+
+ * The header: the magic bytes, the byte order, the number of routers, the number of links, and the
+   size of the router name table.
+
+ * For each router: the offset of its name in the router name table (plus one final offset for the
+   end of the table), and the next available port on the router.
+
+ * For each link: the router ids of its two routers, its length, its capacity (-1 for unlimited),
+   and the ports on its two routers.
+
+ * The adjacency index (see GraphIndex) of the network: the offsets, the neighbors, the link ids and
+   lengths, plus the local port for each adjacency.
+
+ * The router name table: the UTF-8 encoded router names, padded to a multiple of 8 bytes.
+
+Router coordinates are not stored in a snapshot, so path searches on a network loaded from a
+snapshot are not guided by the positions of the routers."""
+
+import array
+import collections.abc
+import mmap
+import struct
+import sys
+
+import instrumentation
+from graph_index import GraphIndex
+from link import Link
+from network import Network
+from router import Router
+
+MAGIC = b'QPCESNAP'
+VERSION = 1
+HEADER_FORMAT = '=8sIIqqq'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+BYTE_ORDERS = {'little': 1, 'big': 2}
+INTEGER_SIZE = 8
+NO_CAPACITY = -1
+
+class NetworkSnapshotError(Exception):
+    """Exception is thrown when there is a problem reading or writing a network snapshot."""
+
+def is_network_snapshot_file(filename):
+    """Determine whether a file is a network snapshot (as opposed to e.g. a network YAML file).
+
+    Args:
+        filename (str): Filename of the file.
+    Returns:
+        True if the file starts with the magic bytes of a network snapshot.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except (OSError, IOError):
+        return False
+
+def read_network_file(filename):
+    """Read a network from a network YAML file or from a network snapshot file.
+
+    Args:
+        filename (str): Filename of the network file.
+    Returns:
+        A Network object.
+    Raises:
+        ReadNetworkYamlError: There was a problem reading the network YAML file.
+        NetworkSnapshotError: There was a problem reading the network snapshot.
+    """
+    if is_network_snapshot_file(filename):
+        return read_network_snapshot_file(filename)
+    # Imported here, so that the YAML parser is not imported when reading a snapshot.
+    import network_yaml   # pylint:disable=import-outside-toplevel
+    return network_yaml.read_network_from_yaml_file(filename)
+
+def write_network_snapshot_file(filename, network):
+    """Write a snapshot of a network to a file.
+
+    Args:
+        filename (str): Filename of the file to write the snapshot to.
+        network (Network): The network.
+    Returns:
+        None
+    Raises:
+        NetworkSnapshotError: There was a problem writing the snapshot.
+    """
+    try:
+        file = open(filename, 'wb')
+    except (OSError, IOError) as err:
+        message = f"Could not open network snapshot file {filename} ({err})"
+        raise NetworkSnapshotError(message)
+    with file:
+        for chunk in network_snapshot_chunks(network):
+            file.write(chunk)
+
+def network_snapshot_chunks(network):
+    """Generate the contents of a snapshot of a network.
+
+    Args:
+        network (Network): The network.
+    Returns:
+        A generator of byte strings, which together form the snapshot.
+    """
+    # pylint:disable=too-many-locals
+    index = network.index()
+    router_ids = index.router_ids
+    names = bytearray()
+    name_offsets = array.array('q', [0])
+    next_ports = array.array('q')
+    adjacency_ports = array.array('q')
+    for router in network.routers.values():
+        names += router.name.encode('utf-8')
+        name_offsets.append(len(names))
+        next_ports.append(router.next_available_port)
+        adjacency_ports.extend(port for port, _link in router.link_items())
+    names += b'\0' * (-len(names) % INTEGER_SIZE)
+    link_columns = [array.array('q') for _ in range(6)]
+    for link in network.links:
+        for column, value in zip(link_columns, [router_ids[link.router_1.name],
+                                                router_ids[link.router_2.name],
+                                                link.length,
+                                                NO_CAPACITY if link.capacity is None
+                                                else link.capacity,
+                                                link.port_1,
+                                                link.port_2]):
+            column.append(value)
+    yield struct.pack(HEADER_FORMAT, MAGIC, VERSION, BYTE_ORDERS[sys.byteorder],
+                      len(network.routers), len(network.links), len(names))
+    yield name_offsets.tobytes()
+    yield next_ports.tobytes()
+    for column in link_columns:
+        yield column.tobytes()
+    for column in [index.offsets, index.neighbors, index.link_ids, index.lengths, adjacency_ports]:
+        yield array.array('q', column).tobytes()
+    yield bytes(names)
+
+def read_network_snapshot_file(filename):
+    """Read a network snapshot from a file. The file is memory-mapped; the routers and links of the
+    network are only created when they are touched.
+
+    Args:
+        filename (str): Filename of the file to read the snapshot from.
+    Returns:
+        A SnapshotNetwork object.
+    Raises:
+        NetworkSnapshotError: There was a problem reading the snapshot.
+    """
+    with instrumentation.span('snapshot-read'):
+        try:
+            with open(filename, 'rb') as file:
+                mapped_file = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, IOError, ValueError) as err:
+            message = f"Could not open network snapshot file {filename} ({err})"
+            raise NetworkSnapshotError(message)
+        network = SnapshotNetwork(NetworkSnapshot(mapped_file))
+    instrumentation.count('routers', len(network.routers))
+    instrumentation.count('links', len(network.links))
+    return network
+
+class NetworkSnapshot:
+    # pylint:disable=too-few-public-methods,too-many-instance-attributes,too-many-locals
+    # pylint:disable=unbalanced-tuple-unpacking
+    """The arrays in a memory-mapped network snapshot."""
+
+    def __init__(self, buffer):
+        """Parse the header of a network snapshot and create views of its arrays.
+
+        Args:
+            buffer: The contents of the snapshot (e.g. a memory-mapped file).
+        Raises:
+            NetworkSnapshotError: The snapshot is not valid.
+        """
+        if len(buffer) < HEADER_SIZE:
+            raise NetworkSnapshotError("Network snapshot is truncated")
+        magic, version, byte_order, nr_routers, nr_links, names_size = \
+            struct.unpack_from(HEADER_FORMAT, buffer)
+        if magic != MAGIC:
+            raise NetworkSnapshotError("File is not a network snapshot")
+        if version != VERSION:
+            raise NetworkSnapshotError(f"Unsupported network snapshot version {version}")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise NetworkSnapshotError("Network snapshot was written with a different byte order")
+        nr_adjacencies = 2 * nr_links
+        sizes = [nr_routers + 1, nr_routers] + [nr_links] * 6 + \
+                [nr_routers + 1] + [nr_adjacencies] * 4
+        if len(buffer) != HEADER_SIZE + INTEGER_SIZE * sum(sizes) + names_size:
+            raise NetworkSnapshotError("Network snapshot is truncated or corrupt")
+        self.buffer = buffer
+        view = memoryview(buffer)
+        position = HEADER_SIZE
+        arrays = []
+        for size in sizes:
+            end = position + INTEGER_SIZE * size
+            arrays.append(view[position:end].cast('q'))
+            position = end
+        (self.name_offsets, self.next_ports, self.link_router_1s, self.link_router_2s,
+         self.link_lengths, self.link_capacities, self.link_port_1s, self.link_port_2s,
+         offsets, neighbors, link_ids, lengths, self.adjacency_ports) = arrays
+        names = bytes(view[position:position + names_size])
+        name_offsets = self.name_offsets
+        router_names = [names[name_offsets[router_id]:name_offsets[router_id + 1]].decode('utf-8')
+                        for router_id in range(nr_routers)]
+        self.nr_links = nr_links
+        self.index = GraphIndex.from_arrays(router_names, offsets, neighbors, link_ids, lengths)
+
+class SnapshotNetwork(Network):
+    """A quantum network loaded from a network snapshot.
+
+    The network starts out with the adjacency index from the snapshot, and Router and Link objects
+    are created on demand when they are first touched. Before the topology of the network is
+    changed, all routers and links are created and the network becomes an ordinary network."""
+
+    def __init__(self, snapshot):
+        """Initialize a network from a network snapshot.
+
+        Args:
+            snapshot (NetworkSnapshot): The snapshot.
+        """
+        super().__init__()
+        self.snapshot = snapshot
+        self.routers = LazyRouters(self)
+        self.links = LazyLinks(self)
+        self._index = snapshot.index
+        self._materialized = False
+
+    def materialize(self):
+        """Create all routers and links which have not been touched yet, and replace the lazy
+        collections of routers and links by ordinary ones.
+
+        Returns:
+            None
+        """
+        if self._materialized:
+            return
+        routers = collections.OrderedDict()
+        for name in self.snapshot.index.router_names:
+            router = self.routers[name]
+            _links = router.links
+            routers[name] = router
+        self.links = list(self.links)
+        self.routers = routers
+        self._materialized = True
+
+    def add_router(self, router):
+        self.materialize()
+        super().add_router(router)
+
+    def add_routers_bulk(self, names, coordinates=None):
+        self.materialize()
+        return super().add_routers_bulk(names, coordinates)
+
+    def add_link(self, link):
+        self.materialize()
+        super().add_link(link)
+
+    def add_links_bulk(self, router_1_ids, router_2_ids, lengths, capacities=None):
+        self.materialize()
+        return super().add_links_bulk(router_1_ids, router_2_ids, lengths, capacities)
+
+    def remove_link(self, link):
+        self.materialize()
+        super().remove_link(link)
+
+    def remove_router(self, router):
+        self.materialize()
+        return super().remove_router(router)
+
+    def change_link_length(self, link, length):
+        self.materialize()
+        super().change_link_length(link, length)
+
+class LazyRouters(collections.abc.Mapping):
+    """The routers of a snapshot network, indexed by name. Router objects are created when they are
+    first looked up."""
+
+    def __init__(self, network):
+        self._network = network
+        self._router_ids = network.snapshot.index.router_ids
+        self._routers = {}
+
+    def __getitem__(self, name):
+        router = self._routers.get(name)
+        if router is None:
+            router_id = self._router_ids[name]
+            router = SnapshotRouter(self._network, name, router_id)
+            self._routers[name] = router
+        return router
+
+    def __contains__(self, name):
+        return name in self._router_ids
+
+    def __iter__(self):
+        return iter(self._network.snapshot.index.router_names)
+
+    def __len__(self):
+        return len(self._router_ids)
+
+class LazyLinks(collections.abc.Sequence):
+    """The links of a snapshot network, indexed by link id. Link objects are created when they are
+    first looked up."""
+
+    def __init__(self, network):
+        self._network = network
+        self._links = [None] * network.snapshot.nr_links
+
+    def __getitem__(self, link_id):
+        if isinstance(link_id, slice):
+            return [self[index] for index in range(*link_id.indices(len(self)))]
+        link = self._links[link_id]
+        if link is None:
+            link = self._materialize_link(link_id)
+            self._links[link_id] = link
+        return link
+
+    def __len__(self):
+        return len(self._links)
+
+    def _materialize_link(self, link_id):
+        snapshot = self._network.snapshot
+        router_names = snapshot.index.router_names
+        routers = self._network.routers
+        capacity = snapshot.link_capacities[link_id]
+        link = Link.__new__(Link)
+        link.router_1 = routers[router_names[snapshot.link_router_1s[link_id]]]
+        link.router_2 = routers[router_names[snapshot.link_router_2s[link_id]]]
+        link.length = snapshot.link_lengths[link_id]
+        link.capacity = None if capacity == NO_CAPACITY else capacity
+        link.port_1 = snapshot.link_port_1s[link_id]
+        link.port_2 = snapshot.link_port_2s[link_id]
+        link.link_id = link_id
+        return link
+
+class SnapshotRouter(Router):
+    """A router of a snapshot network. The links of the router are created when they are first
+    touched."""
+
+    # The router is not added to the network, it is already part of the snapshot.
+    # pylint:disable=super-init-not-called
+
+    __slots__ = ('_router_id', '_links')
+
+    def __init__(self, network, name, router_id):
+        """Initialize a router from a network snapshot.
+
+        Args:
+            network (SnapshotNetwork): The network.
+            name (str): The name of the router.
+            router_id (int): The id of the router in the snapshot.
+        """
+        self.network = network
+        self.name = name
+        self.coordinates = None
+        self.next_available_port = network.snapshot.next_ports[router_id]
+        self._router_id = router_id
+        self._links = None
+
+    @property
+    def links(self):
+        """Link objects indexed by local port, in port order."""
+        if self._links is None:
+            snapshot = self.network.snapshot
+            index = snapshot.index
+            links = self.network.links
+            self._links = {}
+            for position in range(index.offsets[self._router_id],
+                                  index.offsets[self._router_id + 1]):
+                self._links[snapshot.adjacency_ports[position]] = links[index.link_ids[position]]
+        return self._links
@@ -1,20 +1,35 @@
 """Parsing of the network YAML file."""
 
+import math
+import time
+
 import yaml
-import cerberus
 
-from link import Link
+import coordinates
+import instrumentation
+from fast_validation import compile_schema
 from network import Network
-from router import Router
+from yaml_stream import SafeLoader, YamlNodeReader
 
 ROUTER_SCHEMA = {
     'name': {'type': 'string', 'required': True},
+    'x': {'type': 'number'},
+    'y': {'type': 'number'},
+    'latitude': {'type': 'number', 'min': -90, 'max': 90},
+    'longitude': {'type': 'number', 'min': -180, 'max': 180},
+}
+
+# The fields of the router coordinates in each coordinate system.
+COORDINATE_FIELDS = {
+    coordinates.PLANAR: ('x', 'y'),
+    coordinates.GEOGRAPHIC: ('latitude', 'longitude'),
 }
 
 LINK_SCHEMA = {
     'router-1': {'type': 'string', 'required': True},
     'router-2': {'type': 'string', 'required': True},
     'length':  {'type': 'integer', 'required': True, 'min': 1},
+    'capacity':  {'type': 'integer', 'min': 1},
 }
 
 NETWORK_SCHEMA = {
@@ -34,12 +49,17 @@ NETWORK_SCHEMA = {
     },
 }
 
+SECTION_SCHEMAS = {
+    'routers': ROUTER_SCHEMA,
+    'links': LINK_SCHEMA,
+}
+
+SECTION_VALIDATORS = {section: compile_schema(schema)
+                      for section, schema in SECTION_SCHEMAS.items()}
+
 class ReadNetworkYamlError(Exception):
     """Exception is thrown when there is a problem reading the network YAML file."""
 
-class NetworkValidator(cerberus.Validator):
-    """The NetworkValidator class is used to validate the correctness of a network YAML file."""
-
 def read_network_from_yaml_file(filename):
     """Read and parse a network YAML document from a file.
 
@@ -51,7 +71,8 @@ def read_network_from_yaml_file(filename):
         ReadNetworkYamlError: There was a problem reading the network model.
     """
     try:
-        file = open(filename, 'r')
+        with instrumentation.span('network-file-open'):
+            file = open(filename, 'r')
     except (OSError, IOError) as err:
         message = f"Could not open network file {filename} ({err})"
         raise ReadNetworkYamlError(message)
@@ -62,6 +83,14 @@ def read_network_from_yaml_stream(stream):
     """Read and parse a network YAML document from a stream and return the corresponding network
     model.
 
+    The document is read as a stream of YAML events. Each router and link entry is composed,
+    validated and turned into an object as soon as it has been read, so the parsed document as a
+    whole is never held in memory.
+
+    The time spent reading the document is broken down into instrumentation spans: parsing the YAML
+    entries, validating them, normalizing them (looking up the routers of the links), and
+    constructing the network.
+
     Args:
         stream: Stream to read the network YAML document from.
     Returns:
@@ -69,18 +98,81 @@ def read_network_from_yaml_stream(stream):
     Raises:
         ReadNetworkYamlError: There was a problem reading the network model.
     """
+    loader = SafeLoader(stream)
     try:
-        network_model = yaml.safe_load(stream)
+        with instrumentation.span('network-read'):
+            network = read_network_from_yaml_loader(loader)
+        instrumentation.count('routers', len(network.routers))
+        instrumentation.count('links', len(network.links))
+        return network
     except yaml.YAMLError as err:
         message = f"Could not parse network YAML document ({err})"
         raise ReadNetworkYamlError(message)
-    validator = NetworkValidator(NETWORK_SCHEMA)
-    if not validator.validate(network_model, NETWORK_SCHEMA):
-        message = f"Could not validate network YAMLdocument"
-        raise ReadNetworkYamlError(message)
-        # TODO: Better error message, reporting validator.errors using pretty printer
-    network_model = validator.normalized(network_model)
-    return read_network_from_parsed_yaml(network_model)
+    finally:
+        loader.dispose()
+
+def read_network_from_yaml_loader(loader):
+    """Read a network YAML document from the event stream of a YAML loader, and return the
+    corresponding network model.
+
+    The routers and links are collected in columns and added to the network in bulk. If the links
+    are listed before the routers in the document, the link entries are kept until the routers have
+    been read.
+
+    Args:
+        loader: The YAML loader, positioned at the start of the stream.
+    Returns:
+        A Network object.
+    Raises:
+        ReadNetworkYamlError: There was a problem reading the network model.
+        yaml.YAMLError: There was a problem parsing the YAML document.
+    """
+    network = Network()
+    reader = YamlNodeReader(loader)
+    router_columns = RouterColumns()
+    link_columns = LinkColumns()
+    pending_link_models = []
+    sections_read = set()
+    loader.get_event()
+    if loader.check_event(yaml.StreamEndEvent):
+        raise ReadNetworkYamlError("Could not validate network YAML document (document is empty)")
+    loader.get_event()
+    if not loader.check_event(yaml.MappingStartEvent):
+        raise ReadNetworkYamlError("Could not validate network YAML document (must be a mapping)")
+    loader.get_event()
+    while not loader.check_event(yaml.MappingEndEvent):
+        section = reader.read()
+        if section not in SECTION_SCHEMAS:
+            raise ReadNetworkYamlError(f"Could not validate network YAML document "
+                                       f"(unknown field {section})")
+        if section in sections_read:
+            raise ReadNetworkYamlError(f"Could not validate network YAML document "
+                                       f"(duplicate field {section})")
+        if section == 'routers':
+            router_columns.extend(read_yaml_section(reader, section))
+            with instrumentation.span('network-construction'):
+                router_columns.add_to_network(network)
+            link_columns.router_ids = router_ids_of_network(network)
+        elif 'routers' in sections_read:
+            link_columns.extend(read_yaml_section(reader, section))
+        else:
+            pending_link_models.extend(read_yaml_section(reader, section))
+        sections_read.add(section)
+    loader.get_event()
+    loader.get_event()
+    if not loader.check_event(yaml.StreamEndEvent):
+        raise ReadNetworkYamlError("Could not parse network YAML document "
+                                   "(expected a single document in the stream)")
+    if pending_link_models:
+        with instrumentation.span('network-normalization'):
+            link_columns.router_ids = router_ids_of_network(network)
+            for link_model in pending_link_models:
+                link_columns.append(link_model)
+    with instrumentation.span('network-validation'):
+        link_columns.check_lengths(router_columns)
+    with instrumentation.span('network-construction'):
+        link_columns.add_to_network(network)
+    return network
 
 def read_network_from_parsed_yaml(network_model):
     """Create a Network object from a network_model, i.e. from parsed YAML file.
@@ -93,44 +185,290 @@ def read_network_from_parsed_yaml(network_model):
         ReadNetworkYamlError: There was a problem reading the network model.
     """
     network = Network()
-    if 'routers' in network_model:
-        for router_model in network_model['routers']:
-            _router = read_router_from_parsed_yaml(router_model, network)
-    if 'links' in network_model:
-        for link_model in network_model['links']:
-            _link = read_link_from_parsed_yaml(link_model, network)
+    router_columns = RouterColumns()
+    router_columns.extend(network_model.get('routers', []))
+    router_columns.add_to_network(network)
+    link_columns = LinkColumns(router_ids_of_network(network))
+    for link_model in network_model.get('links', []):
+        link_columns.append(link_model)
+    link_columns.check_lengths(router_columns)
+    link_columns.add_to_network(network)
     return network
 
-def read_router_from_parsed_yaml(router_model, network):
-    """Create a Router object from a router_model, i.e. from parsed YAML file.
+def router_ids_of_network(network):
+    """Get the router ids of the routers in a network.
 
     Args:
-        router_model: The parsed router YAML object.
-        network: Create the Router object in this network.
+        network (Network): The network.
     Returns:
-        The newly created Router object.
+        A dictionary of router ids (positions in network.routers) indexed by router name.
     """
-    return Router(network=network, name=router_model['name'])
+    return {name: router_id for router_id, name in enumerate(network.routers)}
+
+class RouterColumns:
+    """The parsed router YAML objects of a network YAML document, collected in columns so that the
+    routers can be added to the network in bulk (see Network.add_routers_bulk).
+
+    Routers may have planar coordinates (x and y, in meters) or geographic coordinates (latitude
+    and longitude, in degrees), but all routers with coordinates must use the same coordinate
+    system."""
+
+    def __init__(self):
+        """Initialize empty router columns."""
+        self.names = []
+        self.coordinates = []
+        self.coordinate_system = None
+
+    def append(self, router_model):
+        """Append a router to the columns.
+
+        Args:
+            router_model: The parsed router YAML object.
+        Returns:
+            None
+        Raises:
+            ReadNetworkYamlError: The coordinates of the router are incomplete, or are in a
+                different coordinate system than those of the other routers.
+        """
+        self.names.append(router_model['name'])
+        self.coordinates.append(self.read_coordinates(router_model))
 
-def read_link_from_parsed_yaml(link_model, network):
-    """Create a Link object from a link_model, i.e. from parsed YAML file.
+    def extend(self, router_models):
+        """Append routers to the columns.
+
+        Args:
+            router_models: An iterable of parsed router YAML objects.
+        Returns:
+            None
+        Raises:
+            ReadNetworkYamlError: The coordinates of a router are not valid (see append).
+        """
+        for router_model in router_models:
+            self.append(router_model)
+
+    def read_coordinates(self, router_model):
+        """Read the coordinates of a router.
+
+        Args:
+            router_model: The parsed router YAML object.
+        Returns:
+            The coordinates of the router as a tuple, or None if the router has no coordinates.
+        Raises:
+            ReadNetworkYamlError: The coordinates of the router are incomplete, not finite, or in a
+                different coordinate system than those of the other routers.
+        """
+        name = router_model['name']
+        router_coordinates = None
+        for coordinate_system, fields in COORDINATE_FIELDS.items():
+            present_fields = [field for field in fields if field in router_model]
+            if not present_fields:
+                continue
+            if len(present_fields) != len(fields):
+                missing_field = [field for field in fields if field not in router_model][0]
+                raise ReadNetworkYamlError(f"Router {name} has {present_fields[0]} but no "
+                                           f"{missing_field}")
+            if router_coordinates is not None:
+                raise ReadNetworkYamlError(f"Router {name} has both planar and geographic "
+                                           f"coordinates")
+            router_coordinates = tuple(router_model[field] for field in fields)
+            if not all(math.isfinite(value) for value in router_coordinates):
+                raise ReadNetworkYamlError(f"Router {name} has coordinates which are not finite")
+            if self.coordinate_system is None:
+                self.coordinate_system = coordinate_system
+            elif self.coordinate_system != coordinate_system:
+                raise ReadNetworkYamlError(f"Router {name} has {coordinate_system} coordinates, "
+                                           f"but other routers have {self.coordinate_system} "
+                                           f"coordinates")
+        return router_coordinates
+
+    def add_to_network(self, network):
+        """Create the routers in the columns and add them to a network.
+
+        Args:
+            network (Network): The network.
+        Returns:
+            A list of the newly created Router objects.
+        """
+        if self.coordinate_system is not None:
+            network.coordinate_system = self.coordinate_system
+        return network.add_routers_bulk(self.names, self.coordinates)
+
+class LinkColumns:
+    """The parsed link YAML objects of a network YAML document, collected in columns so that the
+    links can be added to the network in bulk (see Network.add_links_bulk)."""
+
+    def __init__(self, router_ids=None):
+        """Initialize empty link columns.
+
+        Args:
+            router_ids (dict): The router ids indexed by router name, used to look up the routers of
+                the links. May be set later, but must be set before any link is appended.
+        """
+        self.router_ids = router_ids
+        self.router_1_ids = []
+        self.router_2_ids = []
+        self.lengths = []
+        self.capacities = []
+
+    def append(self, link_model):
+        """Append a link to the columns.
+
+        Args:
+            link_model: The parsed link YAML object.
+        Returns:
+            None
+        Raises:
+            ReadNetworkYamlError: One of the routers of the link does not exist.
+        """
+        router_1_name = link_model['router-1']
+        router_1_id = self.router_ids.get(router_1_name)
+        if router_1_id is None:
+            raise ReadNetworkYamlError(f"Link has non-existent router-1 {router_1_name}")
+        router_2_name = link_model['router-2']
+        router_2_id = self.router_ids.get(router_2_name)
+        if router_2_id is None:
+            raise ReadNetworkYamlError(f"Link has non-existent router-2 {router_2_name}")
+        self.router_1_ids.append(router_1_id)
+        self.router_2_ids.append(router_2_id)
+        self.lengths.append(link_model['length'])
+        self.capacities.append(link_model.get('capacity'))
+
+    def extend(self, link_models):
+        """Append links to the columns. If instrumentation is enabled, the time spent appending
+        (but not the time spent producing the links) is recorded as network normalization.
+
+        Args:
+            link_models: An iterable of parsed link YAML objects.
+        Returns:
+            None
+        Raises:
+            ReadNetworkYamlError: One of the routers of a link does not exist (see append).
+        """
+        if instrumentation.current_metrics() is None:
+            for link_model in link_models:
+                self.append(link_model)
+            return
+        normalization_seconds = 0.0
+        clock = time.perf_counter
+        for link_model in link_models:
+            start_time = clock()
+            self.append(link_model)
+            normalization_seconds += clock() - start_time
+        instrumentation.add_time('network-normalization', normalization_seconds)
+
+    def check_lengths(self, router_columns):
+        """Check that no link is shorter than the distance between the coordinates of its routers
+        (allowing for the rounding of the length to whole meters). This ensures that the distance
+        between two routers is a lower bound on the length of every path between them, which is
+        what makes A* searches guided by the router coordinates find shortest paths.
+
+        Args:
+            router_columns (RouterColumns): The routers, indexed by router id.
+        Returns:
+            None
+        Raises:
+            ReadNetworkYamlError: A link is shorter than the distance between its routers.
+        """
+        coordinate_system = router_columns.coordinate_system
+        if coordinate_system is None:
+            return
+        router_coordinates = router_columns.coordinates
+        distance = coordinates.DISTANCE_FUNCTIONS[coordinate_system]
+        for router_1_id, router_2_id, length in zip(self.router_1_ids, self.router_2_ids,
+                                                    self.lengths):
+            coordinates_1 = router_coordinates[router_1_id]
+            coordinates_2 = router_coordinates[router_2_id]
+            if coordinates_1 is None or coordinates_2 is None:
+                continue
+            router_distance = distance(coordinates_1, coordinates_2)
+            if length + coordinates.LENGTH_TOLERANCE < router_distance:
+                raise ReadNetworkYamlError(
+                    f"Link between routers {router_columns.names[router_1_id]} and "
+                    f"{router_columns.names[router_2_id]} has length {length}, which is shorter "
+                    f"than the distance {router_distance:.0f} between the routers")
+
+    def add_to_network(self, network):
+        """Create the links in the columns and add them to a network.
+
+        Args:
+            network (Network): The network.
+        Returns:
+            A list of the newly created Link objects.
+        """
+        return network.add_links_bulk(self.router_1_ids, self.router_2_ids, self.lengths,
+                                      self.capacities)
+
+def read_yaml_section(reader, section):
+    """Read the entries of a section (i.e. the list of routers or the list of links) of a network
+    YAML document from the event stream of a YAML loader. The entries are generated one at a time,
+    as soon as each entry has been read and validated.
+
+    Entries are validated using a fast compiled validator. Cerberus is only used to report the
+    errors in entries that fail the fast validation. Parsing and validation are only timed if
+    instrumentation is enabled, so the clock is not read for every entry otherwise.
+
+    Args:
+        reader (YamlNodeReader): The YAML node reader, positioned at the value of the section.
+        section (str): The name of the section.
+    Returns:
+        A generator of parsed and validated entries.
+    Raises:
+        ReadNetworkYamlError: An entry is not valid.
+        yaml.YAMLError: There was a problem parsing the YAML document.
+    """
+    loader = reader.loader
+    if not loader.check_event(yaml.SequenceStartEvent):
+        raise ReadNetworkYamlError(f"Could not validate network YAML document "
+                                   f"({section} must be a list)")
+    loader.get_event()
+    validate = SECTION_VALIDATORS[section]
+    entry_nr = 0
+    if instrumentation.current_metrics() is None:
+        while not loader.check_event(yaml.SequenceEndEvent):
+            model = reader.read()
+            if not validate(model):
+                check_yaml_entry(model, section, entry_nr)
+            yield model
+            entry_nr += 1
+        loader.get_event()
+        return
+    parse_seconds = 0.0
+    validation_seconds = 0.0
+    clock = time.perf_counter
+    while not loader.check_event(yaml.SequenceEndEvent):
+        start_time = clock()
+        model = reader.read()
+        parsed_time = clock()
+        if not validate(model):
+            check_yaml_entry(model, section, entry_nr)
+        validated_time = clock()
+        parse_seconds += parsed_time - start_time
+        validation_seconds += validated_time - parsed_time
+        yield model
+        entry_nr += 1
+    loader.get_event()
+    instrumentation.add_time('network-yaml-parse', parse_seconds)
+    instrumentation.add_time('network-validation', validation_seconds)
+
+def check_yaml_entry(model, section, entry_nr):
+    """Validate an entry of a network YAML document using cerberus and report the errors.
 
     Args:
-        link_model: The parsed link YAML object.
-        network: Create the Link object in this network.
+        model: The parsed entry.
+        section (str): The name of the section which contains the entry.
+        entry_nr (int): The position of the entry in the section.
     Returns:
-        The newly created Link object.
+        None, if cerberus considers the entry to be valid.
+    Raises:
+        ReadNetworkYamlError: The entry is not valid.
     """
-    router_1_name = link_model['router-1']
-    if router_1_name in network.routers:
-        router_1 = network.routers[router_1_name]
-    else:
-        raise ReadNetworkYamlError(f"Link has non-existent router-1 {router_1_name}")
-    router_2_name = link_model['router-2']
-    if router_2_name in network.routers:
-        router_2 = network.routers[router_2_name]
-    else:
-        raise ReadNetworkYamlError(f"Link has non-existent router-2 {router_2_name}")
-    return Link(router_1=router_1,
-                router_2=router_2,
-                length=link_model['length'])
+    if not isinstance(model, dict):
+        raise ReadNetworkYamlError(f"Could not validate network YAML document "
+                                   f"({section} entry {entry_nr}: must be a mapping)")
+    # Cerberus is only imported to report the errors in an invalid document, because importing it
+    # is slower than reading a small network.
+    import cerberus   # pylint:disable=import-outside-toplevel
+    validator = cerberus.Validator(SECTION_SCHEMAS[section])
+    if not validator.validate(model):
+        raise ReadNetworkYamlError(f"Could not validate network YAML document "
+                                   f"({section} entry {entry_nr}: {validator.errors})")
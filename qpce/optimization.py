@@ -0,0 +1,349 @@
+"""Global optimization of the placement of the paths in a demand, by ripping up and re-routing
+paths.
+
+A placement which places the paths one at a time (see placement.place_demand) depends on the order
+of the paths: a path which is placed early may take the capacity which a later path needs for its
+shortest route, so that the later path gets a detour or can not be placed at all. The optimizer
+starts from such a first-fit placement and improves it iteratively. Each iteration picks a target
+path which is not placed, or whose route is longer than its shortest route, and:
+
+ 1. Rips up the route of the target path, and the routes of the paths which block its shortest
+    route (i.e. which use the capacity that the target path lacks on the links of that route).
+
+ 2. Places the target path on its shortest route with sufficient residual capacity.
+
+ 3. Re-routes the ripped up paths, the paths with the highest bandwidth first. These paths are
+    routed using congestion-weighted link costs: the cost of a link grows with its utilization,
+    and with the number of times it blocked a target path. The ripped up paths are thereby steered
+    away from the links which are likely to block other paths.
+
+The result is kept if it improves the objective, and undone otherwise. The objective is to place as
+many paths as possible and then to minimize the total resource consumption: the sum over all placed
+paths of the bandwidth of the path times the length of its route. The iterations continue until
+a time budget is exhausted, or until a pass over all target paths finds no further improvement."""
+
+import array
+import collections
+import time
+
+import instrumentation
+from fidelity import route_fidelity
+from placement import (Placement, capacitated_route, capacitated_shortest_path,
+                       initial_residual_capacities, route_meets_constraints,
+                       shortest_route_from_trees)
+from route import Route
+from route_computation import choose_path_sources, make_route, route_meeting_fidelity
+from shortest_path import INFINITY
+
+CONGESTION_WEIGHT = 1.0     # Extra cost of a fully utilized link, relative to its length
+HISTORY_WEIGHT = 0.5        # Extra cost of a link for each time it blocked a path, relative to
+                            # its length
+
+class OptimizationIteration:
+    """The result of an iteration of the optimizer, for reporting progress."""
+
+    # pylint:disable=too-few-public-methods
+
+    def __init__(self, iteration, elapsed_time, nr_unplaced, cost, improved):
+        # pylint:disable=too-many-arguments
+        """Initialize an iteration result.
+
+        Args:
+            iteration (int): The number of the iteration; iteration 0 is the initial placement.
+            elapsed_time (float): The time in seconds since the optimization started.
+            nr_unplaced (int): The number of paths which are not placed after the iteration.
+            cost (int): The total resource consumption after the iteration, in Bell pairs per
+                second times meters.
+            improved (bool): Did the iteration improve the objective?
+        """
+        self.iteration = iteration
+        self.elapsed_time = elapsed_time
+        self.nr_unplaced = nr_unplaced
+        self.cost = cost
+        self.improved = improved
+
+    def summary(self):
+        """Summarize the iteration result.
+
+        Returns:
+            A one-line description of the iteration result.
+        """
+        improved = ", improved" if self.improved else ""
+        return (f"Iteration {self.iteration} at {self.elapsed_time:.6f} seconds: "
+                f"{self.nr_unplaced} paths not placed, cost {self.cost}{improved}")
+
+class PlacementOptimizer:
+    """A placement of the paths in a demand, which is improved by ripping up and re-routing paths
+    (see the module description).
+
+    The placement state is kept in terms of router ids and link ids: the route of each path (in the
+    order of the demand), the residual capacity of each link, and the set of paths which use each
+    link."""
+
+    # pylint:disable=too-many-instance-attributes
+
+    def __init__(self, network, demand, link_rates=None, link_fidelities=None):
+        """Place the paths in a demand one at a time, in the order of the demand (in the same way
+        as placement.place_demand).
+
+        Args:
+            network (Network): The network on which the paths are placed.
+            demand (Demand): The demand containing the paths to be placed.
+            link_rates: The elementary Bell pair rates of the links, used as the capacity of the
+                links without a capacity (see placement.initial_residual_capacities), or None.
+            link_fidelities: The fidelity factors of the links indexed by link id, or None to
+                ignore fidelity. If given, only routes which meet the fidelity of their path are
+                placed.
+        """
+        self.network = network
+        self.link_fidelities = link_fidelities
+        self.index = network.index()
+        index = self.index
+        self.capacities = initial_residual_capacities(network, link_rates)
+        self.residual_capacities = array.array('d', self.capacities)
+        self.link_lengths = array.array('q', bytes(8 * index.nr_links))
+        for position, link_id in enumerate(index.link_ids):
+            self.link_lengths[link_id] = index.lengths[position]
+        self.history = array.array('d', bytes(8 * index.nr_links))
+        self.link_costs = array.array('d', self.link_lengths)
+        self.paths = []             # (path, reverse, source id, target id) tuples
+        self.routes = []            # (length, router ids, link ids) tuples or None, per path
+        self.shortest_routes = []   # (length, router ids, link ids) tuples or None, per path,
+                                    # which meet the fidelity of the path
+        self.paths_by_link = {}     # Sets of path numbers indexed by link id
+        self.nr_unplaced = 0
+        self.cost = 0
+        trees = {}
+        for path, reverse in choose_path_sources(demand.paths.values()):
+            if reverse:
+                end_points = (path.end_point_2, path.end_point_1)
+            else:
+                end_points = (path.end_point_1, path.end_point_2)
+            source_id, target_id = (index.router_ids[end_point.name] for end_point in end_points)
+            self.paths.append((path, reverse, source_id, target_id))
+            self.shortest_routes.append(self._shortest_route(trees, path, source_id, target_id))
+            self.routes.append(None)
+            self.nr_unplaced += 1
+        for number in range(len(self.paths)):
+            self._place(number, self._route_path(number))
+        self._candidates = collections.deque()
+        self._improved_in_pass = True
+
+    def objective(self):
+        """Get the objective of the current placement, which the optimizer minimizes.
+
+        Returns:
+            A (number of paths not placed, cost) tuple.
+        """
+        return (self.nr_unplaced, self.cost)
+
+    def improve(self):
+        """Run an iteration of the optimizer: rip up and re-route the paths around the next target
+        path, and keep the result if it improves the objective.
+
+        Returns:
+            True if the objective improved, False if it did not, or None if the optimizer converged
+            (i.e. a pass over all target paths did not improve the objective).
+        """
+        if not self._candidates:
+            if not self._improved_in_pass:
+                return None
+            self._candidates.extend(self._target_paths())
+            self._improved_in_pass = False
+            if not self._candidates:
+                return None
+        instrumentation.count('rip-up-iterations')
+        target = self._candidates.popleft()
+        old_objective = self.objective()
+        old_routes = {target: self._unplace(target)}
+        victims = self._blocking_paths(target)
+        for victim in victims:
+            old_routes[victim] = self._unplace(victim)
+        self._place(target, self._route_path(target))
+        for victim in sorted(victims, key=lambda victim: (-self.paths[victim][0].bandwidth,
+                                                          victim)):
+            self._place(victim, self._route_path(victim, self.link_costs))
+        if self.objective() < old_objective:
+            self._improved_in_pass = True
+            return True
+        for number, route in old_routes.items():
+            self._unplace(number)
+            self._place(number, route)
+        return False
+
+    def placement(self):
+        """Get the current placement.
+
+        Returns:
+            A Placement object, with the routes in the same order as the paths in the demand.
+        """
+        routes = collections.OrderedDict()
+        for (path, reverse, _source_id, _target_id), route in zip(self.paths, self.routes):
+            if route is None:
+                routes[path.name] = Route(path)
+            else:
+                length, router_ids, link_ids = route
+                if self.link_fidelities is None:
+                    fidelity = None
+                else:
+                    fidelity = route_fidelity(self.link_fidelities, link_ids)
+                routes[path.name] = make_route(self.network, self.index, path, router_ids,
+                                               link_ids, length, fidelity, reverse)
+        return Placement(routes, array.array('d', self.residual_capacities))
+
+    def _target_paths(self):
+        # The paths which could be improved: the paths which are not placed (but could be, if there
+        # were enough capacity), and then the paths with a detour, the largest waste of resources
+        # first.
+        unplaced = []
+        detours = []
+        for number, route in enumerate(self.routes):
+            shortest_route = self.shortest_routes[number]
+            if shortest_route is None:
+                continue
+            if route is None:
+                unplaced.append(number)
+            elif route[0] > shortest_route[0]:
+                waste = self.paths[number][0].bandwidth * (route[0] - shortest_route[0])
+                detours.append((-waste, number))
+        detours.sort()
+        return unplaced + [number for _waste, number in detours]
+
+    def _blocking_paths(self, target):
+        # Find the paths which must be ripped up to free enough capacity for the target path on its
+        # shortest route, and make the links of the shortest route which lack capacity more costly.
+        bandwidth = self.paths[target][0].bandwidth
+        victims = []
+        freed_capacities = collections.Counter()
+        for link_id in self.shortest_routes[target][2]:
+            residual_capacity = self.residual_capacities[link_id]
+            if residual_capacity >= bandwidth or self.capacities[link_id] < bandwidth:
+                continue
+            self.history[link_id] += HISTORY_WEIGHT
+            self._update_link_cost(link_id)
+            users = sorted(self.paths_by_link.get(link_id, ()),
+                           key=lambda user: (-self.paths[user][0].bandwidth, user))
+            for user in users:
+                if residual_capacity + freed_capacities[link_id] >= bandwidth:
+                    break
+                if user in victims:
+                    continue
+                victims.append(user)
+                for victim_link_id in self.routes[user][2]:
+                    freed_capacities[victim_link_id] += self.paths[user][0].bandwidth
+        return victims
+
+    def _shortest_route(self, trees, path, source_id, target_id):
+        # Find the shortest route for a path which meets its fidelity, regardless of capacity.
+        shortest_route = shortest_route_from_trees(self.index, trees, source_id, target_id)
+        if shortest_route is None or self.link_fidelities is None:
+            return shortest_route
+        route = route_meeting_fidelity(self.index, shortest_route, self.link_fidelities,
+                                       path.fidelity)
+        if route is None:
+            return None
+        length, _fidelity, router_ids, link_ids = route
+        return (length, router_ids, link_ids)
+
+    def _route_path(self, number, link_costs=None):
+        # Find the shortest (or, with link costs, the cheapest) route with sufficient residual
+        # capacity for a path, which meets the fidelity of the path. A cheapest route which does
+        # not meet the fidelity is replaced by the shortest route which does.
+        path, _reverse, source_id, target_id = self.paths[number]
+        shortest_route = self.shortest_routes[number]
+        if shortest_route is None:
+            return None
+        residual_capacities = self.residual_capacities
+        link_fidelities = self.link_fidelities
+        if route_meets_constraints(residual_capacities, link_fidelities, path, shortest_route[2]):
+            return shortest_route
+        if link_costs is not None:
+            route = capacitated_shortest_path(self.index, residual_capacities, path.bandwidth,
+                                              source_id, target_id, link_costs)
+            if route is None:
+                return None
+            _cost, router_ids, link_ids = route
+            if route_meets_constraints(residual_capacities, link_fidelities, path, link_ids):
+                link_lengths = self.link_lengths
+                return (sum(link_lengths[link_id] for link_id in link_ids), router_ids, link_ids)
+        return capacitated_route(self.index, residual_capacities, link_fidelities, path, source_id,
+                                 target_id)
+
+    def _place(self, number, route):
+        if route is None:
+            return
+        self.routes[number] = route
+        bandwidth = self.paths[number][0].bandwidth
+        for link_id in route[2]:
+            self.residual_capacities[link_id] -= bandwidth
+            self.paths_by_link.setdefault(link_id, set()).add(number)
+            self._update_link_cost(link_id)
+        self.nr_unplaced -= 1
+        self.cost += bandwidth * route[0]
+
+    def _unplace(self, number):
+        route = self.routes[number]
+        if route is None:
+            return None
+        self.routes[number] = None
+        bandwidth = self.paths[number][0].bandwidth
+        for link_id in route[2]:
+            self.residual_capacities[link_id] += bandwidth
+            self.paths_by_link[link_id].discard(number)
+            self._update_link_cost(link_id)
+        self.nr_unplaced += 1
+        self.cost -= bandwidth * route[0]
+        return route
+
+    def _update_link_cost(self, link_id):
+        capacity = self.capacities[link_id]
+        if capacity in (0.0, INFINITY):
+            utilization = 0.0
+        else:
+            utilization = 1.0 - self.residual_capacities[link_id] / capacity
+        self.link_costs[link_id] = self.link_lengths[link_id] * (
+            1.0 + CONGESTION_WEIGHT * utilization + self.history[link_id])
+
+def optimize_placement(network, demand, link_rates=None, link_fidelities=None, time_budget=None,
+                       max_iterations=None, report=None):
+    # pylint:disable=too-many-arguments
+    """Place all paths in a demand onto a network without exceeding the capacity of any link, and
+    improve the placement by ripping up and re-routing paths (see the module description).
+
+    The initial placement is always completed, so the result is at least as good as the placement
+    of placement.place_demand, however small the time budget.
+
+    Args:
+        network (Network): The network on which the paths are placed.
+        demand (Demand): The demand containing the paths to be placed.
+        link_rates: The elementary Bell pair rates of the links, used as the capacity of the links
+            without a capacity (see placement.initial_residual_capacities), or None.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity. If given, only routes which meet the fidelity of their path are placed.
+        time_budget (float): The time in seconds after which no more iterations are started, or
+            None to continue until the optimizer converges.
+        max_iterations (int): The maximum number of iterations, or None for no maximum.
+        report: A function which is called with an OptimizationIteration object for the initial
+            placement and after each iteration, or None.
+    Returns:
+        A Placement object. Paths that could not be placed have an infeasible route.
+    """
+    start_time = time.perf_counter()
+    with instrumentation.span('placement-optimization'):
+        optimizer = PlacementOptimizer(network, demand, link_rates, link_fidelities)
+        iteration = 0
+        improved = False
+        while True:
+            if report is not None:
+                nr_unplaced, cost = optimizer.objective()
+                report(OptimizationIteration(iteration, time.perf_counter() - start_time,
+                                             nr_unplaced, cost, improved))
+            if max_iterations is not None and iteration >= max_iterations:
+                break
+            if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                break
+            improved = optimizer.improve()
+            if improved is None:
+                break
+            iteration += 1
+        return optimizer.placement()
@@ -1,5 +1,7 @@
 """Quantum path."""
 
+import sys
+
 class Path:
     # TODO: Remove this when we have more methods
     # pylint:disable=too-few-public-methods
@@ -9,6 +11,8 @@ class Path:
     teleported. The path produces end-to-end Bell pairs at the rate and fidelity requested by the
     application."""
 
+    __slots__ = ('name', 'end_point_1', 'end_point_2', 'bandwidth', 'fidelity')
+
     def __init__(self, demand, name, end_point_1, end_point_2, bandwidth, fidelity):
         """Initialize a quantum path.
 
@@ -26,7 +30,7 @@ class Path:
         assert end_point_1.network == end_point_2.network, "End-points are not in the same network"
         assert bandwidth > 0, "Requested end-to-end bandwidth must be > 0"
         assert fidelity > 0.0, "Requested end-to-end fidelity must be > 0.0"
-        self.name = name
+        self.name = sys.intern(name)
         self.end_point_1 = end_point_1
         self.end_point_2 = end_point_2
         self.bandwidth = bandwidth
@@ -0,0 +1,243 @@
+"""Bandwidth-aware placement of the quantum paths in a demand onto the links of a network."""
+
+import array
+import collections
+import heapq
+
+import instrumentation
+from constrained_path import constrained_shortest_path
+from fidelity import route_fidelity
+from route_computation import choose_path_sources, make_route
+from route import Route
+from shortest_path import INFINITY, ShortestPathTree
+
+class Placement:
+    # TODO: Remove this when we have more methods
+    # pylint:disable=too-few-public-methods
+    """The result of placing the paths of a demand onto a network.
+
+    A placement consists of a route for each path and the residual capacity of each link after all
+    routes have been placed."""
+
+    def __init__(self, routes, residual_capacities):
+        """Initialize a placement.
+
+        Args:
+            routes (OrderedDict): Route objects indexed by path name, in the same order as the paths
+                in the demand.
+            residual_capacities (array): Residual capacity of each link in Bell pairs per second,
+                indexed by link id. Links with unlimited capacity have an infinite residual
+                capacity.
+        """
+        self.routes = routes
+        self.residual_capacities = residual_capacities
+
+    def residual_capacity(self, network, link):
+        """Get the residual capacity of a link.
+
+        Args:
+            network (Network): The network on which the demand was placed.
+            link (Link): The link.
+        Returns:
+            The residual capacity of the link in Bell pairs per second.
+        """
+        assert link.link_id is not None and network.links[link.link_id] is link, \
+               "Network does not contain the link"
+        return self.residual_capacities[link.link_id]
+
+def initial_residual_capacities(network, link_rates=None):
+    """Get the residual capacities of all links in a network on which nothing has been placed yet.
+
+    Args:
+        network (Network): The network.
+        link_rates: The elementary Bell pair rates of the links indexed by link id (see
+            Technology.link_rates), used as the capacity of the links without a capacity, or None
+            if the capacity of those links is unlimited.
+    Returns:
+        An array of capacities indexed by link id.
+    """
+    if link_rates is None:
+        return array.array('d', [INFINITY if link.capacity is None else link.capacity
+                                 for link in network.links])
+    return array.array('d', [link_rate if link.capacity is None else link.capacity
+                             for link, link_rate in zip(network.links, link_rates)])
+
+def place_demand(network, demand, link_rates=None, link_fidelities=None):
+    """Place all paths in a demand onto a network without exceeding the capacity of any link.
+
+    Paths are placed one at a time, in the order of the demand. Each path gets the shortest route
+    whose links all have a residual capacity of at least the bandwidth of the path and, if link
+    fidelities are given, whose end-to-end fidelity is at least the fidelity of the path. The
+    residual capacities are kept in a flat array indexed by link id, and only the links on a placed
+    route are updated.
+
+    The shortest route from the shortest path tree of the source is tried first. Only when it does
+    not meet the constraints of the path (see route_meets_constraints) is a constrained search run,
+    so a placement pass costs one shortest path tree per distinct source plus time linear in the
+    number of placed hops for all paths that fit on their shortest route.
+
+    Args:
+        network (Network): The network on which the paths are placed.
+        demand (Demand): The demand containing the paths to be placed.
+        link_rates: The elementary Bell pair rates of the links, used as the capacity of the links
+            without a capacity (see initial_residual_capacities), or None.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity.
+    Returns:
+        A Placement object. Paths that could not be placed have an infeasible route. The routes
+        have a fidelity if link fidelities are given.
+    """
+    # pylint:disable=too-many-locals
+    index = network.index()
+    residual_capacities = initial_residual_capacities(network, link_rates)
+    trees = {}
+    routes = collections.OrderedDict()
+    for path, reverse in choose_path_sources(demand.paths.values()):
+        source = path.end_point_2 if reverse else path.end_point_1
+        target = path.end_point_1 if reverse else path.end_point_2
+        source_id = index.router_ids[source.name]
+        target_id = index.router_ids[target.name]
+        shortest_route = shortest_route_from_trees(index, trees, source_id, target_id)
+        if shortest_route is None:
+            routes[path.name] = Route(path)
+            continue
+        length, router_ids, link_ids = shortest_route
+        if not route_meets_constraints(residual_capacities, link_fidelities, path, link_ids):
+            constrained_route = capacitated_route(index, residual_capacities, link_fidelities, path,
+                                                  source_id, target_id)
+            if constrained_route is None:
+                routes[path.name] = Route(path)
+                continue
+            length, router_ids, link_ids = constrained_route
+        for link_id in link_ids:
+            residual_capacities[link_id] -= path.bandwidth
+        fidelity = None if link_fidelities is None else route_fidelity(link_fidelities, link_ids)
+        routes[path.name] = make_route(network, index, path, router_ids, link_ids, length,
+                                       fidelity, reverse)
+    return Placement(routes, residual_capacities)
+
+def shortest_route_from_trees(index, trees, source_id, target_id):
+    """Get the shortest route between two routers from the shortest path tree of the source router.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        trees (dict): ShortestPathTree objects indexed by source router id. The tree of the source
+            router is computed and added if it is not there yet.
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+    Returns:
+        A (length, router_ids, link_ids) tuple, or None if the target is unreachable.
+    """
+    tree = trees.get(source_id)
+    if tree is None:
+        tree = ShortestPathTree(index, source_id)
+        trees[source_id] = tree
+    tree_path = tree.path_to(target_id)
+    if tree_path is None:
+        return None
+    return (tree.distances[target_id],) + tree_path
+
+def route_meets_constraints(residual_capacities, link_fidelities, path, link_ids):
+    """Check whether a route meets the constraints of a path: each of its links has a residual
+    capacity of at least the bandwidth of the path and, if link fidelities are given, its
+    end-to-end fidelity is at least the fidelity of the path.
+
+    Args:
+        residual_capacities: The residual capacities of the links, indexed by link id.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity.
+        path (Path): The path.
+        link_ids: The link ids of the links on the route.
+    Returns:
+        True if the route meets the constraints of the path.
+    """
+    bandwidth = path.bandwidth
+    if any(residual_capacities[link_id] < bandwidth for link_id in link_ids):
+        return False
+    return link_fidelities is None or route_fidelity(link_fidelities, link_ids) >= path.fidelity
+
+def capacitated_route(index, residual_capacities, link_fidelities, path, source_id, target_id):
+    # pylint:disable=too-many-arguments
+    """Compute the shortest route for a path which meets the constraints of the path (see
+    route_meets_constraints).
+
+    Without link fidelities, this is a capacity-constrained search (see capacitated_shortest_path).
+    With link fidelities, it is a fidelity-constrained search (see
+    constrained_path.constrained_shortest_path) which skips the links with insufficient residual
+    capacity.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        residual_capacities: The residual capacities of the links, indexed by link id.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity.
+        path (Path): The path.
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+    Returns:
+        A (length, router_ids, link_ids) tuple, or None if there is no such route.
+    """
+    bandwidth = path.bandwidth
+    if link_fidelities is None:
+        return capacitated_shortest_path(index, residual_capacities, bandwidth, source_id,
+                                         target_id)
+    constrained_path = constrained_shortest_path(index, link_fidelities, source_id, target_id,
+                                                 path.fidelity, residual_capacities, bandwidth)
+    if constrained_path is None:
+        return None
+    length, _fidelity, router_ids, link_ids = constrained_path
+    return (length, router_ids, link_ids)
+
+def capacitated_shortest_path(index, residual_capacities, bandwidth, source_id, target_id,
+                              link_costs=None):
+    # pylint:disable=too-many-arguments
+    """Compute the shortest path between two routers using only links with sufficient residual
+    capacity.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        residual_capacities: The residual capacities of the links, indexed by link id.
+        bandwidth (int): The bandwidth which each link on the path must be able to carry.
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+        link_costs: The costs of the links indexed by link id, to compute the cheapest rather than
+            the shortest path (see optimization.PlacementOptimizer), or None to use the lengths of
+            the links.
+    Returns:
+        A (length, router_ids, link_ids) tuple, or None if there is no such path. If link costs are
+        given, the first element is the cost of the path instead of its length.
+    """
+    # pylint:disable=too-many-locals
+    instrumentation.count('capacitated-searches')
+    offsets, neighbors, link_ids, lengths = index.columns()
+    distances = {source_id: 0}
+    parents = {source_id: (-1, -1)}
+    heap = [(0, source_id)]
+    while heap:
+        distance, router_id = heapq.heappop(heap)
+        if distance > distances[router_id]:
+            continue
+        if router_id == target_id:
+            router_ids = [target_id]
+            path_link_ids = []
+            while router_id != source_id:
+                router_id, link_id = parents[router_id]
+                router_ids.append(router_id)
+                path_link_ids.append(link_id)
+            router_ids.reverse()
+            path_link_ids.reverse()
+            return (distance, router_ids, path_link_ids)
+        for position in range(offsets[router_id], offsets[router_id + 1]):
+            link_id = link_ids[position]
+            if residual_capacities[link_id] < bandwidth:
+                continue
+            neighbor = neighbors[position]
+            if link_costs is None:
+                new_distance = distance + lengths[position]
+            else:
+                new_distance = distance + link_costs[link_id]
+            if new_distance < distances.get(neighbor, INFINITY):
+                distances[neighbor] = new_distance
+                parents[neighbor] = (router_id, link_id)
+                heapq.heappush(heap, (new_distance, neighbor))
+    return None
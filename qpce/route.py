@@ -0,0 +1,48 @@
+"""Computed route for a quantum path."""
+
+class Route:
+    """A route for a quantum path.
+
+    A route is the sequence of routers and links that a quantum path traverses, from end-point 1 of
+    the path to end-point 2 of the path. If no feasible route could be determined for the path, the
+    route is infeasible and has no routers or links."""
+
+    def __init__(self, path, routers=None, links=None, length=None, fidelity=None):
+        """Initialize a route.
+
+        Args:
+            path (Path): The quantum path for which the route was computed.
+            routers (list): The Router objects on the route, from end-point 1 to end-point 2, or
+                None if the route is infeasible.
+            links (list): The Link objects on the route, from end-point 1 to end-point 2, or None
+                if the route is infeasible.
+            length (int): The total length of the route in meters, or None if the route is
+                infeasible.
+            fidelity (float): The estimated end-to-end fidelity of the route, or None if the route
+                is infeasible or no fidelity model was used.
+        """
+        self.path = path
+        self.routers = routers
+        self.links = links
+        self.length = length
+        self.fidelity = fidelity
+
+    @property
+    def feasible(self):
+        """Could a feasible route be determined for the path?"""
+        return self.routers is not None
+
+    def for_path(self, path):
+        """Get the same route for another path with the same end-points. The end-points of the other
+        path may be swapped, in which case the route is reversed.
+
+        Args:
+            path (Path): The other path.
+        Returns:
+            A Route object for the other path.
+        """
+        if not self.feasible:
+            return Route(path)
+        if path.end_point_1 is self.path.end_point_1:
+            return Route(path, self.routers, self.links, self.length, self.fidelity)
+        return Route(path, self.routers[::-1], self.links[::-1], self.length, self.fidelity)
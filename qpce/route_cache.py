@@ -0,0 +1,115 @@
+"""Cache of computed routes."""
+
+import collections
+
+from route import Route
+
+class RouteCache:
+    """A cache of computed routes, with least-recently-used eviction.
+
+    Routes are cached by the end-points, bandwidth, and fidelity of the path. Paths are
+    bi-directional, so the end-points are put in a canonical order: a path from A to Z and a path
+    from Z to A share the same cache entry.
+
+    The cache is associated with a network. The whole cache is invalidated when the generation of
+    the network changes, i.e. when a router or link is added to the network.
+
+    The cache does not know how the routes were computed. The same cache should only be used for
+    routes computed in the same way (e.g. with the same fidelity model)."""
+
+    def __init__(self, network, max_size=10000):
+        """Initialize a route cache.
+
+        Args:
+            network (Network): The network for which routes are cached.
+            max_size (int): The maximum number of cache entries. Must be > 0.
+        """
+        assert max_size > 0, f"Invalid maximum size {max_size} for route cache, must be > 0."
+        self.network = network
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._generation = network.generation
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        self._check_generation()
+        return len(self._entries)
+
+    @staticmethod
+    def key(path):
+        """Get the cache key for a path.
+
+        Args:
+            path (Path): The path.
+        Returns:
+            A (end-point name, end-point name, bandwidth, fidelity) tuple, with the end-point names
+            in canonical order.
+        """
+        name_1 = path.end_point_1.name
+        name_2 = path.end_point_2.name
+        if name_1 <= name_2:
+            return (name_1, name_2, path.bandwidth, path.fidelity)
+        return (name_2, name_1, path.bandwidth, path.fidelity)
+
+    def lookup(self, path):
+        """Look up the cached route for a path.
+
+        Args:
+            path (Path): The path.
+        Returns:
+            A Route object for the path, or None if there is no cached route for the path.
+        """
+        self._check_generation()
+        key = self.key(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        forward_routers, forward_links, reverse_routers, reverse_links, length, fidelity = entry
+        if path.end_point_1.name == key[0]:
+            return Route(path, forward_routers, forward_links, length, fidelity)
+        return Route(path, reverse_routers, reverse_links, length, fidelity)
+
+    def store(self, route):
+        """Store a computed route in the cache. If the cache is full, the least recently used entry
+        is evicted.
+
+        Args:
+            route (Route): The route. Both feasible and infeasible routes are cached.
+        Returns:
+            None
+        """
+        self._check_generation()
+        key = self.key(route.path)
+        if route.feasible:
+            reversed_routers = route.routers[::-1]
+            reversed_links = route.links[::-1]
+        else:
+            reversed_routers = None
+            reversed_links = None
+        if route.path.end_point_1.name == key[0]:
+            entry = (route.routers, route.links, reversed_routers, reversed_links, route.length,
+                     route.fidelity)
+        else:
+            entry = (reversed_routers, reversed_links, route.routers, route.links, route.length,
+                     route.fidelity)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries from the cache. The hit and miss counters are not reset.
+
+        Returns:
+            None
+        """
+        self._entries.clear()
+        self._generation = self.network.generation
+
+    def _check_generation(self):
+        if self._generation != self.network.generation:
+            self.clear()
@@ -0,0 +1,353 @@
+"""Computation of routes for the quantum paths in a demand."""
+
+import collections
+
+import instrumentation
+from constrained_path import constrained_shortest_path
+from fidelity import route_fidelity
+from route import Route
+from shortest_path import ShortestPathTree, astar_shortest_path, bidirectional_shortest_path
+
+def compute_routes(network, demand, fidelity_model=None, cache=None, jobs=1):
+    """Compute a minimum-length route for every path in a demand.
+
+    Paths are bi-directional, so for each path the end-point which is shared with the largest number
+    of other paths is chosen as the source. One shortest path tree is computed per distinct source
+    router and reused for all paths from that source.
+
+    If a fidelity model is given, the route for each path is the shortest route whose end-to-end
+    fidelity meets the fidelity requested by the path. The shortest path tree is still used first;
+    the more expensive fidelity-constrained search is only run for paths whose shortest route does
+    not meet the requested fidelity.
+
+    If a route cache is given, the route for a path is taken from the cache if possible. Routes are
+    only computed for the paths that miss the cache, and only once for all paths that share the same
+    cache key. The computed routes are stored in the cache.
+
+    Args:
+        network (Network): The network on which the paths are routed.
+        demand (Demand): The demand containing the paths to be routed.
+        fidelity_model (FidelityModel): The fidelity model, or None to ignore fidelity.
+        cache (RouteCache): The route cache, or None to not use a cache.
+        jobs (int): The number of worker processes used to compute the routes.
+    Returns:
+        An OrderedDict of Route objects indexed by path name, in the same order as demand.paths.
+    """
+    routes = {route.path.name: route
+              for route in iter_routes(network, demand, fidelity_model, cache, jobs)}
+    return collections.OrderedDict((path_name, routes[path_name]) for path_name in demand.paths)
+
+def iter_routes(network, demand, fidelity_model=None, cache=None, jobs=1):
+    """Compute a minimum-length route for every path in a demand, in the same way as
+    compute_routes, but generate each route as soon as it is computed instead of returning all
+    routes at the end. This allows the routes to be written while the remaining routes are still
+    being computed, without keeping all routes in memory.
+
+    The routes are generated in the order of the paths in the demand, whatever the number of jobs.
+    A route is held back only until the routes of all earlier paths have been generated (see
+    iter_path_routes).
+
+    Args:
+        network (Network): The network on which the paths are routed.
+        demand (Demand): The demand containing the paths to be routed.
+        fidelity_model (FidelityModel): The fidelity model, or None to ignore fidelity.
+        cache (RouteCache): The route cache, or None to not use a cache.
+        jobs (int): The number of worker processes used to compute the routes.
+    Returns:
+        A generator of Route objects, one for each path in the demand.
+    """
+    if cache is None:
+        yield from iter_path_routes(network, demand.paths.values(), fidelity_model, jobs)
+        return
+    yield from _in_position_order(_iter_cached_routes(network, demand, fidelity_model, cache,
+                                                      jobs))
+
+def _iter_cached_routes(network, demand, fidelity_model, cache, jobs):
+    # Generate a (position, route) tuple for each path in the demand, where position is the
+    # position of the path in the demand: first the routes taken from the cache, then the computed
+    # routes.
+    hits = cache.hits
+    misses = cache.misses
+    paths = []
+    positions = []         # Position of each path in paths
+    duplicate_paths = {}   # (Position, path) tuples of the other paths which missed the cache,
+                           # indexed by the cache key of the first path
+    for position, path in enumerate(demand.paths.values()):
+        route = cache.lookup(path)
+        if route is not None:
+            yield (position, route)
+            continue
+        key = cache.key(path)
+        if key in duplicate_paths:
+            duplicate_paths[key].append((position, path))
+        else:
+            duplicate_paths[key] = []
+            paths.append(path)
+            positions.append(position)
+    instrumentation.count('route-cache-hits', cache.hits - hits)
+    instrumentation.count('route-cache-misses', cache.misses - misses)
+    for position, route in zip(positions, iter_path_routes(network, paths, fidelity_model, jobs)):
+        cache.store(route)
+        yield (position, route)
+        for duplicate_position, path in duplicate_paths.pop(cache.key(route.path)):
+            yield (duplicate_position, route.for_path(path))
+
+def _in_position_order(positioned_routes):
+    # Generate the routes of (position, route) tuples, with positions 0 up to the number of routes,
+    # in order of position. Each route is generated as soon as the routes at all earlier positions
+    # have been generated.
+    pending = {}   # Routes which wait for a route at an earlier position, indexed by position
+    next_position = 0
+    for position, route in positioned_routes:
+        pending[position] = route
+        while next_position in pending:
+            yield pending.pop(next_position)
+            next_position += 1
+    assert not pending, "Routes are missing for some positions"
+
+def compute_path_routes(network, paths, fidelity_model=None, jobs=1):
+    """Compute a minimum-length route for each path in a list of paths, using one shortest path tree
+    per distinct source router (see iter_path_routes).
+
+    Args:
+        network (Network): The network on which the paths are routed.
+        paths (list): The Path objects to be routed.
+        fidelity_model (FidelityModel): The fidelity model, or None to ignore fidelity.
+        jobs (int): The number of worker processes; 1 means compute the routes in this process.
+    Returns:
+        A dictionary of Route objects indexed by path name.
+    """
+    return {route.path.name: route
+            for route in iter_path_routes(network, paths, fidelity_model, jobs)}
+
+def iter_path_routes(network, paths, fidelity_model=None, jobs=1):
+    """Compute a minimum-length route for each path in a list of paths, using one shortest path tree
+    per distinct source router. The shortest path tree of a source router is not kept after the
+    routes from that source router have been computed.
+
+    If more than one job is requested, the paths are partitioned by source router and the route
+    computation for the partitions is distributed over a pool of worker processes. The adjacency
+    index of the network (and the link fidelities) are sent to each worker process once, when the
+    pool is created.
+
+    The routes are generated in the order of the paths, whatever the number of jobs and the order
+    in which the workers complete the partitions. Each route is generated as soon as the routes of
+    all earlier paths have been computed.
+
+    Args:
+        network (Network): The network on which the paths are routed.
+        paths (list): The Path objects to be routed.
+        fidelity_model (FidelityModel): The fidelity model, or None to ignore fidelity.
+        jobs (int): The number of worker processes; 1 means compute the routes in this process.
+    Returns:
+        A generator of Route objects, one for each path, in the same order as paths.
+    """
+    # pylint:disable=too-many-locals
+    assert jobs > 0, f"Invalid number of jobs {jobs}, must be > 0."
+    index = network.index()
+    if fidelity_model is None:
+        link_fidelities = None
+    else:
+        link_fidelities = fidelity_model.link_fidelities(network)
+    paths = list(paths)
+    reverses = []
+    source_tasks = collections.OrderedDict()
+    for position, (path, reverse) in enumerate(choose_path_sources(paths)):
+        source = path.end_point_2 if reverse else path.end_point_1
+        target = path.end_point_1 if reverse else path.end_point_2
+        min_fidelity = None if link_fidelities is None else path.fidelity
+        source_id = index.router_ids[source.name]
+        target_id = index.router_ids[target.name]
+        source_tasks.setdefault(source_id, []).append((position, target_id, min_fidelity))
+        reverses.append(reverse)
+    tasks = list(source_tasks.items())
+    if jobs > 1 and len(tasks) > 1:
+        task_results = _route_source_tasks_in_pool(index, link_fidelities, tasks, jobs)
+    else:
+        task_results = (route_source_task(index, link_fidelities, task) for task in tasks)
+    yield from _in_position_order(_make_task_routes(network, index, paths, reverses,
+                                                    task_results))
+
+def _make_task_routes(network, index, paths, reverses, task_results):
+    # Generate a (position, route) tuple for each (position, result) tuple in the results of the
+    # source tasks.
+    for results in task_results:
+        for position, result in results:
+            path = paths[position]
+            if result is None:
+                yield (position, Route(path))
+            else:
+                length, fidelity, router_ids, link_ids = result
+                yield (position, make_route(network, index, path, router_ids, link_ids, length,
+                                            fidelity, reverses[position]))
+
+def _route_source_tasks_in_pool(index, link_fidelities, tasks, jobs):
+    # Imported here, because importing multiprocessing noticeably slows down the startup of the
+    # command line interface, which usually computes the routes in one process.
+    import multiprocessing   # pylint:disable=import-outside-toplevel
+    collect_metrics = instrumentation.current_metrics() is not None
+    with multiprocessing.Pool(min(jobs, len(tasks)), _initialize_worker,
+                              (index, link_fidelities, collect_metrics)) as pool:
+        for results, metrics_dict in pool.imap_unordered(_route_source_task_in_worker, tasks):
+            if metrics_dict is not None:
+                instrumentation.current_metrics().merge(metrics_dict)
+            yield results
+
+def route_source_task(index, link_fidelities, task):
+    """Compute the routes from one source router to a list of target routers.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity.
+        task: A (source_id, targets) tuple, where targets is a list of (position, target_id,
+            min_fidelity) tuples. The minimum fidelity is None if fidelity is ignored.
+    Returns:
+        A list of (position, result) tuples, where result is a (length, fidelity, router_ids,
+        link_ids) tuple from the source to the target, or None if there is no (sufficiently high
+        fidelity) route to the target.
+    """
+    source_id, targets = task
+    if len(targets) == 1:
+        # A shortest path tree would settle all routers which are closer to the source than the
+        # target; a bidirectional search settles far fewer routers for a single target.
+        position, target_id, min_fidelity = targets[0]
+        return [(position, route_between(index, source_id, target_id, link_fidelities,
+                                         min_fidelity))]
+    tree = ShortestPathTree(index, source_id)
+    results = []
+    for position, target_id, min_fidelity in targets:
+        results.append((position, route_from_tree(index, tree, target_id, link_fidelities,
+                                                  min_fidelity)))
+    return results
+
+_WORKER_STATE = {}
+
+def _initialize_worker(index, link_fidelities, collect_metrics):
+    _WORKER_STATE['index'] = index
+    _WORKER_STATE['link_fidelities'] = link_fidelities
+    _WORKER_STATE['collect_metrics'] = collect_metrics
+    instrumentation.stop_metrics()
+
+def _route_source_task_in_worker(task):
+    # The metrics collected in the worker are returned with the results of each task, so that they
+    # can be merged into the metrics of the main process.
+    if _WORKER_STATE['collect_metrics']:
+        metrics = instrumentation.start_metrics()
+    results = route_source_task(_WORKER_STATE['index'], _WORKER_STATE['link_fidelities'], task)
+    if _WORKER_STATE['collect_metrics']:
+        instrumentation.stop_metrics()
+        return (results, metrics.as_dict())
+    return (results, None)
+
+def choose_path_sources(paths):
+    """Choose the source end-point for each path, so that as few shortest path trees as possible
+    need to be computed.
+
+    Args:
+        paths: An iterable of Path objects.
+    Returns:
+        A list of (path, reverse) tuples in the same order as paths. If reverse is False the source
+        is end-point 1 of the path, otherwise it is end-point 2.
+    """
+    paths = list(paths)
+    end_point_counts = collections.Counter()
+    for path in paths:
+        end_point_counts[path.end_point_1.name] += 1
+        end_point_counts[path.end_point_2.name] += 1
+    return [(path,
+             end_point_counts[path.end_point_2.name] > end_point_counts[path.end_point_1.name])
+            for path in paths]
+
+def route_from_tree(index, tree, target_id, link_fidelities=None, min_fidelity=None):
+    """Determine the route to a target router from a shortest path tree.
+
+    Args:
+        index (GraphIndex): The adjacency index from which the tree was computed.
+        tree (ShortestPathTree): The shortest path tree rooted at the source router.
+        target_id (int): The router id of the target router.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity.
+        min_fidelity (float): The minimum end-to-end fidelity of the route, or None to ignore
+            fidelity.
+    Returns:
+        A (length, fidelity, router_ids, link_ids) tuple, or None if there is no (sufficiently high
+        fidelity) route. The fidelity is None if fidelity is ignored.
+    """
+    tree_path = tree.path_to(target_id)
+    if tree_path is None:
+        return None
+    router_ids, link_ids = tree_path
+    return route_meeting_fidelity(index, (tree.distances[target_id], router_ids, link_ids),
+                                  link_fidelities, min_fidelity)
+
+def route_between(index, source_id, target_id, link_fidelities=None, min_fidelity=None):
+    """Determine the route between two routers using an A* search guided by the positions of the
+    routers if they are known, or a bidirectional search otherwise.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity.
+        min_fidelity (float): The minimum end-to-end fidelity of the route, or None to ignore
+            fidelity.
+    Returns:
+        A (length, fidelity, router_ids, link_ids) tuple, or None if there is no (sufficiently high
+        fidelity) route. The fidelity is None if fidelity is ignored.
+    """
+    if index.positions is not None:
+        shortest_path = astar_shortest_path(index, source_id, target_id)
+    else:
+        shortest_path = bidirectional_shortest_path(index, source_id, target_id)
+    if shortest_path is None:
+        return None
+    return route_meeting_fidelity(index, shortest_path, link_fidelities, min_fidelity)
+
+def route_meeting_fidelity(index, shortest_path, link_fidelities=None, min_fidelity=None):
+    """Determine the route between two routers from their shortest path: the shortest path itself
+    if its fidelity is high enough, otherwise the shortest route which meets the minimum fidelity.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        shortest_path (tuple): The shortest path between the routers, as a (length, router_ids,
+            link_ids) tuple.
+        link_fidelities: The fidelity factors of the links indexed by link id, or None to ignore
+            fidelity.
+        min_fidelity (float): The minimum end-to-end fidelity of the route, or None to ignore
+            fidelity.
+    Returns:
+        A (length, fidelity, router_ids, link_ids) tuple, or None if there is no sufficiently high
+        fidelity route. The fidelity is None if fidelity is ignored.
+    """
+    length, router_ids, link_ids = shortest_path
+    if link_fidelities is None:
+        return (length, None, router_ids, link_ids)
+    fidelity = route_fidelity(link_fidelities, link_ids)
+    if fidelity >= min_fidelity:
+        return (length, fidelity, router_ids, link_ids)
+    return constrained_shortest_path(index, link_fidelities, router_ids[0], router_ids[-1],
+                                     min_fidelity)
+
+def make_route(network, index, path, router_ids, link_ids, length, fidelity, reverse):
+    """Create a Route object from router ids and link ids.
+
+    Args:
+        network (Network): The network on which the path is routed.
+        index (GraphIndex): The adjacency index which defines the router ids and link ids.
+        path (Path): The path for which the route is created.
+        router_ids (list): The router ids on the route, from the source to the target.
+        link_ids (list): The link ids on the route, from the source to the target.
+        length (int): The length of the route.
+        fidelity (float): The end-to-end fidelity of the route, or None if unknown.
+        reverse (bool): True if the source is end-point 2 of the path.
+    Returns:
+        A feasible Route object, from end-point 1 to end-point 2 of the path.
+    """
+    if reverse:
+        router_ids = router_ids[::-1]
+        link_ids = link_ids[::-1]
+    routers = [network.routers[index.router_names[router_id]] for router_id in router_ids]
+    links = [network.links[link_id] for link_id in link_ids]
+    return Route(path, routers, links, length, fidelity)
@@ -0,0 +1,99 @@
+"""Writing of route files in the YAML or the JSON Lines format, optionally compressed with gzip.
+
+In the JSON Lines format, each line is a JSON object which describes one route, with the same
+members as a route in the route YAML file. Routes are written as soon as they are produced, so that
+a route file can be consumed while the remaining routes are still being computed."""
+
+import json
+
+import route_yaml
+
+YAML = 'yaml'
+JSON_LINES = 'jsonl'
+ROUTE_FORMATS = [YAML, JSON_LINES]
+
+# The filename extensions of route files in the JSON Lines format. Route files with other
+# extensions are written in the YAML format. Route files whose filename ends with GZIP_EXTENSION are
+# compressed.
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+GZIP_EXTENSION = '.gz'
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+GZIP_COMPRESS_LEVEL = 6
+
+class WriteRouteFileError(Exception):
+    """Exception is thrown when there is a problem writing a route file."""
+
+def route_format_of_filename(filename):
+    """Determine the format of a route file from its filename extension.
+
+    Args:
+        filename (str): Filename of the route file.
+    Returns:
+        JSON_LINES if the extension (ignoring a .gz extension) is .jsonl or .ndjson, YAML otherwise.
+    """
+    if filename.endswith(GZIP_EXTENSION):
+        filename = filename[:-len(GZIP_EXTENSION)]
+    if filename.endswith(JSON_LINES_EXTENSIONS):
+        return JSON_LINES
+    return YAML
+
+def write_routes_to_file(filename, routes, route_format=None):
+    """Write routes to a route file. The file is compressed with gzip if the filename ends with .gz.
+
+    Args:
+        filename (str): Filename of the route file.
+        routes: An iterable of Route objects.
+        route_format (str): YAML or JSON_LINES, or None to determine the format from the filename
+            (see route_format_of_filename).
+    Returns:
+        The number of routes written.
+    Raises:
+        WriteRouteFileError: There was a problem writing the route file.
+    """
+    if route_format is None:
+        route_format = route_format_of_filename(filename)
+    try:
+        if filename.endswith(GZIP_EXTENSION):
+            import gzip   # pylint:disable=import-outside-toplevel
+            file = gzip.open(filename, 'wt', compresslevel=GZIP_COMPRESS_LEVEL, encoding='utf-8')
+        else:
+            file = open(filename, 'w', buffering=OUTPUT_BUFFER_SIZE, encoding='utf-8')
+    except (OSError, IOError) as err:
+        message = f"Could not open route file {filename} ({err})"
+        raise WriteRouteFileError(message)
+    with file:
+        return write_routes_to_stream(file, routes, route_format)
+
+def write_routes_to_stream(stream, routes, route_format=YAML):
+    """Write routes to a stream.
+
+    Args:
+        stream: Stream to write the routes to.
+        routes: An iterable of Route objects.
+        route_format (str): YAML or JSON_LINES.
+    Returns:
+        The number of routes written.
+    """
+    assert route_format in ROUTE_FORMATS, f"Unknown route format {route_format}"
+    if route_format == JSON_LINES:
+        return write_routes_to_json_lines_stream(stream, routes)
+    return route_yaml.write_routes_to_yaml_stream(stream, routes)
+
+def write_routes_to_json_lines_stream(stream, routes):
+    """Write routes to a stream in the JSON Lines format. Each route is written as soon as it is
+    produced by the routes iterable.
+
+    Args:
+        stream: Stream to write the routes to.
+        routes: An iterable of Route objects.
+    Returns:
+        The number of routes written.
+    """
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    nr_routes = 0
+    for route in routes:
+        stream.write(encoder.encode(route_yaml.route_to_yaml_model(route)))
+        stream.write('\n')
+        nr_routes += 1
+    return nr_routes
@@ -0,0 +1,144 @@
+"""Writing of the route YAML file."""
+
+import json
+import re
+
+import yaml
+
+# Strings which may be written as plain (unquoted) YAML scalars, provided that they are not read
+# back as another type (e.g. "yes" or "1e3").
+PLAIN_SCALAR = re.compile(r'[A-Za-z0-9_][A-Za-z0-9_.\-/]*\Z')
+STRING_TAG = 'tag:yaml.org,2002:str'
+# Strings whose JSON representation is a valid YAML double-quoted scalar which reads back as the
+# same string. JSON escapes characters outside of ASCII as UTF-16 surrogate pairs, which YAML does
+# not combine, and does not escape all the characters which YAML does not allow in a stream.
+JSON_SCALAR = re.compile(r'[\x20-\x7e]*\Z')
+
+class WriteRouteYamlError(Exception):
+    """Exception is thrown when there is a problem writing the route YAML file."""
+
+def write_routes_to_yaml_file(filename, routes):
+    """Write a route YAML document to a file.
+
+    Args:
+        filename (str): Filename of the file to write the route YAML document to.
+        routes: An iterable of Route objects.
+    Returns:
+        The number of routes written.
+    Raises:
+        WriteRouteYamlError: There was a problem writing the route file.
+    """
+    try:
+        file = open(filename, 'w', encoding='utf-8')
+    except (OSError, IOError) as err:
+        message = f"Could not open route file {filename} ({err})"
+        raise WriteRouteYamlError(message)
+    with file:
+        return write_routes_to_yaml_stream(file, routes)
+
+def write_routes_to_yaml_stream(stream, routes):
+    """Write a route YAML document to a stream. Each route is written as soon as it is produced by
+    the routes iterable.
+
+    The document is formatted by this module rather than by the YAML emitter, which is much slower.
+    The document is the same as the one the YAML emitter produces, except that printable ASCII
+    strings which need quotes are written as JSON strings (which are valid YAML double-quoted
+    strings). Other strings which need quotes are written by the YAML emitter.
+
+    Args:
+        stream: Stream to write the route YAML document to.
+        routes: An iterable of Route objects.
+    Returns:
+        The number of routes written.
+    """
+    scalars = YamlScalars()
+    nr_routes = 0
+    for route in routes:
+        if nr_routes == 0:
+            stream.write("routes:\n")
+        stream.write(route_to_yaml_text(route, scalars))
+        nr_routes += 1
+    if nr_routes == 0:
+        stream.write("routes: []\n")
+    return nr_routes
+
+def route_to_yaml_text(route, scalars):
+    """Format a route as an entry of the list of routes in a route YAML document.
+
+    Args:
+        route (Route): The route.
+        scalars (YamlScalars): The YAML representations of the strings written so far.
+    Returns:
+        The YAML text of the route.
+    """
+    path = route.path
+    lines = [f"- path: {scalars[path.name]}\n"
+             f"  end-point-1: {scalars[path.end_point_1.name]}\n"
+             f"  end-point-2: {scalars[path.end_point_2.name]}\n"]
+    if not route.feasible:
+        lines.append("  feasible: false\n")
+        return ''.join(lines)
+    lines.append(f"  feasible: true\n  length: {yaml_number(route.length)}\n")
+    if route.fidelity is not None:
+        lines.append(f"  fidelity: {yaml_number(route.fidelity)}\n")
+    lines.append("  routers:\n")
+    lines.extend(f"  - {scalars[router.name]}\n" for router in route.routers)
+    return ''.join(lines)
+
+class YamlScalars(dict):
+    """The YAML representations of strings, indexed by string. The representation of each distinct
+    string (e.g. a router name) is only determined once."""
+
+    _resolver = yaml.resolver.Resolver()
+
+    def __missing__(self, string):
+        if (PLAIN_SCALAR.match(string) and
+                self._resolver.resolve(yaml.ScalarNode, string, (True, False)) == STRING_TAG):
+            text = string
+        elif JSON_SCALAR.match(string):
+            text = json.dumps(string)
+        else:
+            text = yaml.safe_dump(string, default_style='"', allow_unicode=True,
+                                  width=float('inf')).rstrip('\n')
+        self[string] = text
+        return text
+
+def yaml_number(value):
+    """Format a number in the same way as the YAML emitter.
+
+    Args:
+        value: The number (an int or a float).
+    Returns:
+        The YAML representation of the number.
+    """
+    if isinstance(value, int):
+        return str(value)
+    if value != value:   # pylint:disable=comparison-with-itself
+        return '.nan'
+    if value in (float('inf'), float('-inf')):
+        return '.inf' if value > 0 else '-.inf'
+    text = repr(value).lower()
+    if '.' not in text and 'e' in text:
+        text = text.replace('e', '.0e', 1)
+    return text
+
+def route_to_yaml_model(route):
+    """Create the YAML model for a Route object.
+
+    Args:
+        route (Route): The route.
+    Returns:
+        A dictionary which can be dumped as YAML.
+    """
+    route_model = {
+        'path': route.path.name,
+        'end-point-1': route.path.end_point_1.name,
+        'end-point-2': route.path.end_point_2.name,
+        'feasible': route.feasible,
+    }
+    if route.feasible:
+        route_model['length'] = route.length
+        if route.fidelity is not None:
+            route_model['fidelity'] = route.fidelity
+        route_model['routers'] = [router.name for router in route.routers]
+    return route_model
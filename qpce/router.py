@@ -1,28 +1,36 @@
 """Quantum Router."""
 
-import collections
+import sys
 
 class Router:
-    # TODO: Remove this when we have more methods
-    # pylint:disable=too-few-public-methods
     """A quantum router.
 
     A quantum router object represents a quantum router that is part of a quantum network. Quantum
-    routers are interconnected by quantum links."""
+    routers are interconnected by quantum links.
 
-    def __init__(self, network, name):
+    Networks can contain millions of routers, so routers use slots instead of an instance
+    dictionary. The links of a router are stored in a dictionary indexed by local port. Ports are
+    never reused: a link which is added gets the next available port, and a link which is removed
+    is deleted from the dictionary, so the ports of the other links do not change."""
+
+    __slots__ = ('network', 'name', 'links', 'next_available_port', 'coordinates')
+
+    def __init__(self, network, name, coordinates=None):
         """Initialize a quantum router.
 
         Args:
             network (Network): The network in which the router is created.
             name (str): The name of quantum router; uniquely identifies the router within the
             quantum network.
+            coordinates (tuple): The coordinates of the router in the coordinate system of the
+                network (see module coordinates), or None if the position of the router is unknown.
         Raises:
             AssertionError if there is already a router with the same name in the network."""
         self.network = network
-        self.name = name
-        self._next_available_port = 0
-        self.links = collections.OrderedDict()     # Link objects indexed by local port
+        self.name = sys.intern(name)
+        self.links = {}                 # Link objects indexed by local port, in port order
+        self.next_available_port = 0    # The port to which the next added link will be attached
+        self.coordinates = coordinates
         network.add_router(self)
 
     def add_link(self, link):
@@ -35,9 +43,37 @@ class Router:
             The port to which the link was attached.
         Raises:
             AssertionError if there is already a router with the same name in the network."""
-        assert self in [link.router_1, link.router_2], \
+        assert self is link.router_1 or self is link.router_2, \
                f"Attempt to add link to router {self.name} which is not an end-point of the link"
-        port = self._next_available_port
-        self._next_available_port += 1
+        port = self.next_available_port
+        self.next_available_port = port + 1
         self.links[port] = link
+        self.network.topology_changed()
         return port
+
+    def remove_link(self, link):
+        """Remove a link from the router. The port(s) to which the link was attached become unused;
+        the ports of the other links on the router are not changed.
+
+        Args:
+            link (Link): The link to be removed.
+        Returns:
+            None
+        Raises:
+            AssertionError if the link is not attached to the router."""
+        links = self.links
+        ports = [port for port, router in ((link.port_1, link.router_1),
+                                           (link.port_2, link.router_2))
+                 if router is self and links.get(port) is link]
+        assert ports, f"Attempt to remove link from router {self.name} which is not attached to it"
+        for port in ports:
+            del links[port]
+        self.network.topology_changed()
+
+    def link_items(self):
+        """Get the links attached to the router, with their local ports, in port order.
+
+        Returns:
+            An iterable of (port, link) tuples.
+        """
+        return self.links.items()
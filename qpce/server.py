@@ -0,0 +1,409 @@
+"""Resident path computation server.
+
+The server keeps a network in memory and computes routes for paths on request, which avoids
+starting a new process and reading the network file for every demand. Clients connect over a local
+TCP socket or a Unix domain socket and exchange JSON documents, one per line. Each request is a JSON
+object with a "method" member and an optional "id" member, which is copied into the response:
+
+ * {"method": "route", "paths": [...]}: Compute the routes for a list of paths. Each path has the
+   same members as a path in the demand YAML file. The response has a "routes" member with a list
+   of routes, which have the same members as a route in the route YAML file.
+
+ * {"method": "load-network", "network-file": "..."}: Read a network YAML file or network snapshot
+   file and replace the network by it. Requests which are already being computed complete on the
+   old network. The response has "routers" and "links" members with the size of the new network.
+
+ * {"method": "status"}: The response describes the network, the number of requests and batches,
+   and the route cache.
+
+ * {"method": "shutdown"}: Stop the server after responding.
+
+If a request fails, the response has an "error" member with the error message instead.
+
+Requests are handled concurrently: a client may send several requests without waiting for the
+responses, and responses are sent as soon as they are ready, which is not necessarily in the order
+of the requests. Routes are computed in a separate thread, one batch at a time. All route requests
+which arrive while a batch is being computed are combined into the next batch, so that paths from
+different requests which share a source router share one shortest path tree, and paths between the
+same routers are computed only once. Computed routes are kept in a route cache until the network is
+replaced."""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import sys
+
+import demand_yaml
+import network_snapshot
+import network_yaml
+import route_cache
+import route_computation
+import route_yaml
+from demand import Demand
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7733
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_MAX_BATCH_PATHS = 10000
+
+# The maximum size of a request, in bytes.
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+
+class PathServerError(Exception):
+    """Exception is thrown when a request to the path computation server is not valid."""
+
+class PathServer:
+    # pylint:disable=too-many-instance-attributes
+    """A path computation server, which computes routes on a network which is kept in memory."""
+
+    def __init__(self, network, cache_size=DEFAULT_CACHE_SIZE,
+                 max_batch_paths=DEFAULT_MAX_BATCH_PATHS):
+        """Initialize a path computation server.
+
+        Args:
+            network (Network): The network on which routes are computed.
+            cache_size (int): The maximum number of entries in the route cache.
+            max_batch_paths (int): The maximum number of paths in a batch. A single request with
+                more paths is still computed as one batch.
+        """
+        self.cache_size = cache_size
+        self.max_batch_paths = max_batch_paths
+        self.nr_requests = 0
+        self.nr_batches = 0
+        self.network = None
+        self._cache = None
+        self._router_ids = None
+        self.set_network(network)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._queue = None
+        self._batcher = None
+        self._server = None
+        self._stopped = None
+        self._connections = {}   # Futures which are done when a connection is closed, by writer
+
+    def set_network(self, network):
+        """Replace the network on which routes are computed. The route cache is cleared.
+
+        Args:
+            network (Network): The new network.
+        Returns:
+            None
+        """
+        self._router_ids = network_yaml.router_ids_of_network(network)
+        self._cache = route_cache.RouteCache(network, self.cache_size)
+        self.network = network
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None):
+        """Start accepting connections.
+
+        Args:
+            host (str): The address of the TCP socket to listen on.
+            port (int): The port of the TCP socket to listen on, or 0 to choose a free port.
+            socket_path (str): The path of the Unix domain socket to listen on, or None to listen on
+                a TCP socket.
+        Returns:
+            The address of the listening socket.
+        """
+        self._queue = asyncio.Queue()
+        self._stopped = asyncio.Event()
+        self._batcher = asyncio.ensure_future(self._compute_batches())
+        if socket_path is None:
+            self._server = await asyncio.start_server(self._handle_connection, host, port,
+                                                      limit=MAX_REQUEST_SIZE)
+        else:
+            self._server = await asyncio.start_unix_server(self._handle_connection, socket_path,
+                                                           limit=MAX_REQUEST_SIZE)
+        return self._server.sockets[0].getsockname()
+
+    def stop(self):
+        """Stop the server; wait_stopped returns when it has stopped.
+
+        Returns:
+            None
+        """
+        self._stopped.set()
+
+    async def wait_stopped(self):
+        """Wait until the server is stopped, then close the listening socket and all connections.
+
+        Returns:
+            None
+        """
+        await self._stopped.wait()
+        self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        if self._connections:
+            await asyncio.wait(list(self._connections.values()))
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def handle_request(self, request):
+        """Handle a request.
+
+        Args:
+            request (dict): The parsed request.
+        Returns:
+            The response, as a dictionary (without the "id" member).
+        Raises:
+            PathServerError: The request is not valid.
+            ReadDemandYamlError: The paths in a route request are not valid.
+            ReadNetworkYamlError: The network file in a load-network request could not be read.
+            NetworkSnapshotError: The network snapshot in a load-network request could not be read.
+        """
+        self.nr_requests += 1
+        method = request.get('method')
+        if method == 'route':
+            return {'routes': await self.compute_routes(request.get('paths'))}
+        if method == 'load-network':
+            network = await self.load_network(request.get('network-file'))
+            return {'routers': len(network.routers), 'links': len(network.links)}
+        if method == 'status':
+            return self.status()
+        if method == 'shutdown':
+            return {'shutdown': True}
+        raise PathServerError(f"Unknown method {method}")
+
+    async def compute_routes(self, path_models):
+        """Compute the routes for a list of paths, in the next batch.
+
+        Args:
+            path_models (list): The paths, with the same members as in the demand YAML file.
+        Returns:
+            A list of route models, in the same order as the paths.
+        Raises:
+            ReadDemandYamlError: The paths are not valid.
+        """
+        if not isinstance(path_models, list):
+            raise PathServerError("Route request must have a list of paths")
+        demand_model = {'paths': path_models}
+        if not demand_yaml.DEMAND_VALIDATOR(demand_model):
+            demand_yaml.check_demand_yaml(demand_model)
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((path_models, future))
+        return await future
+
+    async def load_network(self, filename):
+        """Read a network file and replace the network by it. The network file is read in a
+        separate thread, so that requests on the old network are answered in the meantime.
+
+        Args:
+            filename (str): Filename of the network YAML file or network snapshot file.
+        Returns:
+            The new Network object.
+        """
+        if not isinstance(filename, str):
+            raise PathServerError("Load-network request must have a network file")
+        loop = asyncio.get_event_loop()
+        network = await loop.run_in_executor(None, network_snapshot.read_network_file, filename)
+        self.set_network(network)
+        return network
+
+    def status(self):
+        """Get the status of the server.
+
+        Returns:
+            A dictionary describing the network, the number of requests and batches, and the
+            route cache.
+        """
+        return {
+            'routers': len(self.network.routers),
+            'links': len(self.network.links),
+            'requests': self.nr_requests,
+            'batches': self.nr_batches,
+            'cache-entries': len(self._cache),
+            'cache-hits': self._cache.hits,
+            'cache-misses': self._cache.misses,
+        }
+
+    async def _handle_connection(self, reader, writer):
+        closed = asyncio.get_event_loop().create_future()
+        self._connections[writer] = closed
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self._write_response(writer, write_lock,
+                                               {'error': "Request is too large"})
+                    break
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._answer(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[writer]
+            writer.close()
+            closed.set_result(None)
+
+    async def _answer(self, line, writer, write_lock):
+        try:
+            request = json.loads(line.decode('utf-8'))
+        except ValueError as err:
+            await self._write_response(writer, write_lock, {'error': f"Invalid request ({err})"})
+            return
+        if not isinstance(request, dict):
+            await self._write_response(writer, write_lock,
+                                       {'error': "Request must be a JSON object"})
+            return
+        try:
+            response = await self.handle_request(request)
+        except (PathServerError, demand_yaml.ReadDemandYamlError,
+                network_yaml.ReadNetworkYamlError, network_snapshot.NetworkSnapshotError,
+                AssertionError) as err:
+            response = {'error': str(err)}
+        if 'id' in request:
+            response['id'] = request['id']
+        await self._write_response(writer, write_lock, response)
+        if response.get('shutdown'):
+            self.stop()
+
+    @staticmethod
+    async def _write_response(writer, write_lock, response):
+        async with write_lock:
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def _compute_batches(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            nr_paths = len(batch[0][0])
+            while not self._queue.empty() and nr_paths < self.max_batch_paths:
+                batch.append(self._queue.get_nowait())
+                nr_paths += len(batch[-1][0])
+            self.nr_batches += 1
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, compute_batch_routes, self.network, self._cache,
+                    self._router_ids, [path_models for path_models, _future in batch])
+            except Exception as err:   # pylint:disable=broad-except
+                results = [err] * len(batch)
+            for (_path_models, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+def compute_batch_routes(network, cache, router_ids, requests):
+    """Compute the routes for a batch of route requests in one route computation.
+
+    Args:
+        network (Network): The network on which the routes are computed.
+        cache (RouteCache): The route cache of the network.
+        router_ids (dict): The router ids (positions in network.routers) indexed by router name.
+        requests (list): For each request, the list of validated path models.
+    Returns:
+        For each request, either a list of route models, in the same order as the paths, or the
+        exception which made the request fail.
+    """
+    # pylint:disable=too-many-locals
+    results = []
+    columns = ([], [], [], [], [])
+    for path_models in requests:
+        try:
+            request_columns = list(zip(*[read_request_path(path_model, router_ids)
+                                         for path_model in path_models]))
+        except (PathServerError, demand_yaml.ReadDemandYamlError) as err:
+            results.append(err)
+            continue
+        results.append(None)
+        if request_columns:
+            for column, request_column in zip(columns, request_columns):
+                column.extend(request_column)
+    # The paths of different requests may have the same name, so the paths in the batch are named
+    # by their position in the batch.
+    names = columns[0]
+    batch_names = [str(position) for position in range(len(names))]
+    demand = Demand(network)
+    demand.add_paths_bulk(batch_names, *columns[1:])
+    routes = route_computation.compute_routes(network, demand, cache=cache)
+    position = 0
+    for request_index, path_models in enumerate(requests):
+        if results[request_index] is not None:
+            continue
+        route_models = []
+        for _path_model in path_models:
+            route_model = route_yaml.route_to_yaml_model(routes[batch_names[position]])
+            route_model['path'] = names[position]
+            route_models.append(route_model)
+            position += 1
+        results[request_index] = route_models
+    return results
+
+def read_request_path(path_model, router_ids):
+    """Get the attributes of a path in a route request.
+
+    Args:
+        path_model: The validated path model.
+        router_ids (dict): The router ids (positions in network.routers) indexed by router name.
+    Returns:
+        A (name, end_point_1_id, end_point_2_id, bandwidth, fidelity) tuple.
+    Raises:
+        ReadDemandYamlError: One of the end-points of the path is not an existing router.
+        PathServerError: The requested fidelity is not > 0.0.
+    """
+    path = demand_yaml.read_path_from_parsed_yaml(path_model, router_ids)
+    if not path[4] > 0.0:
+        raise PathServerError("Requested end-to-end fidelity must be > 0.0")
+    return path
+
+def parse_command_line_arguments(command_line_arguments):
+    """Parse command line arguments.
+
+    Returns: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(prog='qpce serve',
+                                     description='Quantum Path Computation Engine server')
+    parser.add_argument("network_file", metavar="network-file",
+                        help="Network YAML file or network snapshot file")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"TCP port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--socket", metavar="socket-path",
+                        help="Listen on a Unix domain socket instead of a TCP port")
+    parser.add_argument("--cache-size", metavar="cache-size", type=int,
+                        default=DEFAULT_CACHE_SIZE,
+                        help=f"Maximum number of entries in the route cache (default: "
+                             f"{DEFAULT_CACHE_SIZE})")
+    parser.add_argument("--max-batch-paths", metavar="max-batch-paths", type=int,
+                        default=DEFAULT_MAX_BATCH_PATHS,
+                        help=f"Maximum number of paths computed in one batch (default: "
+                             f"{DEFAULT_MAX_BATCH_PATHS})")
+    return parser.parse_args(command_line_arguments)
+
+def main(command_line_arguments):
+    """Entry point of the server: read the network and serve requests until a shutdown request is
+    received or the server is interrupted."""
+    parsed_arguments = parse_command_line_arguments(command_line_arguments)
+    network = network_snapshot.read_network_file(parsed_arguments.network_file)
+    server = PathServer(network, parsed_arguments.cache_size, parsed_arguments.max_batch_paths)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        address = loop.run_until_complete(server.start(parsed_arguments.host,
+                                                       parsed_arguments.port,
+                                                       parsed_arguments.socket))
+        print(f"Serving path computation requests on {address}", file=sys.stderr)
+        loop.run_until_complete(server.wait_stopped())
+    except KeyboardInterrupt:   # pragma: no cover
+        pass
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+    return 0
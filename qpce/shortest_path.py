@@ -0,0 +1,229 @@
+"""Shortest path computation over the adjacency index of a quantum network."""
+
+import heapq
+
+import instrumentation
+
+INFINITY = float('inf')
+
+class ShortestPathTree:
+    """A shortest path tree rooted at a source router.
+
+    The tree is computed using Dijkstra's algorithm with a binary heap over the lengths of the
+    links in a GraphIndex. Routers and links are identified by their ids in the index."""
+
+    def __init__(self, index, source_id):
+        """Compute the shortest path tree rooted at a source router.
+
+        Args:
+            index (GraphIndex): The adjacency index of the network.
+            source_id (int): The router id of the root of the tree.
+        """
+        # pylint:disable=too-many-locals
+        nr_routers = index.nr_routers
+        distances = [INFINITY] * nr_routers
+        parent_routers = [-1] * nr_routers
+        parent_links = [-1] * nr_routers
+        offsets, neighbors, link_ids, lengths = index.columns()
+        distances[source_id] = 0
+        heap = [(0, source_id)]
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        nr_heap_pushes = 1
+        while heap:
+            distance, router_id = heappop(heap)
+            if distance > distances[router_id]:
+                continue
+            for position in range(offsets[router_id], offsets[router_id + 1]):
+                neighbor = neighbors[position]
+                new_distance = distance + lengths[position]
+                if new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    parent_routers[neighbor] = router_id
+                    parent_links[neighbor] = link_ids[position]
+                    heappush(heap, (new_distance, neighbor))
+                    nr_heap_pushes += 1
+        instrumentation.count('shortest-path-trees')
+        instrumentation.count('heap-pushes', nr_heap_pushes)
+        self.source_id = source_id
+        self.distances = distances
+        self.parent_routers = parent_routers
+        self.parent_links = parent_links
+
+    def reachable(self, target_id):
+        """Is the target router reachable from the source router?
+
+        Args:
+            target_id (int): The router id of the target router.
+        Returns:
+            True if the target is reachable, False otherwise.
+        """
+        return self.distances[target_id] != INFINITY
+
+    def path_to(self, target_id):
+        """Get the shortest path from the source router to a target router.
+
+        Args:
+            target_id (int): The router id of the target router.
+        Returns:
+            A (router_ids, link_ids) tuple, where router_ids is the list of router ids from the
+            source to the target (inclusive) and link_ids is the list of link ids traversed, or None
+            if the target is not reachable.
+        """
+        if not self.reachable(target_id):
+            return None
+        router_ids = [target_id]
+        link_ids = []
+        router_id = target_id
+        while router_id != self.source_id:
+            link_ids.append(self.parent_links[router_id])
+            router_id = self.parent_routers[router_id]
+            router_ids.append(router_id)
+        router_ids.reverse()
+        link_ids.reverse()
+        return (router_ids, link_ids)
+
+def bidirectional_shortest_path(index, source_id, target_id):
+    """Compute the shortest path between two routers using bidirectional Dijkstra.
+
+    Links are bi-directional, so the search expands from both routers at the same time, each time
+    settling a router in the search whose next router is closest. Every link between the two
+    searches yields a candidate path; the search stops as soon as the sum of the distances of the
+    next routers in both searches is no shorter than the best candidate. On large networks, the two
+    searches together settle far fewer routers than a single search from the source router.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network.
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+    Returns:
+        A (length, router_ids, link_ids) tuple, where router_ids is the list of router ids from the
+        source to the target (inclusive) and link_ids is the list of link ids traversed, or None if
+        the target is not reachable.
+    """
+    # pylint:disable=too-many-locals,too-many-statements
+    if source_id == target_id:
+        instrumentation.count('settled-routers')
+        return (0, [source_id], [])
+    offsets, neighbors, link_ids, lengths = index.columns()
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    # Per direction (0 = from the source, 1 = from the target): the tentative distances, the
+    # parents (router id, link id) on the shortest path found so far, the settled routers, and the
+    # heap of (distance, router id) entries.
+    all_distances = ({source_id: 0}, {target_id: 0})
+    all_parents = ({source_id: None}, {target_id: None})
+    all_settled = (set(), set())
+    heaps = ([(0, source_id)], [(0, target_id)])
+    best_length = INFINITY
+    best_meeting = None   # (router id in source search, link id, router id in target search)
+    nr_heap_pushes = 2
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best_length:
+            break
+        direction = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        distances = all_distances[direction]
+        parents = all_parents[direction]
+        settled = all_settled[direction]
+        other_distances = all_distances[1 - direction]
+        distance, router_id = heappop(heaps[direction])
+        if router_id in settled:
+            continue
+        settled.add(router_id)
+        for position in range(offsets[router_id], offsets[router_id + 1]):
+            neighbor = neighbors[position]
+            new_distance = distance + lengths[position]
+            if new_distance < distances.get(neighbor, INFINITY):
+                distances[neighbor] = new_distance
+                parents[neighbor] = (router_id, link_ids[position])
+                heappush(heaps[direction], (new_distance, neighbor))
+                nr_heap_pushes += 1
+            other_distance = other_distances.get(neighbor)
+            if other_distance is not None and new_distance + other_distance < best_length:
+                best_length = new_distance + other_distance
+                if direction == 0:
+                    best_meeting = (router_id, link_ids[position], neighbor)
+                else:
+                    best_meeting = (neighbor, link_ids[position], router_id)
+    instrumentation.count('settled-routers', len(all_settled[0]) + len(all_settled[1]))
+    instrumentation.count('heap-pushes', nr_heap_pushes)
+    if best_meeting is None:
+        return None
+    source_side, meeting_link_id, target_side = best_meeting
+    router_ids, path_link_ids = _trace_parents(all_parents[0], source_side)
+    router_ids.reverse()
+    path_link_ids.reverse()
+    path_link_ids.append(meeting_link_id)
+    target_router_ids, target_link_ids = _trace_parents(all_parents[1], target_side)
+    router_ids.extend(target_router_ids)
+    path_link_ids.extend(target_link_ids)
+    return (best_length, router_ids, path_link_ids)
+
+def astar_shortest_path(index, source_id, target_id):
+    """Compute the shortest path between two routers using an A* search guided by the positions of
+    the routers.
+
+    The search settles routers in order of their distance from the source router plus a lower
+    bound on their distance to the target router: the (scaled) distance between the positions of
+    the router and the target router (see RouterPositions). The search therefore heads straight for
+    the target router, and only settles routers off the direct line when the links force a detour.
+    Ties are broken in favor of the router furthest from the source router.
+
+    Args:
+        index (GraphIndex): The adjacency index of the network. The positions of the routers must
+            be known (i.e. index.positions is not None).
+        source_id (int): The router id of the source router.
+        target_id (int): The router id of the target router.
+    Returns:
+        A (length, router_ids, link_ids) tuple, where router_ids is the list of router ids from the
+        source to the target (inclusive) and link_ids is the list of link ids traversed, or None if
+        the target is not reachable.
+    """
+    # pylint:disable=too-many-locals
+    assert index.positions is not None, "A* search needs the positions of the routers"
+    lower_bound = index.positions.lower_bounds(target_id)
+    offsets, neighbors, link_ids, lengths = index.columns()
+    distances = {source_id: 0}
+    parents = {source_id: None}
+    settled = set()
+    heap = [(lower_bound(source_id), 0, source_id)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    nr_heap_pushes = 1
+    while heap:
+        _estimate, negative_distance, router_id = heappop(heap)
+        if router_id in settled:
+            continue
+        settled.add(router_id)
+        if router_id == target_id:
+            break
+        distance = -negative_distance
+        for position in range(offsets[router_id], offsets[router_id + 1]):
+            neighbor = neighbors[position]
+            new_distance = distance + lengths[position]
+            if new_distance < distances.get(neighbor, INFINITY):
+                distances[neighbor] = new_distance
+                parents[neighbor] = (router_id, link_ids[position])
+                heappush(heap, (new_distance + lower_bound(neighbor), -new_distance, neighbor))
+                nr_heap_pushes += 1
+    instrumentation.count('settled-routers', len(settled))
+    instrumentation.count('heap-pushes', nr_heap_pushes)
+    if target_id not in settled:
+        return None
+    router_ids, path_link_ids = _trace_parents(parents, target_id)
+    router_ids.reverse()
+    path_link_ids.reverse()
+    return (distances[target_id], router_ids, path_link_ids)
+
+def _trace_parents(parents, router_id):
+    # Follow the parents from a router back to the root of a search. Returns the router ids and link
+    # ids from the router to the root.
+    router_ids = [router_id]
+    link_ids = []
+    parent = parents[router_id]
+    while parent is not None:
+        router_id, link_id = parent
+        router_ids.append(router_id)
+        link_ids.append(link_id)
+        parent = parents[router_id]
+    return (router_ids, link_ids)
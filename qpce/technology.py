@@ -0,0 +1,114 @@
+"""Model of the technology which is used to implement a quantum network."""
+
+import array
+
+from fidelity import FidelityModel
+
+FIBER_LIGHT_SPEED = 2.0e8           # Meters per second; the speed of light in optical fiber
+
+DEFAULT_ATTEMPT_RATE = 1.0e6        # Entanglement attempts per second on a link of length zero
+DEFAULT_DETECTION_EFFICIENCY = 1.0
+DEFAULT_FIBER_ATTENUATION = 0.2     # dB per kilometer
+DEFAULT_INITIAL_FIDELITY = 1.0
+
+class Technology(FidelityModel):
+    """The technology which is used to implement a quantum network, e.g. nitrogen-vacancy centers
+    or trapped ions: the parameters which determine the rate and the fidelity of the elementary Bell
+    pairs which a link produces, as a function of the length of the link.
+
+    Elementary Bell pairs are produced by heralded entanglement attempts. Each attempt emits a
+    photon into the fiber, and the attempt succeeds if the photon survives the fiber attenuation and
+    is detected. The result of an attempt is only known when the heralding signal has traveled back
+    over the fiber, so an attempt takes the inverse of the attempt rate plus the round trip time of
+    the link. The memory qubit decoheres while it waits for the heralding signal, which makes the
+    fidelity decay exponentially with the length of the link.
+
+    The rate and the fidelity of a link only depend on its length, so they are computed once for
+    each distinct length and then looked up. The fidelity factors are compatible with
+    FidelityModel, so a technology can be used wherever a fidelity model is expected."""
+
+    def __init__(self, name, attempt_rate=DEFAULT_ATTEMPT_RATE,
+                 detection_efficiency=DEFAULT_DETECTION_EFFICIENCY,
+                 fiber_attenuation=DEFAULT_FIBER_ATTENUATION,
+                 initial_fidelity=DEFAULT_INITIAL_FIDELITY, coherence_time=None):
+        # pylint:disable=too-many-arguments
+        """Initialize a technology.
+
+        Args:
+            name (str): The name of the technology.
+            attempt_rate (float): The maximum number of entanglement attempts per second (i.e. on
+                a link of length zero). Must be > 0.0.
+            detection_efficiency (float): The probability that a photon which arrives at the end of
+                the fiber is detected. Must be > 0.0 and <= 1.0.
+            fiber_attenuation (float): The attenuation of the fiber in dB per kilometer. Must be
+                >= 0.0.
+            initial_fidelity (float): The fidelity of an elementary Bell pair on a link of length
+                zero. Must be > 0.0 and <= 1.0.
+            coherence_time (float): The time in seconds after which the fidelity of a stored qubit
+                has decayed by a factor e, or None if qubits do not decohere. Must be > 0.0.
+        """
+        assert attempt_rate > 0.0, f"Invalid attempt rate {attempt_rate}"
+        assert 0.0 < detection_efficiency <= 1.0, \
+               f"Invalid detection efficiency {detection_efficiency}"
+        assert fiber_attenuation >= 0.0, f"Invalid fiber attenuation {fiber_attenuation}"
+        assert coherence_time is None or coherence_time > 0.0, \
+               f"Invalid coherence time {coherence_time}"
+        if coherence_time is None:
+            decay_per_meter = 0.0
+        else:
+            decay_per_meter = 2.0 / (FIBER_LIGHT_SPEED * coherence_time)
+        super().__init__(initial_fidelity, decay_per_meter)
+        self.name = name
+        self.attempt_rate = attempt_rate
+        self.detection_efficiency = detection_efficiency
+        self.fiber_attenuation = fiber_attenuation
+        self.coherence_time = coherence_time
+        self._link_rates = {}           # Elementary Bell pair rates indexed by link length
+        self._link_fidelities = {}      # Fidelity factors indexed by link length
+
+    def link_rate(self, length):
+        """Compute the rate at which a link produces elementary Bell pairs.
+
+        Args:
+            length (int): The length of the link in meters.
+        Returns:
+            The rate in Bell pairs per second.
+        """
+        success_probability = (self.detection_efficiency *
+                               10.0 ** (-self.fiber_attenuation * length / 10000.0))
+        attempt_time = 1.0 / self.attempt_rate + 2.0 * length / FIBER_LIGHT_SPEED
+        return success_probability / attempt_time
+
+    def link_rates(self, network):
+        """Get the elementary Bell pair rates of all links in a network.
+
+        Args:
+            network (Network): The network.
+        Returns:
+            An array of rates in Bell pairs per second, indexed by link id.
+        """
+        return _link_values(network, self.link_rate, self._link_rates)
+
+    def link_fidelities(self, network):
+        """Get the fidelity factors of all links in a network.
+
+        Args:
+            network (Network): The network.
+        Returns:
+            An array of fidelity factors indexed by link id.
+        """
+        return _link_values(network, self.link_fidelity, self._link_fidelities)
+
+def _link_values(network, value_of_length, values_by_length):
+    # Look up a value for each link in a table of values indexed by link length, and compute (and
+    # add to the table) the value for each length which is not in the table yet. Links often have
+    # few distinct lengths, e.g. in generated topologies.
+    values = array.array('d', bytes(8 * len(network.links)))
+    for link_id, link in enumerate(network.links):
+        length = link.length
+        value = values_by_length.get(length)
+        if value is None:
+            value = value_of_length(length)
+            values_by_length[length] = value
+        values[link_id] = value
+    return values
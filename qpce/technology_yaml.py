@@ -0,0 +1,103 @@
+"""Parsing of the technology YAML file."""
+
+import yaml
+
+import instrumentation
+from fast_validation import compile_schema
+from technology import Technology
+from yaml_stream import SafeLoader
+
+TECHNOLOGY_SCHEMA = {
+    'name': {'type': 'string', 'required': True},
+    'attempt-rate': {'type': 'number', 'min': 0.001},
+    'detection-efficiency': {'type': 'number', 'min': 0.000001, 'max': 1},
+    'fiber-attenuation': {'type': 'number', 'min': 0},
+    'initial-fidelity': {'type': 'number', 'min': 0.000001, 'max': 1},
+    'coherence-time': {'type': 'number', 'min': 0.000000001},
+}
+
+# The keyword arguments of Technology, indexed by the corresponding field of the technology YAML
+# document. Fields which are not present get the default value of the keyword argument.
+TECHNOLOGY_ARGUMENTS = {
+    'attempt-rate': 'attempt_rate',
+    'detection-efficiency': 'detection_efficiency',
+    'fiber-attenuation': 'fiber_attenuation',
+    'initial-fidelity': 'initial_fidelity',
+    'coherence-time': 'coherence_time',
+}
+
+TECHNOLOGY_VALIDATOR = compile_schema(TECHNOLOGY_SCHEMA)
+
+class ReadTechnologyYamlError(Exception):
+    """Exception is thrown when there is a problem reading the technology YAML file."""
+
+def read_technology_from_yaml_file(filename):
+    """Read and parse a technology YAML document from a file.
+
+    Args:
+        filename (str): Filename of the file to read the technology YAML document from.
+    Returns:
+        A Technology object.
+    Raises:
+        ReadTechnologyYamlError: There was a problem reading the technology model.
+    """
+    try:
+        file = open(filename, 'r')
+    except (OSError, IOError) as err:
+        message = f"Could not open technology file {filename} ({err})"
+        raise ReadTechnologyYamlError(message)
+    with file:
+        return read_technology_from_yaml_stream(file)
+
+def read_technology_from_yaml_stream(stream):
+    """Read and parse a technology YAML document from a stream and return the corresponding
+    technology model.
+
+    Args:
+        stream: Stream to read the technology YAML document from.
+    Returns:
+        A Technology object.
+    Raises:
+        ReadTechnologyYamlError: There was a problem reading the technology model.
+    """
+    with instrumentation.span('technology-read'):
+        try:
+            technology_model = yaml.load(stream, Loader=SafeLoader)
+        except yaml.YAMLError as err:
+            message = f"Could not parse technology YAML document ({err})"
+            raise ReadTechnologyYamlError(message)
+        if not TECHNOLOGY_VALIDATOR(technology_model):
+            check_technology_yaml(technology_model)
+        return read_technology_from_parsed_yaml(technology_model)
+
+def check_technology_yaml(technology_model):
+    """Validate a parsed technology YAML document using cerberus and report the errors. This is
+    only used for documents that fail the fast validation, to produce a detailed error report.
+
+    Args:
+        technology_model: The parsed technology YAML document.
+    Returns:
+        None, if cerberus considers the document to be valid.
+    Raises:
+        ReadTechnologyYamlError: The document is not valid.
+    """
+    if not isinstance(technology_model, dict):
+        raise ReadTechnologyYamlError("Could not validate technology YAML document "
+                                      "(must be a mapping)")
+    import cerberus   # pylint:disable=import-outside-toplevel
+    validator = cerberus.Validator(TECHNOLOGY_SCHEMA)
+    if not validator.validate(technology_model):
+        message = f"Could not validate technology YAML document ({validator.errors})"
+        raise ReadTechnologyYamlError(message)
+
+def read_technology_from_parsed_yaml(technology_model):
+    """Create a Technology object from a technology_model, i.e. from parsed YAML file.
+
+    Args:
+        technology_model: The parsed technology YAML file.
+    Returns:
+        A Technology object.
+    """
+    arguments = {argument: technology_model[field]
+                 for field, argument in TECHNOLOGY_ARGUMENTS.items() if field in technology_model}
+    return Technology(technology_model['name'], **arguments)
@@ -0,0 +1,423 @@
+"""Generation of synthetic network topologies and demands, e.g. for benchmarks."""
+
+import math
+
+import numpy
+
+from coordinates import PLANAR
+from demand import Demand
+from network import Network
+
+GRID = 'grid'
+RING = 'ring'
+RANDOM_GEOMETRIC = 'random-geometric'
+WAXMAN = 'waxman'
+SCALE_FREE = 'scale-free'
+TOPOLOGY_KINDS = [GRID, RING, RANDOM_GEOMETRIC, WAXMAN, SCALE_FREE]
+
+DEFAULT_LINK_LENGTH = 1000        # Meters
+DEFAULT_AREA_SIZE = 1000000       # Meters; the side of the square in which routers are placed
+DEFAULT_DEGREE = 6                # Expected number of links per router in random topologies
+DEFAULT_WAXMAN_ALPHA = 0.15
+DEFAULT_LINKS_PER_NEW_ROUTER = 3  # For scale-free topologies
+DEFAULT_BANDWIDTH = 10
+DEFAULT_FIDELITY = 0.9
+
+class SyntheticTopology:
+    """A synthetic network topology, in the columnar form used by Network.add_routers_bulk and
+    Network.add_links_bulk. The topology can be turned into a Network object or written as a
+    network YAML document."""
+
+    def __init__(self, kind, router_names, router_1_ids, router_2_ids, lengths, coordinates=None):
+        # pylint:disable=too-many-arguments
+        """Initialize a synthetic topology.
+
+        Args:
+            kind (str): The kind of topology, e.g. GRID.
+            router_names (list): The router names indexed by router id.
+            router_1_ids (list): The router ids of the first routers of the links.
+            router_2_ids (list): The router ids of the second routers of the links.
+            lengths (list): The lengths of the links in meters.
+            coordinates (list): The planar (x, y) coordinates of the routers in meters, indexed by
+                router id, or None if the routers have no position.
+        """
+        self.kind = kind
+        self.router_names = router_names
+        self.router_1_ids = router_1_ids
+        self.router_2_ids = router_2_ids
+        self.lengths = lengths
+        self.coordinates = coordinates
+
+    @property
+    def nr_routers(self):
+        """The number of routers in the topology."""
+        return len(self.router_names)
+
+    @property
+    def nr_links(self):
+        """The number of links in the topology."""
+        return len(self.lengths)
+
+    def network(self):
+        """Create a network with this topology.
+
+        Returns:
+            A Network object.
+        """
+        network = Network()
+        if self.coordinates is not None:
+            network.coordinate_system = PLANAR
+        network.add_routers_bulk(self.router_names, self.coordinates)
+        network.add_links_bulk(self.router_1_ids, self.router_2_ids, self.lengths)
+        return network
+
+    def write_yaml_file(self, filename):
+        """Write this topology to a network YAML file.
+
+        Args:
+            filename (str): Filename of the network YAML file.
+        Returns:
+            None
+        """
+        with open(filename, 'w') as file:
+            self.write_yaml_stream(file)
+
+    def write_yaml_stream(self, stream):
+        """Write this topology as a network YAML document to a stream.
+
+        Args:
+            stream: The stream to write the network YAML document to.
+        Returns:
+            None
+        """
+        names = self.router_names
+        stream.write("routers:\n")
+        if self.coordinates is None:
+            for name in names:
+                stream.write(f"- name: {name}\n")
+        else:
+            for name, (x, y) in zip(names, self.coordinates):
+                stream.write(f"- name: {name}\n"
+                             f"  x: {x:.3f}\n"
+                             f"  y: {y:.3f}\n")
+        stream.write("links:\n")
+        for router_1_id, router_2_id, length in zip(self.router_1_ids, self.router_2_ids,
+                                                    self.lengths):
+            stream.write(f"- router-1: {names[router_1_id]}\n"
+                         f"  router-2: {names[router_2_id]}\n"
+                         f"  length: {length}\n")
+
+class SyntheticDemand:
+    """A synthetic demand, in the columnar form used by Demand.add_paths_bulk. The demand can be
+    turned into a Demand object or written as a demand YAML document."""
+
+    def __init__(self, topology, end_point_1_ids, end_point_2_ids, bandwidth=DEFAULT_BANDWIDTH,
+                 fidelity=DEFAULT_FIDELITY):
+        # pylint:disable=too-many-arguments
+        """Initialize a synthetic demand. All paths request the same bandwidth and fidelity.
+
+        Args:
+            topology (SyntheticTopology): The topology to which the demand applies.
+            end_point_1_ids (list): The router ids of the first end-points of the paths.
+            end_point_2_ids (list): The router ids of the second end-points of the paths.
+            bandwidth (int): The requested bandwidth of each path.
+            fidelity (float): The requested fidelity of each path.
+        """
+        self.topology = topology
+        self.end_point_1_ids = end_point_1_ids
+        self.end_point_2_ids = end_point_2_ids
+        self.bandwidth = bandwidth
+        self.fidelity = fidelity
+
+    @property
+    def nr_paths(self):
+        """The number of paths in the demand."""
+        return len(self.end_point_1_ids)
+
+    def path_names(self):
+        """Get the names of the paths in the demand.
+
+        Returns:
+            A list of path names.
+        """
+        return [f"path-{path_nr}" for path_nr in range(self.nr_paths)]
+
+    def demand(self, network):
+        """Create a demand object for this demand.
+
+        Args:
+            network (Network): The network created from the topology of the demand.
+        Returns:
+            A Demand object.
+        """
+        demand = Demand(network)
+        demand.add_paths_bulk(self.path_names(), self.end_point_1_ids, self.end_point_2_ids,
+                              [self.bandwidth] * self.nr_paths, [self.fidelity] * self.nr_paths)
+        return demand
+
+    def write_yaml_file(self, filename):
+        """Write this demand to a demand YAML file.
+
+        Args:
+            filename (str): Filename of the demand YAML file.
+        Returns:
+            None
+        """
+        with open(filename, 'w') as file:
+            self.write_yaml_stream(file)
+
+    def write_yaml_stream(self, stream):
+        """Write this demand as a demand YAML document to a stream.
+
+        Args:
+            stream: The stream to write the demand YAML document to.
+        Returns:
+            None
+        """
+        names = self.topology.router_names
+        stream.write("paths:\n")
+        for path_name, end_point_1_id, end_point_2_id in zip(self.path_names(),
+                                                             self.end_point_1_ids,
+                                                             self.end_point_2_ids):
+            stream.write(f"- name: {path_name}\n"
+                         f"  end-point-1: {names[end_point_1_id]}\n"
+                         f"  end-point-2: {names[end_point_2_id]}\n"
+                         f"  bandwidth: {self.bandwidth}\n"
+                         f"  fidelity: {self.fidelity}\n")
+
+def generate_topology(kind, nr_routers, seed=1):
+    """Generate a topology of a given kind and (approximate) size, using default parameters.
+
+    Args:
+        kind (str): The kind of topology, one of TOPOLOGY_KINDS.
+        nr_routers (int): The number of routers. Grid topologies are rounded down to a square.
+        seed (int): The seed of the random number generator.
+    Returns:
+        A SyntheticTopology object.
+    """
+    assert kind in TOPOLOGY_KINDS, f"Unknown topology kind {kind}"
+    if kind == GRID:
+        side = max(1, int(math.sqrt(nr_routers)))
+        return grid_topology(side, side)
+    if kind == RING:
+        return ring_topology(nr_routers)
+    if kind == RANDOM_GEOMETRIC:
+        return random_geometric_topology(nr_routers, seed=seed)
+    if kind == WAXMAN:
+        return waxman_topology(nr_routers, seed=seed)
+    return scale_free_topology(nr_routers, seed=seed)
+
+def grid_topology(nr_rows, nr_columns, link_length=DEFAULT_LINK_LENGTH):
+    """Generate a rectangular grid topology, in which each router is linked to its horizontal and
+    vertical neighbors.
+
+    Args:
+        nr_rows (int): The number of rows of routers. Must be > 0.
+        nr_columns (int): The number of columns of routers. Must be > 0.
+        link_length (int): The length of each link in meters.
+    Returns:
+        A SyntheticTopology object.
+    """
+    assert nr_rows > 0 and nr_columns > 0, "Grid must have at least one row and column"
+    router_1_ids = []
+    router_2_ids = []
+    for row in range(nr_rows):
+        for column in range(nr_columns):
+            router_id = row * nr_columns + column
+            if column + 1 < nr_columns:
+                router_1_ids.append(router_id)
+                router_2_ids.append(router_id + 1)
+            if row + 1 < nr_rows:
+                router_1_ids.append(router_id)
+                router_2_ids.append(router_id + nr_columns)
+    return SyntheticTopology(GRID, _router_names(nr_rows * nr_columns), router_1_ids, router_2_ids,
+                             [link_length] * len(router_1_ids))
+
+def ring_topology(nr_routers, link_length=DEFAULT_LINK_LENGTH):
+    """Generate a ring topology.
+
+    Args:
+        nr_routers (int): The number of routers. Must be >= 3.
+        link_length (int): The length of each link in meters.
+    Returns:
+        A SyntheticTopology object.
+    """
+    assert nr_routers >= 3, "Ring must have at least three routers"
+    router_1_ids = list(range(nr_routers))
+    router_2_ids = list(range(1, nr_routers)) + [0]
+    return SyntheticTopology(RING, _router_names(nr_routers), router_1_ids, router_2_ids,
+                             [link_length] * nr_routers)
+
+def random_geometric_topology(nr_routers, degree=DEFAULT_DEGREE, area_size=DEFAULT_AREA_SIZE,
+                              seed=1):
+    # pylint:disable=too-many-locals
+    """Generate a random geometric topology: routers are placed uniformly at random in a square, and
+    every pair of routers which are within a fixed radius of each other is linked. The radius is
+    chosen so that the expected number of links per router is the given degree.
+
+    Args:
+        nr_routers (int): The number of routers. Must be > 0.
+        degree (float): The expected number of links per router.
+        area_size (int): The length of the side of the square in meters.
+        seed (int): The seed of the random number generator.
+    Returns:
+        A SyntheticTopology object, with the planar coordinates of the routers.
+    """
+    assert nr_routers > 0, "Topology must have at least one router"
+    generator = _random_generator(seed)
+    x_coordinates, y_coordinates = _place_routers(generator, nr_routers, area_size)
+    radius = area_size * math.sqrt(degree / (nr_routers * math.pi))
+    router_1_ids = []
+    router_2_ids = []
+    lengths = []
+    # The routers are sorted by x coordinate, so the candidate neighbors of a router are the routers
+    # which follow it in the sort order with an x coordinate at most radius larger.
+    order = numpy.argsort(x_coordinates)
+    sorted_x = x_coordinates[order]
+    sorted_y = y_coordinates[order]
+    ends = numpy.searchsorted(sorted_x, sorted_x + radius, side='right')
+    for position in range(nr_routers):
+        candidates = slice(position + 1, ends[position])
+        distances = numpy.hypot(sorted_x[candidates] - sorted_x[position],
+                                sorted_y[candidates] - sorted_y[position])
+        neighbors = numpy.nonzero(distances <= radius)[0]
+        router_1_ids.extend([int(order[position])] * len(neighbors))
+        router_2_ids.extend(order[position + 1 + neighbors].tolist())
+        lengths.extend(_link_lengths(distances[neighbors]))
+    return SyntheticTopology(RANDOM_GEOMETRIC, _router_names(nr_routers), router_1_ids,
+                             router_2_ids, lengths, _coordinates(x_coordinates, y_coordinates))
+
+def waxman_topology(nr_routers, degree=DEFAULT_DEGREE, alpha=DEFAULT_WAXMAN_ALPHA,
+                    area_size=DEFAULT_AREA_SIZE, seed=1):
+    # pylint:disable=too-many-arguments,too-many-locals
+    """Generate a Waxman topology: routers are placed uniformly at random in a square, and each pair
+    of routers at distance d is linked with probability beta * exp(-d / (alpha * L)), where L is the
+    diagonal of the square. Beta is chosen so that the expected number of links per router is
+    (approximately) the given degree.
+
+    Every pair of routers is considered, so generating a Waxman topology takes time quadratic in
+    the number of routers.
+
+    Args:
+        nr_routers (int): The number of routers. Must be > 0.
+        degree (float): The expected number of links per router.
+        alpha (float): The Waxman alpha parameter; smaller values favor shorter links.
+        area_size (int): The length of the side of the square in meters.
+        seed (int): The seed of the random number generator.
+    Returns:
+        A SyntheticTopology object, with the planar coordinates of the routers.
+    """
+    assert nr_routers > 0, "Topology must have at least one router"
+    generator = _random_generator(seed)
+    x_coordinates, y_coordinates = _place_routers(generator, nr_routers, area_size)
+    diagonal = area_size * math.sqrt(2.0)
+    # The distance d between two random points in a unit square has density 2*pi*d - 8*d^2 + 2*d^3
+    # for d <= 1. Integrating exp(-d / scale) against it gives the mean of exp(-d / (alpha * L))
+    # over all pairs, which is accurate for small alpha (where longer distances hardly contribute).
+    scale = alpha * math.sqrt(2.0)
+    mean_attenuation = 2.0 * math.pi * scale ** 2 - 16.0 * scale ** 3 + 12.0 * scale ** 4
+    beta = min(1.0, degree / (max(1, nr_routers - 1) * mean_attenuation))
+    router_1_ids = []
+    router_2_ids = []
+    lengths = []
+    for router_id in range(nr_routers - 1):
+        distances = numpy.hypot(x_coordinates[router_id + 1:] - x_coordinates[router_id],
+                                y_coordinates[router_id + 1:] - y_coordinates[router_id])
+        probabilities = beta * numpy.exp(-distances / (alpha * diagonal))
+        neighbors = numpy.nonzero(generator.random_sample(len(distances)) < probabilities)[0]
+        router_1_ids.extend([router_id] * len(neighbors))
+        router_2_ids.extend((router_id + 1 + neighbors).tolist())
+        lengths.extend(_link_lengths(distances[neighbors]))
+    return SyntheticTopology(WAXMAN, _router_names(nr_routers), router_1_ids, router_2_ids, lengths,
+                             _coordinates(x_coordinates, y_coordinates))
+
+def scale_free_topology(nr_routers, links_per_new_router=DEFAULT_LINKS_PER_NEW_ROUTER,
+                        max_link_length=10 * DEFAULT_LINK_LENGTH, seed=1):
+    """Generate a scale-free topology using the Barabasi-Albert preferential attachment model: the
+    routers are added one at a time, and each new router is linked to a number of distinct existing
+    routers, which are chosen with a probability proportional to their number of links. The links
+    have random lengths.
+
+    Args:
+        nr_routers (int): The number of routers. Must be > 0.
+        links_per_new_router (int): The number of links added for each new router. Must be > 0.
+        max_link_length (int): The maximum length of a link in meters.
+        seed (int): The seed of the random number generator.
+    Returns:
+        A SyntheticTopology object.
+    """
+    assert nr_routers > 0, "Topology must have at least one router"
+    assert links_per_new_router > 0, "Each new router must add at least one link"
+    generator = _random_generator(seed)
+    router_1_ids = []
+    router_2_ids = []
+    # Each router appears in link_end_points once for every link it has, so picking a uniformly
+    # random entry picks a router with a probability proportional to its number of links.
+    link_end_points = []
+    nr_initial_routers = min(nr_routers, links_per_new_router)
+    for router_id in range(1, nr_initial_routers):
+        router_1_ids.append(router_id - 1)
+        router_2_ids.append(router_id)
+        link_end_points.extend([router_id - 1, router_id])
+    for router_id in range(nr_initial_routers, nr_routers):
+        if link_end_points:
+            targets = set()
+            while len(targets) < links_per_new_router:
+                targets.add(link_end_points[generator.randint(len(link_end_points))])
+        else:
+            targets = set(range(router_id))
+        for target in sorted(targets):
+            router_1_ids.append(router_id)
+            router_2_ids.append(target)
+            link_end_points.extend([router_id, target])
+    lengths = generator.randint(1, max_link_length + 1, size=len(router_1_ids)).tolist()
+    return SyntheticTopology(SCALE_FREE, _router_names(nr_routers), router_1_ids, router_2_ids,
+                             lengths)
+
+def random_demand(topology, nr_paths, seed=1):
+    """Generate a demand with paths between random pairs of distinct routers.
+
+    Args:
+        topology (SyntheticTopology): The topology to which the demand applies. Must have at least
+            two routers.
+        nr_paths (int): The number of paths.
+        seed (int): The seed of the random number generator.
+    Returns:
+        A SyntheticDemand object.
+    """
+    nr_routers = topology.nr_routers
+    assert nr_routers >= 2, "Demand needs at least two routers"
+    generator = _random_generator(seed)
+    end_point_1_ids = generator.randint(nr_routers, size=nr_paths)
+    # Adding a non-zero offset modulo the number of routers gives a distinct second end-point.
+    offsets = generator.randint(1, nr_routers, size=nr_paths)
+    end_point_2_ids = (end_point_1_ids + offsets) % nr_routers
+    return SyntheticDemand(topology, end_point_1_ids.tolist(), end_point_2_ids.tolist())
+
+def full_mesh_demand(topology):
+    """Generate a demand with a path between every pair of distinct routers.
+
+    Args:
+        topology (SyntheticTopology): The topology to which the demand applies.
+    Returns:
+        A SyntheticDemand object.
+    """
+    end_point_1_ids, end_point_2_ids = numpy.triu_indices(topology.nr_routers, 1)
+    return SyntheticDemand(topology, end_point_1_ids.tolist(), end_point_2_ids.tolist())
+
+def _router_names(nr_routers):
+    return [f"router-{router_nr}" for router_nr in range(nr_routers)]
+
+def _random_generator(seed):
+    # RandomState (rather than the newer Generator) is used to support older versions of NumPy.
+    return numpy.random.RandomState(seed)   # pylint:disable=no-member
+
+def _place_routers(generator, nr_routers, area_size):
+    return (generator.random_sample(nr_routers) * area_size,
+            generator.random_sample(nr_routers) * area_size)
+
+def _coordinates(x_coordinates, y_coordinates):
+    return list(zip(x_coordinates.tolist(), y_coordinates.tolist()))
+
+def _link_lengths(distances):
+    return numpy.maximum(1, numpy.rint(distances)).astype(numpy.int64).tolist()
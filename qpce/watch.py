@@ -0,0 +1,370 @@
+"""Watch mode: keep the routes current while the network and demand files are edited.
+
+The network and demand files are watched for changes. When a file changes, it is read again and
+compared with the in-memory network or demand, and only the routes which are affected by the
+differences are recomputed (see IncrementalRouting). The routes are then written again.
+
+Files are watched using inotify on Linux, and by polling their size and modification time
+otherwise. Either way, a file is only read again if its contents changed: saving a file without
+changing it does not trigger a recomputation. Editors and scripts often write a file in several
+steps, or update several files one after another, so changes are only acted upon once the files
+have not changed for a short quiet period (the debounce time). A burst of writes to both files
+then triggers a single recomputation."""
+
+import os
+import select
+import sys
+import time
+
+import instrumentation
+import network_snapshot
+
+DEFAULT_POLL_INTERVAL = 1.0     # Seconds
+DEFAULT_DEBOUNCE_TIME = 0.2     # Seconds
+
+# The inotify events which indicate that a file in a watched directory may have changed (see
+# inotify(7)): modified, closed after writing, moved into the directory, created, or deleted.
+INOTIFY_EVENTS = 0x002 | 0x008 | 0x080 | 0x100 | 0x200
+INOTIFY_READ_SIZE = 65536
+
+class FileWatcher:
+    """Watches a set of files for changes to their contents."""
+
+    def __init__(self, filenames, poll_interval=DEFAULT_POLL_INTERVAL,
+                 debounce_time=DEFAULT_DEBOUNCE_TIME, use_inotify=True):
+        """Start watching files. The current contents of the files are the baseline against which
+        changes are detected.
+
+        Args:
+            filenames (list): The filenames of the files to be watched.
+            poll_interval (float): The interval in seconds at which the files are checked for
+                changes, if inotify is not used (or as a fallback, if it is).
+            debounce_time (float): The time in seconds for which the files must not change, before
+                a change is reported.
+            use_inotify (bool): Use inotify to be notified of changes, if it is available.
+        """
+        self.filenames = list(filenames)
+        self.poll_interval = poll_interval
+        self.debounce_time = debounce_time
+        self._signatures = {filename: file_signature(filename) for filename in self.filenames}
+        self._digests = {filename: file_digest(filename) for filename in self.filenames}
+        self._inotify = None
+        if use_inotify:
+            self._inotify = Inotify.create({os.path.dirname(os.path.abspath(filename))
+                                            for filename in self.filenames})
+
+    @property
+    def uses_inotify(self):
+        """Is inotify used to be notified of changes?"""
+        return self._inotify is not None
+
+    def close(self):
+        """Stop watching the files.
+
+        Returns:
+            None
+        """
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def wait_for_change(self, timeout=None):
+        """Wait until the contents of one or more of the files changed, and the files have not
+        changed for the debounce time.
+
+        Args:
+            timeout (float): The maximum time to wait in seconds, or None to wait forever.
+        Returns:
+            The list of filenames of the files whose contents changed (a file which was deleted
+            counts as changed), or an empty list if the timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed_filenames = self._changed_signatures()
+            if changed_filenames:
+                changed_filenames = self._wait_until_quiet(changed_filenames)
+                changed_filenames = [filename for filename in changed_filenames
+                                     if self._update_digest(filename)]
+                if changed_filenames:
+                    return changed_filenames
+            if deadline is None:
+                wait_time = self.poll_interval
+            else:
+                wait_time = min(self.poll_interval, deadline - time.monotonic())
+                if wait_time <= 0.0:
+                    return []
+            self._sleep(wait_time)
+
+    def _changed_signatures(self):
+        changed_filenames = []
+        for filename in self.filenames:
+            signature = file_signature(filename)
+            if signature != self._signatures[filename]:
+                self._signatures[filename] = signature
+                changed_filenames.append(filename)
+        return changed_filenames
+
+    def _wait_until_quiet(self, changed_filenames):
+        # Wait until no file changed for the debounce time, and return all files which changed.
+        changed_filenames = set(changed_filenames)
+        while True:
+            self._sleep(self.debounce_time, self.debounce_time)
+            more_changed_filenames = self._changed_signatures()
+            if not more_changed_filenames:
+                return [filename for filename in self.filenames if filename in changed_filenames]
+            changed_filenames.update(more_changed_filenames)
+
+    def _update_digest(self, filename):
+        # Returns True if the contents of the file changed since its digest was last computed.
+        digest = file_digest(filename)
+        if digest == self._digests[filename]:
+            return False
+        self._digests[filename] = digest
+        return True
+
+    def _sleep(self, wait_time, minimum_wait_time=0.0):
+        # Wait for an inotify event (or the wait time), or just sleep if inotify is not used. With
+        # inotify, the wait continues for at least the minimum wait time (for debouncing).
+        if self._inotify is None:
+            time.sleep(wait_time)
+            return
+        start_time = time.monotonic()
+        self._inotify.wait(wait_time)
+        remaining_time = minimum_wait_time - (time.monotonic() - start_time)
+        if remaining_time > 0.0:
+            time.sleep(remaining_time)
+
+def file_signature(filename):
+    """Get a signature of a file which changes whenever the file is written or replaced.
+
+    Args:
+        filename (str): The filename of the file.
+    Returns:
+        A (modification time, size, inode) tuple, or None if the file does not exist.
+    """
+    try:
+        status = os.stat(filename)
+    except OSError:
+        return None
+    return (status.st_mtime_ns, status.st_size, status.st_ino)
+
+def file_digest(filename):
+    """Compute a digest of the contents of a file.
+
+    Args:
+        filename (str): The filename of the file.
+    Returns:
+        The SHA-256 digest of the contents of the file, or None if the file can not be read.
+    """
+    import hashlib   # pylint:disable=import-outside-toplevel
+    digest = hashlib.sha256()
+    try:
+        with open(filename, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.digest()
+
+class Inotify:
+    """A minimal inotify(7) instance, which watches directories and is only used to wake up when
+    something changed in them. The events themselves are discarded; the watcher checks the files
+    to see what changed. Directories (rather than files) are watched, so that files which are
+    replaced (e.g. written to a temporary file which is then renamed) continue to be watched."""
+
+    def __init__(self, libc, file_descriptor):
+        """Wrap an inotify instance.
+
+        Args:
+            libc: The C library (a ctypes.CDLL object).
+            file_descriptor (int): The file descriptor of the inotify instance.
+        """
+        self.libc = libc
+        self.file_descriptor = file_descriptor
+
+    @classmethod
+    def create(cls, directories):
+        """Create an inotify instance which watches directories.
+
+        Args:
+            directories: An iterable of directory names.
+        Returns:
+            An Inotify object, or None if inotify is not available (e.g. not on Linux).
+        """
+        if not sys.platform.startswith('linux'):
+            return None
+        import ctypes   # pylint:disable=import-outside-toplevel
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            file_descriptor = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if file_descriptor < 0:
+            return None
+        inotify = cls(libc, file_descriptor)
+        for directory in directories:
+            if libc.inotify_add_watch(file_descriptor, os.fsencode(directory),
+                                      INOTIFY_EVENTS) < 0:
+                inotify.close()
+                return None
+        return inotify
+
+    def wait(self, timeout):
+        """Wait until something changed in one of the directories, or until the timeout expires.
+
+        Args:
+            timeout (float): The maximum time to wait in seconds.
+        Returns:
+            True if something changed, False if the timeout expired.
+        """
+        readable, _writable, _exceptional = select.select([self.file_descriptor], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            while os.read(self.file_descriptor, INOTIFY_READ_SIZE):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        """Close the inotify instance.
+
+        Returns:
+            None
+        """
+        os.close(self.file_descriptor)
+
+class RouteWatcher:
+    """The routes for a demand on a network, which are kept current while the network and demand
+    files are edited."""
+
+    def __init__(self, network_file, demand_file, technology=None):
+        """Read the network and the demand, and compute the initial routes.
+
+        Args:
+            network_file (str): The filename of the network YAML file or network snapshot file.
+            demand_file (str): The filename of the demand YAML file.
+            technology (Technology): The technology of the network, which determines the fidelity
+                of the routes, or None to ignore fidelity.
+        """
+        self.network_file = network_file
+        self.demand_file = demand_file
+        self.technology = technology
+        self.routing = None
+        self.pending_filenames = set()   # Changed files which have not been read successfully
+        self.reload()
+
+    def reload(self):
+        """Read the network and demand files, and compute all routes from scratch.
+
+        Returns:
+            None
+        Raises:
+            ReadNetworkYamlError, NetworkSnapshotError, ReadDemandYamlError: There was a problem
+                reading the network or the demand. The current routes are kept in this case.
+        """
+        import demand_yaml   # pylint:disable=import-outside-toplevel
+        from incremental import IncrementalRouting   # pylint:disable=import-outside-toplevel
+        network = network_snapshot.read_network_file(self.network_file)
+        demand = demand_yaml.read_demand_from_yaml_file(self.demand_file, network)
+        self.routing = IncrementalRouting(network, demand, self.technology)
+        self.pending_filenames = set()
+
+    def update(self, changed_filenames):
+        """Read the changed files again, and recompute the routes affected by the changes.
+
+        The files which changed before, but could not be read then, are read again as well: a file
+        is only considered up to date once an update which reads it has succeeded.
+
+        Args:
+            changed_filenames (list): The filenames of the files which changed.
+        Returns:
+            A (description, path_names) tuple, where description describes the changes to the
+            network and path_names is the list of names of the paths which were re-routed.
+        Raises:
+            ReadNetworkYamlError, NetworkSnapshotError, ReadDemandYamlError: There was a problem
+                reading the network or the demand. The current routes are kept in this case, and
+                the changed files are read again by the next update.
+        """
+        import demand_yaml   # pylint:disable=import-outside-toplevel
+        import network_delta   # pylint:disable=import-outside-toplevel
+        self.pending_filenames.update(changed_filenames)
+        changed_filenames = self.pending_filenames
+        routing = self.routing
+        if self.network_file in changed_filenames:
+            new_network = network_snapshot.read_network_file(self.network_file)
+            plan = network_delta.plan_network_update(routing.network, new_network)
+            if plan is None:
+                self.reload()
+                return ("network replaced", list(self.routing.demand.paths))
+            # The new demand is read before the network is changed, so that the network is not
+            # changed if the demand can not be read.
+            if self.demand_file in changed_filenames:
+                demand_yaml.read_demand_from_yaml_file(self.demand_file, new_network)
+            changes = plan.apply()
+            description = changes.summary()
+            path_names = routing.apply_network_changes(changes)
+        else:
+            description = "no network changes"
+            path_names = []
+        if self.demand_file in changed_filenames:
+            demand = demand_yaml.read_demand_from_yaml_file(self.demand_file, routing.network)
+            path_names += routing.update_demand(demand)
+        self.pending_filenames = set()
+        return (description, path_names)
+
+    def routes(self):
+        """Get the current routes.
+
+        Returns:
+            A list of Route objects, in the order of the paths in the demand.
+        """
+        routes = self.routing.routes
+        return [routes[path_name] for path_name in self.routing.demand.paths]
+
+def watch(network_file, demand_file, write_routes, technology=None, max_updates=None,
+          poll_interval=DEFAULT_POLL_INTERVAL, debounce_time=DEFAULT_DEBOUNCE_TIME):
+    # pylint:disable=too-many-arguments,too-many-locals
+    """Compute the routes for a demand, and keep them current while the network and demand files
+    are edited. The routes are written initially and after every update. Progress and problems are
+    reported on standard error.
+
+    Args:
+        network_file (str): The filename of the network YAML file or network snapshot file.
+        demand_file (str): The filename of the demand YAML file.
+        write_routes: A function which takes a list of Route objects and writes them.
+        technology (Technology): The technology of the network, or None to ignore fidelity.
+        max_updates (int): The number of updates after which to stop watching, or None to watch
+            until interrupted.
+        poll_interval (float): See FileWatcher.
+        debounce_time (float): See FileWatcher.
+    Returns:
+        None
+    """
+    # The watcher is started before the files are read, so that changes made while the files are
+    # read are not missed.
+    watcher = FileWatcher([network_file, demand_file], poll_interval, debounce_time)
+    try:
+        route_watcher = RouteWatcher(network_file, demand_file, technology)
+        write_routes(route_watcher.routes())
+        nr_updates = 0
+        while max_updates is None or nr_updates < max_updates:
+            changed_filenames = watcher.wait_for_change()
+            nr_updates += 1
+            start_time = time.perf_counter()
+            try:
+                with instrumentation.span('watch-update'):
+                    description, path_names = route_watcher.update(changed_filenames)
+            except Exception as err:   # pylint:disable=broad-except
+                # E.g. a file which is not valid while it is being edited; the changed files are
+                # read again with the next change to either file (see RouteWatcher.update).
+                print(f"Could not update routes ({err})", file=sys.stderr)
+                continue
+            elapsed_time = time.perf_counter() - start_time
+            write_routes(route_watcher.routes())
+            print(f"Changed {', '.join(changed_filenames)} ({description}): re-routed "
+                  f"{len(path_names)} of {len(route_watcher.routing.demand.paths)} paths in "
+                  f"{elapsed_time:.6f} seconds", file=sys.stderr)
+    finally:
+        watcher.close()
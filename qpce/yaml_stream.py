@@ -0,0 +1,87 @@
+"""Reading YAML documents as a stream of events, one entry at a time."""
+
+import yaml
+
+# Use the libyaml based loader if PyYAML was built with libyaml support; it is much faster.
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+class YamlNodeReader:
+    """Reads the nodes of a YAML document one at a time from the event stream of a YAML loader.
+
+    The libyaml based loader does not expose a composer for individual nodes, so nodes are composed
+    here from the events. This works with both the libyaml based loader and the pure Python
+    loader."""
+
+    def __init__(self, loader):
+        """Initialize a YAML node reader.
+
+        Args:
+            loader: The YAML loader (a SafeLoader object).
+        """
+        self.loader = loader
+        self.anchors = {}
+
+    def read(self):
+        """Compose and construct the next node from the event stream.
+
+        Returns:
+            The constructed Python object for the node.
+        Raises:
+            yaml.YAMLError: There was a problem parsing the YAML document.
+        """
+        loader = self.loader
+        node = self.compose()
+        value = loader.construct_object(node, deep=True)
+        # The constructor remembers every object it constructed; forget them so that the memory
+        # usage does not grow with the size of the document.
+        loader.constructed_objects = {}
+        loader.recursive_objects = {}
+        return value
+
+    def compose(self):
+        """Compose the next node from the event stream.
+
+        Returns:
+            A yaml.Node object.
+        Raises:
+            yaml.YAMLError: There was a problem parsing the YAML document.
+        """
+        loader = self.loader
+        event = loader.get_event()
+        if isinstance(event, yaml.AliasEvent):
+            if event.anchor not in self.anchors:
+                raise yaml.composer.ComposerError(None, None,
+                                                  f"found undefined alias {event.anchor}",
+                                                  event.start_mark)
+            return self.anchors[event.anchor]
+        if isinstance(event, yaml.ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+            node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark,
+                                   style=event.style)
+        elif isinstance(event, yaml.SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.SequenceNode, None, event.implicit)
+            node = yaml.SequenceNode(tag, [], event.start_mark, None,
+                                     flow_style=event.flow_style)
+            while not loader.check_event(yaml.SequenceEndEvent):
+                node.value.append(self.compose())
+            node.end_mark = loader.get_event().end_mark
+        elif isinstance(event, yaml.MappingStartEvent):
+            tag = event.tag
+            if tag is None or tag == '!':
+                tag = loader.resolve(yaml.MappingNode, None, event.implicit)
+            node = yaml.MappingNode(tag, [], event.start_mark, None, flow_style=event.flow_style)
+            while not loader.check_event(yaml.MappingEndEvent):
+                key_node = self.compose()
+                value_node = self.compose()
+                node.value.append((key_node, value_node))
+            node.end_mark = loader.get_event().end_mark
+        else:
+            raise yaml.composer.ComposerError(None, None, f"unexpected event {event}",
+                                              event.start_mark)
+        if event.anchor is not None:
+            self.anchors[event.anchor] = node
+        return node
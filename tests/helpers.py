@@ -0,0 +1,66 @@
+"""Helper functions shared by the unit tests."""
+
+import random
+
+from network import Network
+
+def make_network(router_names, link_specs):
+    """Create a network from router names and link specifications.
+
+    Args:
+        router_names (list): The names of the routers.
+        link_specs (list): (router_1_name, router_2_name, length) tuples. Links with a router which
+            is not in router_names are skipped.
+    Returns:
+        A Network object.
+    """
+    network = Network()
+    network.add_routers_bulk(router_names)
+    router_ids = {name: router_id for router_id, name in enumerate(router_names)}
+    link_specs = [(name_1, name_2, length) for name_1, name_2, length in link_specs
+                  if name_1 in router_ids and name_2 in router_ids]
+    network.add_links_bulk([router_ids[name_1] for name_1, _name_2, _length in link_specs],
+                           [router_ids[name_2] for _name_1, name_2, _length in link_specs],
+                           [length for _name_1, _name_2, length in link_specs])
+    return network
+
+def random_link_specs(generator, router_names, nr_links, max_length=100):
+    """Generate random link specifications, which may include parallel links and links from a
+    router to itself.
+
+    Args:
+        generator (random.Random): The random number generator.
+        router_names (list): The names of the routers.
+        nr_links (int): The number of links.
+        max_length (int): The maximum length of a link.
+    Returns:
+        A list of (router_1_name, router_2_name, length) tuples.
+    """
+    return [(generator.choice(router_names), generator.choice(router_names),
+             generator.randint(1, max_length)) for _ in range(nr_links)]
+
+def random_network(nr_routers, nr_links, seed, max_length=100):
+    """Create a random network, which may have parallel links, links from a router to itself, and
+    unreachable routers.
+
+    Args:
+        nr_routers (int): The number of routers, which are named router-0, router-1, etc.
+        nr_links (int): The number of links.
+        seed (int): The seed of the random number generator.
+        max_length (int): The maximum length of a link.
+    Returns:
+        A Network object.
+    """
+    router_names = [f"router-{router_nr}" for router_nr in range(nr_routers)]
+    link_specs = random_link_specs(random.Random(seed), router_names, nr_links, max_length)
+    return make_network(router_names, link_specs)
+
+def route_names(route):
+    """Get the names of the routers on a route.
+
+    Args:
+        route (Route): The route.
+    Returns:
+        A list of router names.
+    """
+    return [router.name for router in route.routers]
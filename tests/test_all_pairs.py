@@ -0,0 +1,102 @@
+"""Unit tests for module all_pairs."""
+
+import numpy
+import pytest
+
+import demand_yaml
+import network_yaml
+from all_pairs import AllPairsShortestPaths, DIJKSTRA, FLOYD_WARSHALL, choose_all_pairs_method
+from all_pairs import read_all_pairs_file, write_all_pairs_file
+from demand import Demand
+from fidelity import FidelityModel
+from helpers import random_network
+from link import Link
+from network import Network
+from path import Path
+from router import Router
+from route_computation import compute_routes
+
+def test_methods_agree():
+    """Test that Floyd-Warshall and repeated Dijkstra compute the same distances, on a network
+    which is larger than one Floyd-Warshall block and has parallel links, self-loops and
+    unreachable routers."""
+    network = random_network(150, 300, 1)
+    floyd_warshall = AllPairsShortestPaths(network, FLOYD_WARSHALL)
+    dijkstra = AllPairsShortestPaths(network, DIJKSTRA)
+    assert numpy.array_equal(floyd_warshall.distances, dijkstra.distances)
+    assert numpy.isinf(floyd_warshall.distances).any()
+    index = network.index()
+    for source_id in range(0, 150, 7):
+        for target_id in range(0, 150, 3):
+            path_ids = floyd_warshall.path_ids(source_id, target_id)
+            if path_ids is None:
+                assert numpy.isinf(dijkstra.distances[source_id, target_id])
+                continue
+            router_ids, link_ids = path_ids
+            assert router_ids[0] == source_id and router_ids[-1] == target_id
+            length = 0
+            for router_id, next_router_id, link_id in zip(router_ids, router_ids[1:], link_ids):
+                link = network.links[link_id]
+                link_router_ids = {index.router_ids[link.router_1.name],
+                                   index.router_ids[link.router_2.name]}
+                assert link_router_ids == {router_id, next_router_id}
+                length += link.length
+            assert length == floyd_warshall.distances[source_id, target_id]
+
+def test_compute_routes():
+    """Test that routes computed from the matrices match the routes computed per source."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    all_pairs = AllPairsShortestPaths(network)
+    assert all_pairs.method == FLOYD_WARSHALL
+    routes = all_pairs.compute_routes(demand)
+    expected_routes = compute_routes(network, demand)
+    assert list(routes) == list(expected_routes)
+    for path_name, route in routes.items():
+        assert route.length == expected_routes[path_name].length
+        assert route.routers[0] is demand.paths[path_name].end_point_1
+        assert route.routers[-1] is demand.paths[path_name].end_point_2
+
+def test_compute_routes_unreachable_and_fidelity():
+    """Test routing unreachable paths and paths whose shortest route has too low a fidelity."""
+    network = Network()
+    alice, bob, carol, _ = [Router(network, name) for name in ["alice", "bob", "carol", "david"]]
+    for router_1, router_2, length in [(alice, bob, 100), (alice, carol, 10), (carol, bob, 10)]:
+        Link(router_1, router_2, length)
+    demand = Demand(network)
+    Path(demand, "alice-to-bob", alice, bob, 10, 0.95)
+    Path(demand, "alice-to-david", alice, network.routers["david"], 10, 0.9)
+    Path(demand, "alice-to-alice", alice, alice, 10, 0.9)
+    all_pairs = AllPairsShortestPaths(network, DIJKSTRA)
+    routes = all_pairs.compute_routes(demand, FidelityModel(hop_fidelity=0.96))
+    assert routes["alice-to-bob"].routers == [alice, bob]
+    assert routes["alice-to-bob"].fidelity == pytest.approx(0.96)
+    assert not routes["alice-to-david"].feasible
+    assert routes["alice-to-alice"].length == 0
+    routes = all_pairs.compute_routes(demand)
+    assert routes["alice-to-bob"].routers == [alice, carol, bob]
+
+def test_reuse_and_staleness(tmpdir):
+    """Test reusing the matrices for another demand, from a file, and after a topology change."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    all_pairs = AllPairsShortestPaths(network)
+    filename = str(tmpdir.join("network.npz"))
+    assert read_all_pairs_file(filename, network) is None
+    write_all_pairs_file(filename, all_pairs)
+    other_network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    reused = read_all_pairs_file(filename, other_network)
+    assert numpy.array_equal(reused.distances, all_pairs.distances)
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", other_network)
+    assert reused.compute_routes(demand)["alice-to-erin-1"].length == 200
+    Link(network.routers["alice"], network.routers["erin"], 50)
+    assert not all_pairs.current
+    with pytest.raises(AssertionError):
+        all_pairs.compute_routes(demand)
+    assert read_all_pairs_file(filename, network) is None
+
+def test_choose_method():
+    """Test that Floyd-Warshall is chosen for small and dense networks, and repeated Dijkstra for
+    large sparse ones."""
+    assert choose_all_pairs_method(Network().index()) == FLOYD_WARSHALL
+    assert choose_all_pairs_method(random_network(100, 1000, 2).index()) == FLOYD_WARSHALL
+    assert choose_all_pairs_method(random_network(5000, 6000, 3).index()) == DIJKSTRA
@@ -0,0 +1,107 @@
+"""Unit tests for module constrained_path."""
+
+import random
+import pytest
+
+from constrained_path import constrained_shortest_path
+from demand import Demand
+from fidelity import FidelityModel, route_fidelity
+from link import Link
+from network import Network
+from path import Path
+from route_computation import compute_routes
+from router import Router
+
+def make_network():
+    """Make a network in which the shortest route has more hops than the direct link."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    carol = Router(network, "carol")
+    dave = Router(network, "dave")
+    Link(alice, carol, 10)
+    Link(carol, dave, 10)
+    Link(dave, bob, 10)
+    Link(alice, bob, 50)
+    return network
+
+def test_constrained_shortest_path():
+    """Test that the fidelity constraint selects a longer route with fewer hops."""
+    network = make_network()
+    index = network.index()
+    link_fidelities = FidelityModel(hop_fidelity=0.9).link_fidelities(network)
+    alice_id = index.router_ids["alice"]
+    bob_id = index.router_ids["bob"]
+    length, fidelity, router_ids, link_ids = \
+        constrained_shortest_path(index, link_fidelities, alice_id, bob_id, 0.7)
+    assert length == 30
+    assert fidelity == pytest.approx(0.729)
+    assert [index.router_names[router_id] for router_id in router_ids] == \
+           ["alice", "carol", "dave", "bob"]
+    assert link_ids == [0, 1, 2]
+    length, fidelity, router_ids, link_ids = \
+        constrained_shortest_path(index, link_fidelities, alice_id, bob_id, 0.8)
+    assert length == 50
+    assert fidelity == pytest.approx(0.9)
+    assert router_ids == [alice_id, bob_id]
+    assert link_ids == [3]
+    assert constrained_shortest_path(index, link_fidelities, alice_id, bob_id, 0.95) is None
+    assert constrained_shortest_path(index, link_fidelities, alice_id, alice_id, 1.5) is None
+    residual_capacities = [10, 10, 10, 5]
+    assert constrained_shortest_path(index, link_fidelities, alice_id, bob_id, 0.8,
+                                     residual_capacities, 10) is None
+    assert constrained_shortest_path(index, link_fidelities, alice_id, bob_id, 0.7,
+                                     residual_capacities, 10)[0] == 30
+
+def _brute_force(index, link_fidelities, source_id, target_id, min_fidelity):
+    best_length = None
+    stack = [(source_id, 0, 1.0, {source_id})]
+    while stack:
+        router_id, length, fidelity, visited = stack.pop()
+        if router_id == target_id:
+            if best_length is None or length < best_length:
+                best_length = length
+            continue
+        for neighbor, link_id, link_length in index.adjacencies(router_id):
+            new_fidelity = fidelity * link_fidelities[link_id]
+            if neighbor not in visited and new_fidelity >= min_fidelity:
+                stack.append((neighbor, length + link_length, new_fidelity, visited | {neighbor}))
+    return best_length
+
+def test_constrained_shortest_path_random():
+    """Compare the constrained shortest path against enumeration of all simple paths."""
+    generator = random.Random(1)
+    for _ in range(20):
+        network = Network()
+        routers = [Router(network, f"router-{number}") for number in range(7)]
+        for _ in range(14):
+            Link(generator.choice(routers), generator.choice(routers), generator.randint(1, 100))
+        index = network.index()
+        link_fidelities = FidelityModel(0.95, 0.002).link_fidelities(network)
+        for min_fidelity in [0.5, 0.7, 0.8]:
+            result = constrained_shortest_path(index, link_fidelities, 0, 6, min_fidelity)
+            expected = _brute_force(index, link_fidelities, 0, 6, min_fidelity)
+            if expected is None:
+                assert result is None
+            else:
+                length, fidelity, _router_ids, link_ids = result
+                assert length == expected
+                assert fidelity >= min_fidelity
+                assert fidelity == pytest.approx(route_fidelity(link_fidelities, link_ids))
+
+def test_compute_routes_with_fidelity():
+    """Test computing routes with a fidelity model."""
+    network = make_network()
+    alice = network.routers["alice"]
+    bob = network.routers["bob"]
+    demand = Demand(network)
+    Path(demand, "low-fidelity", alice, bob, 10, 0.7)
+    Path(demand, "high-fidelity", bob, alice, 10, 0.8)
+    Path(demand, "too-high-fidelity", alice, bob, 10, 0.95)
+    routes = compute_routes(network, demand, FidelityModel(hop_fidelity=0.9))
+    assert routes["low-fidelity"].length == 30
+    assert routes["low-fidelity"].fidelity == pytest.approx(0.729)
+    assert routes["high-fidelity"].length == 50
+    assert routes["high-fidelity"].routers == [bob, alice]
+    assert routes["high-fidelity"].fidelity == pytest.approx(0.9)
+    assert not routes["too-high-fidelity"].feasible
@@ -0,0 +1,42 @@
+"""Unit tests for module coordinates."""
+
+import pytest
+
+import coordinates
+
+AMSTERDAM = (52.3676, 4.9041)
+PARIS = (48.8566, 2.3522)
+SYDNEY = (-33.8688, 151.2093)
+
+def test_distances():
+    """Test planar and great-circle distances."""
+    assert coordinates.distance(coordinates.PLANAR, (0, 0), (3000, 4000)) == 5000
+    assert coordinates.distance(coordinates.GEOGRAPHIC, AMSTERDAM, PARIS) == \
+           pytest.approx(430e3, rel=0.01)
+    assert coordinates.distance(coordinates.GEOGRAPHIC, AMSTERDAM, AMSTERDAM) == 0
+    assert coordinates.great_circle_distance((0, 0), (0, 180)) == \
+           pytest.approx(3.14159265 * coordinates.EARTH_RADIUS)
+
+@pytest.mark.parametrize("coordinate_system,router_coordinates", [
+    (coordinates.PLANAR, [(0, 0), (3000, 4000), (-500.5, 20.25)]),
+    (coordinates.GEOGRAPHIC, [AMSTERDAM, PARIS, SYDNEY]),
+])
+def test_router_positions(coordinate_system, router_coordinates):
+    """Test that the lower bounds of router positions are the distances between the routers."""
+    positions = coordinates.RouterPositions(coordinate_system, router_coordinates, [])
+    assert positions.scale == 1.0
+    for target_id, target_coordinates in enumerate(router_coordinates):
+        lower_bound = positions.lower_bounds(target_id)
+        for router_id, router_coordinates_1 in enumerate(router_coordinates):
+            expected = coordinates.distance(coordinate_system, router_coordinates_1,
+                                            target_coordinates)
+            assert lower_bound(router_id) == pytest.approx(expected, abs=1e-6)
+            assert positions.distance(router_id, target_id) == pytest.approx(expected, abs=1e-6)
+
+def test_router_positions_scale():
+    """Test that the lower bounds are scaled down if a link is shorter than the distance between
+    its routers."""
+    positions = coordinates.RouterPositions(coordinates.PLANAR, [(0, 0), (0, 1000), (0, 3000)],
+                                            [(0, 1, 1000), (1, 2, 1600), (0, 2, 3000)])
+    assert positions.scale == pytest.approx(0.8)
+    assert positions.lower_bounds(0)(2) <= 1000 + 1600
@@ -0,0 +1,60 @@
+"""Unit tests for module fast_validation."""
+
+import cerberus
+import pytest
+
+from demand_yaml import DEMAND_SCHEMA, PATH_SCHEMA
+from fast_validation import compile_rules, compile_schema
+from network_yaml import LINK_SCHEMA, NETWORK_SCHEMA
+
+DOCUMENTS = [
+    {'router-1': 'alice', 'router-2': 'bob', 'length': 10},
+    {'router-1': 'alice', 'router-2': 'bob', 'length': 10, 'capacity': 5},
+    {'router-1': 'alice', 'router-2': 'bob', 'length': 0},
+    {'router-1': 'alice', 'router-2': 'bob', 'length': True},
+    {'router-1': 'alice', 'router-2': 'bob', 'length': 1.5},
+    {'router-1': 'alice', 'router-2': 'bob', 'length': None},
+    {'router-1': 'alice', 'router-2': 'bob'},
+    {'router-1': 'alice', 'router-2': 'bob', 'length': 10, 'unknown': 1},
+    {'router-1': 1, 'router-2': 'bob', 'length': 10},
+    {'routers': [{'name': 'alice'}], 'links': []},
+    {'routers': [{'name': 'alice'}, {'name': 5}]},
+    {'routers': 'alice'},
+    {'routers': [['alice']]},
+    {'links': [{'router-1': 'alice', 'router-2': 'bob', 'length': -1}]},
+    {},
+    {'paths': [{'name': 'p', 'end-point-1': 'a', 'end-point-2': 'b', 'bandwidth': 1,
+                'fidelity': 0.5}]},
+    {'paths': [{'name': 'p', 'end-point-1': 'a', 'end-point-2': 'b', 'bandwidth': 1,
+                'fidelity': 1}]},
+    {'paths': [{'name': 'p', 'end-point-1': 'a', 'end-point-2': 'b', 'bandwidth': 0,
+                'fidelity': 0.5}]},
+    {'paths': [{'name': 'p', 'end-point-1': 'a', 'end-point-2': 'b', 'fidelity': 0.5}]},
+]
+
+def test_same_result_as_cerberus():
+    """Test that the compiled validators accept exactly the documents that cerberus accepts."""
+    for schema in [LINK_SCHEMA, NETWORK_SCHEMA, PATH_SCHEMA, DEMAND_SCHEMA]:
+        validate = compile_schema(schema)
+        for document in DOCUMENTS:
+            expected = cerberus.Validator(schema).validate(document)
+            assert validate(document) == expected, f"{schema} {document}"
+
+def test_not_a_mapping():
+    """Test that a document which is not a mapping is not valid."""
+    validate = compile_schema(NETWORK_SCHEMA)
+    assert not validate(None)
+    assert not validate(['routers'])
+
+def test_max_rule():
+    """Test the max rule."""
+    validate = compile_rules({'type': 'float', 'min': 0.0, 'max': 1.0})
+    assert validate(0.5)
+    assert validate(1)
+    assert not validate(1.5)
+    assert not validate(-0.5)
+
+def test_unsupported_rule():
+    """Test that compiling a schema with an unsupported rule fails."""
+    with pytest.raises(AssertionError):
+        _validate = compile_schema({'name': {'type': 'string', 'regex': '[a-z]+'}})
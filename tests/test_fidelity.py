@@ -0,0 +1,37 @@
+"""Unit tests for module fidelity."""
+
+import math
+import pytest
+
+from fidelity import FidelityModel, route_fidelity
+from link import Link
+from network import Network
+from router import Router
+
+def test_link_fidelity():
+    """Test computing the fidelity factor of a link."""
+    model = FidelityModel(hop_fidelity=0.9, decay_per_meter=0.001)
+    assert model.link_fidelity(0) == pytest.approx(0.9)
+    assert model.link_fidelity(1000) == pytest.approx(0.9 * math.exp(-1.0))
+
+def test_link_fidelities():
+    """Test computing the fidelity factors of all links in a network."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    Link(alice, bob, 100)
+    Link(alice, bob, 200)
+    model = FidelityModel(decay_per_meter=0.01)
+    link_fidelities = model.link_fidelities(network)
+    assert link_fidelities == [pytest.approx(math.exp(-1.0)), pytest.approx(math.exp(-2.0))]
+    assert route_fidelity(link_fidelities, [0, 1]) == pytest.approx(math.exp(-3.0))
+    assert route_fidelity(link_fidelities, []) == 1.0
+
+def test_bad_fidelity_model():
+    """Attempt to create fidelity models with invalid parameters."""
+    with pytest.raises(AssertionError):
+        _model = FidelityModel(hop_fidelity=0.0)
+    with pytest.raises(AssertionError):
+        _model = FidelityModel(hop_fidelity=1.1)
+    with pytest.raises(AssertionError):
+        _model = FidelityModel(decay_per_meter=-0.1)
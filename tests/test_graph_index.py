@@ -0,0 +1,76 @@
+"""Unit tests for module graph_index."""
+
+import pickle
+
+from graph_index import GraphIndex
+from link import Link
+from network import Network
+from router import Router
+import network_yaml
+
+def test_build_index():
+    """Test building an index from a small network."""
+    network = Network()
+    alice, bob, carol = [Router(network, name) for name in ["alice", "bob", "carol"]]
+    Link(alice, bob, 100)
+    Link(bob, carol, 200)
+    index = GraphIndex(network)
+    assert index.nr_routers == 3
+    assert index.nr_links == 2
+    assert index.router_names == ["alice", "bob", "carol"]
+    assert index.router_ids == {"alice": 0, "bob": 1, "carol": 2}
+    assert list(index.offsets) == [0, 1, 3, 4]
+    assert list(index.adjacencies(0)) == [(1, 0, 100)]
+    assert list(index.adjacencies(1)) == [(0, 0, 100), (2, 1, 200)]
+    assert list(index.adjacencies(2)) == [(1, 1, 200)]
+
+def test_build_index_self_link():
+    """Test that a link from a router to itself appears twice in the adjacencies of that router."""
+    network = Network()
+    alice = Router(network, "alice")
+    Link(alice, alice, 10)
+    index = GraphIndex(network)
+    assert index.nr_links == 1
+    assert list(index.adjacencies(0)) == [(0, 0, 10), (0, 0, 10)]
+
+def test_build_index_from_yaml():
+    """Test building an index from a network read from a YAML file."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    index = GraphIndex(network)
+    assert index.nr_routers == 5
+    assert index.nr_links == 7
+    for router_id, router_name in enumerate(index.router_names):
+        router = network.routers[router_name]
+        neighbors = [index.router_names[neighbor]
+                     for neighbor, _, _ in index.adjacencies(router_id)]
+        expected = [link.router_2.name if link.router_1 is router else link.router_1.name
+                    for _port, link in router.link_items()]
+        assert neighbors == expected
+
+def test_network_index_invalidated():
+    """Test that the index of a network is rebuilt after the topology changes."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    index = network.index()
+    assert index.nr_links == 0
+    assert network.index() is index
+    Link(alice, bob, 100)
+    index = network.index()
+    assert index.nr_links == 1
+    _carol = Router(network, "carol")
+    assert network.index() is not index
+    assert network.index().nr_routers == 3
+
+def test_pickle_index():
+    """Test that an index can be pickled and unpickled."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    index = network.index()
+    state = index.__getstate__()
+    assert 'router_ids' not in state
+    unpickled_index = pickle.loads(pickle.dumps(index))
+    assert unpickled_index.router_ids == index.router_ids
+    assert unpickled_index.offsets == index.offsets
+    assert unpickled_index.neighbors == index.neighbors
+    assert unpickled_index.link_ids == index.link_ids
+    assert unpickled_index.lengths == index.lengths
@@ -0,0 +1,51 @@
+"""Import time regression tests for the command line interface.
+
+The command line interface is run with -X importtime, which makes Python report every imported
+module and its import time on standard error. The tests check that modules which are slow to
+import are only imported in the code paths which need them."""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ['cerberus', 'numpy', 'asyncio', 'multiprocessing']
+
+def import_times(command_line_arguments):
+    """Run the command line interface with -X importtime.
+
+    Args:
+        command_line_arguments (list): The command line arguments.
+    Returns:
+        A dictionary of cumulative import times in microseconds, indexed by module name.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', 'qpce/__main__.py'] +
+                             command_line_arguments, stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _self_time, cumulative_time, module_name = line[len('import time:'):].split('|')
+        if cumulative_time.strip().isdigit():
+            times[module_name.strip()] = int(cumulative_time)
+    return times
+
+def assert_not_imported(times, module_names):
+    """Assert that none of the given modules were imported."""
+    imported = {name: times[name] for name in module_names if name in times}
+    assert not imported, f"Unexpected imports (cumulative import time in us): {imported}"
+
+def test_import_time_yaml_files():
+    """Test that computing routes for a valid network and demand does not import cerberus, NumPy,
+    asyncio, or multiprocessing."""
+    times = import_times(['tests/network-valid.yaml', 'tests/demand-valid.yaml'])
+    assert 'network_yaml' in times
+    assert 'route_computation' in times
+    assert_not_imported(times, HEAVY_MODULES)
+
+def test_import_time_snapshot(tmpdir):
+    """Test that reading a network snapshot does not import the YAML parser."""
+    snapshot_file = str(tmpdir.join("network.snapshot"))
+    import_times(['tests/network-valid.yaml', '--write-snapshot', snapshot_file])
+    times = import_times([snapshot_file])
+    assert 'network_snapshot' in times
+    assert_not_imported(times, HEAVY_MODULES + ['yaml', 'network_yaml', 'demand_yaml'])
@@ -0,0 +1,171 @@
+"""Unit tests for module incremental."""
+
+import random
+
+import demand_yaml
+import network_delta
+import network_yaml
+from demand import Demand
+from helpers import make_network, random_link_specs, route_names
+from incremental import IncrementalRouting
+from path import Path
+from route_computation import compute_path_routes, compute_routes
+
+def _make_routing():
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    return (network, demand, IncrementalRouting(network, demand))
+
+def _find_link(network, name_1, name_2):
+    for link in network.links:
+        if {link.router_1.name, link.router_2.name} == {name_1, name_2}:
+            return link
+    return None
+
+def test_remove_link():
+    """Test that removing a link only re-routes the paths which traverse it."""
+    network, _demand, routing = _make_routing()
+    alice_bob = _find_link(network, "alice", "bob")
+    assert routing.paths_traversing_link(alice_bob) == {"alice-to-bob", "bob-to-alice"}
+    rerouted = routing.remove_link(alice_bob)
+    assert rerouted == ["alice-to-bob", "bob-to-alice"]
+    assert routing.routes["alice-to-bob"].length == 200
+    assert route_names(routing.routes["bob-to-alice"]) == ["bob", "carol", "alice"]
+    assert routing.paths_traversing_link(alice_bob) == set()
+    assert alice_bob not in network.links
+
+def test_change_link_length():
+    """Test that changing the length of a link re-routes the affected paths."""
+    network, _demand, routing = _make_routing()
+    alice_carol = _find_link(network, "alice", "carol")
+    assert routing.change_link_length(alice_carol, 500) == ["alice-to-erin-1", "alice-to-erin-2"]
+    assert route_names(routing.routes["alice-to-erin-1"]) == ["alice", "david", "erin"]
+    alice_bob = _find_link(network, "alice", "bob")
+    assert routing.change_link_length(alice_bob, 1000) == ["alice-to-bob", "bob-to-alice"]
+    assert routing.routes["alice-to-bob"].length == 300
+    assert routing.change_link_length(alice_carol, 10) == ["alice-to-bob", "bob-to-alice",
+                                                           "alice-to-erin-1", "alice-to-erin-2"]
+    assert routing.routes["alice-to-bob"].length == 110
+    assert routing.routes["alice-to-erin-1"].length == 110
+    carol_erin = _find_link(network, "carol", "erin")
+    assert routing.change_link_length(carol_erin, 50) == ["alice-to-erin-1", "alice-to-erin-2"]
+    assert routing.change_link_length(alice_bob, 900) == []
+
+def test_add_link():
+    """Test that adding a link only re-routes the paths which could use it."""
+    network, _demand, routing = _make_routing()
+    routers = network.routers
+    link, rerouted = routing.add_link(routers["bob"], routers["erin"], 150)
+    assert link in network.links
+    assert rerouted == []
+    link, rerouted = routing.add_link(routers["alice"], routers["erin"], 150)
+    assert rerouted == ["alice-to-erin-1", "alice-to-erin-2"]
+    assert route_names(routing.routes["alice-to-erin-2"]) == ["alice", "erin"]
+    assert routing.paths_traversing_link(link) == {"alice-to-erin-1", "alice-to-erin-2"}
+
+def test_remove_router():
+    """Test that removing a router re-routes the paths through it and makes paths to it
+    infeasible."""
+    network, _demand, routing = _make_routing()
+    routing.remove_router(network.routers["carol"])
+    assert route_names(routing.routes["alice-to-erin-1"]) == ["alice", "david", "erin"]
+    rerouted = routing.remove_router(network.routers["bob"])
+    assert rerouted == ["alice-to-bob", "bob-to-alice"]
+    assert not routing.routes["alice-to-bob"].feasible
+    assert not routing.routes["bob-to-alice"].feasible
+    assert "bob" not in network.routers
+
+def test_random_changes_match_full_recomputation():
+    """Test that incremental re-routing gives routes of the same length as full recomputation."""
+    generator = random.Random(6)
+    router_names = [f"router-{number}" for number in range(12)]
+    network = make_network(router_names, random_link_specs(generator, router_names, 24))
+    routers = list(network.routers.values())
+    demand = Demand(network)
+    for number in range(30):
+        Path(demand, f"path-{number}", generator.choice(routers), generator.choice(routers), 1, 0.5)
+    routing = IncrementalRouting(network, demand)
+    for _ in range(40):
+        action = generator.randint(0, 2)
+        if action == 0 and network.links:
+            routing.remove_link(generator.choice(network.links))
+        elif action == 1 and network.links:
+            routing.change_link_length(generator.choice(network.links), generator.randint(1, 100))
+        else:
+            routing.add_link(generator.choice(routers), generator.choice(routers),
+                             generator.randint(1, 100))
+        expected = compute_routes(network, demand)
+        for path_name, route in expected.items():
+            assert routing.routes[path_name].length == route.length
+
+def _mutate_network_specs(generator, network, link_specs, router_names):
+    # Randomly remove, change or add a few links, and remove (or re-add) a few routers, in place.
+    for _ in range(generator.randint(1, 4)):
+        action = generator.randint(0, 3)
+        if action == 0 and link_specs:
+            del link_specs[generator.randrange(len(link_specs))]
+        elif action == 1 and link_specs:
+            link_number = generator.randrange(len(link_specs))
+            name_1, name_2, _length = link_specs[link_number]
+            link_specs[link_number] = (name_1, name_2, generator.randint(1, 100))
+        elif action == 2:
+            link_specs.extend(random_link_specs(generator, router_names, 1))
+        else:
+            name = generator.choice(router_names)
+            if name in network.routers:
+                router_names.remove(name)
+            else:
+                router_names.append(name)
+
+def _check_routes_match_recomputation(routing, network, demand):
+    # Paths with a removed end-point are not routable, and must have an infeasible route.
+    routable_paths = [path for path in demand.paths.values()
+                      if path.end_point_1.name in network.routers and
+                      path.end_point_2.name in network.routers]
+    expected = compute_path_routes(network, routable_paths)
+    for path_name, route in routing.routes.items():
+        if path_name in expected:
+            assert route.feasible == expected[path_name].feasible
+            assert route.length == expected[path_name].length
+        else:
+            assert not route.feasible
+
+def test_apply_network_changes_match_full_recomputation():
+    """Test that re-routing after applying the differences between two versions of a network gives
+    routes of the same length as full recomputation."""
+    generator = random.Random(7)
+    router_names = [f"router-{number}" for number in range(12)]
+    link_specs = random_link_specs(generator, router_names, 24)
+    network = make_network(router_names, link_specs)
+    demand = Demand(network)
+    for number in range(30):
+        Path(demand, f"path-{number}", network.routers[generator.choice(router_names)],
+             network.routers[generator.choice(router_names)], 1, 0.5)
+    routing = IncrementalRouting(network, demand)
+    for _ in range(20):
+        _mutate_network_specs(generator, network, link_specs, router_names)
+        new_network = make_network(router_names, link_specs)
+        plan = network_delta.plan_network_update(network, new_network)
+        routing.apply_network_changes(plan.apply())
+        assert sorted(network.routers) == sorted(new_network.routers)
+        assert len(network.links) == len(new_network.links)
+        _check_routes_match_recomputation(routing, network, demand)
+
+def test_update_demand():
+    """Test that updating the demand only routes the added and changed paths."""
+    network, demand, routing = _make_routing()
+    new_demand = Demand(network)
+    routers = network.routers
+    old_paths = demand.paths
+    Path(new_demand, "alice-to-bob", routers["alice"], routers["bob"], 100, 0.95)
+    Path(new_demand, "bob-to-alice", routers["bob"], routers["alice"], 50, 0.80)
+    Path(new_demand, "alice-to-erin-1", routers["alice"], routers["erin"], 40, 0.90)
+    Path(new_demand, "bob-to-erin", routers["bob"], routers["erin"], 10, 0.5)
+    assert routing.update_demand(new_demand) == ["bob-to-alice", "bob-to-erin"]
+    assert set(routing.routes) == set(new_demand.paths)
+    assert routing.routes["alice-to-bob"].path is new_demand.paths["alice-to-bob"]
+    assert routing.routes["bob-to-erin"].length == 200
+    assert routing.routes["alice-to-erin-1"].length == 200
+    alice_carol = _find_link(network, "alice", "carol")
+    assert "alice-to-erin-2" not in routing.paths_traversing_link(alice_carol)
+    assert "alice-to-erin-2" in old_paths
@@ -0,0 +1,65 @@
+"""Unit tests for module instrumentation."""
+
+import json
+
+import instrumentation
+import topology_generator
+from route_computation import compute_path_routes
+
+def test_metrics():
+    """Test spans and counters of a Metrics object."""
+    metrics = instrumentation.Metrics()
+    with metrics.span('parse'):
+        pass
+    metrics.add_time('parse', 1.0, 2)
+    metrics.count('routers', 5)
+    metrics.count('routers')
+    metrics_dict = metrics.as_dict()
+    assert metrics_dict['spans']['parse']['count'] == 3
+    assert metrics_dict['spans']['parse']['seconds'] >= 1.0
+    assert metrics_dict['counters'] == {'routers': 6}
+    metrics.merge(metrics_dict)
+    assert metrics.spans['parse'][1] == 6
+    assert metrics.counters['routers'] == 12
+
+def test_disabled_instrumentation():
+    """Test that spans and counters do nothing when instrumentation is disabled."""
+    assert instrumentation.current_metrics() is None
+    with instrumentation.span('parse'):
+        instrumentation.count('routers')
+        instrumentation.add_time('validation', 1.0)
+    assert instrumentation.stop_metrics() is None
+
+def test_enabled_instrumentation(tmpdir):
+    """Test recording spans and counters in the current metrics."""
+    metrics = instrumentation.start_metrics()
+    try:
+        assert instrumentation.current_metrics() is metrics
+        with instrumentation.span('parse'):
+            instrumentation.count('routers', 3)
+    finally:
+        assert instrumentation.stop_metrics() is metrics
+    assert instrumentation.current_metrics() is None
+    metrics_file = str(tmpdir.join("metrics.json"))
+    metrics.write_json_file(metrics_file)
+    with open(metrics_file) as file:
+        metrics_dict = json.load(file)
+    assert metrics_dict['spans']['parse']['count'] == 1
+    assert metrics_dict['counters'] == {'routers': 3}
+
+def test_worker_metrics_are_merged():
+    """Test that counters collected in worker processes are merged into the current metrics."""
+    topology = topology_generator.generate_topology(topology_generator.GRID, 25)
+    network = topology.network()
+    demand = topology_generator.random_demand(topology, 20, seed=3).demand(network)
+    paths = list(demand.paths.values())
+    metrics = instrumentation.start_metrics()
+    try:
+        compute_path_routes(network, paths)
+        serial_counters = dict(metrics.counters)
+        metrics.counters.clear()
+        compute_path_routes(network, paths, jobs=2)
+    finally:
+        instrumentation.stop_metrics()
+    assert serial_counters['heap-pushes'] > 0
+    assert metrics.counters == serial_counters
@@ -0,0 +1,99 @@
+"""Unit tests for module k_shortest_paths."""
+
+import itertools
+
+import demand_yaml
+import instrumentation
+import network_yaml
+from fidelity import FidelityModel
+from helpers import random_network, route_names
+from k_shortest_paths import KShortestPaths, k_shortest_routes
+from link import Link
+from network import Network
+from router import Router
+
+def all_loopless_path_lengths(index, source_id, target_id):
+    """Enumerate the lengths of all loopless paths by depth-first search."""
+    lengths = []
+    def visit(router_id, visited, length):
+        if router_id == target_id:
+            lengths.append(length)
+            return
+        for neighbor, _link_id, link_length in index.adjacencies(router_id):
+            if neighbor not in visited:
+                visit(neighbor, visited | {neighbor}, length + link_length)
+    visit(source_id, {source_id}, 0)
+    return sorted(lengths)
+
+def check_path(index, source_id, target_id, length, router_ids, link_ids):
+    """Check that a path is a loopless path of the given length from the source to the target."""
+    assert router_ids[0] == source_id and router_ids[-1] == target_id
+    assert len(set(router_ids)) == len(router_ids)
+    assert len(link_ids) == len(router_ids) - 1
+    total = 0
+    for router_id, neighbor_id, link_id in zip(router_ids, router_ids[1:], link_ids):
+        total += min(link_length for neighbor, other_link_id, link_length
+                     in index.adjacencies(router_id)
+                     if neighbor == neighbor_id and other_link_id == link_id)
+    assert total == length
+
+def test_same_as_enumeration():
+    """Test that all loopless paths are generated in order of increasing length, on random
+    networks."""
+    for seed in range(20):
+        index = random_network(8, 16, seed, max_length=5).index()
+        for target_id in range(3):
+            search = KShortestPaths(index, target_id)
+            for source_id in range(3, 6):
+                paths = list(search.path_ids(source_id))
+                assert [length for length, _router_ids, _link_ids in paths] == \
+                       all_loopless_path_lengths(index, source_id, target_id)
+                assert len({tuple(link_ids) for _length, _router_ids, link_ids in paths}) == \
+                       len(paths)
+                for length, router_ids, link_ids in paths:
+                    check_path(index, source_id, target_id, length, router_ids, link_ids)
+
+def test_link_filter():
+    """Test that links which are rejected by the link filter are not used."""
+    index = random_network(8, 16, 3, max_length=5).index()
+    excluded = set(range(0, 16, 3))
+    search = KShortestPaths(index, 0, lambda link_id: link_id not in excluded)
+    for _length, _router_ids, link_ids in search.path_ids(5):
+        assert excluded.isdisjoint(link_ids)
+
+def test_unreachable_and_same_router():
+    """Test paths to an unreachable router and from a router to itself."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    _carol = Router(network, "carol")
+    Link(alice, bob, 10)
+    index = network.index()
+    assert not list(KShortestPaths(index, 2).path_ids(0))
+    assert list(KShortestPaths(index, 0).path_ids(0)) == [(0, [0], [])]
+
+def test_lazy_generation():
+    """Test that the spur searches for the next path are only run when it is requested."""
+    index = random_network(30, 90, 5, max_length=5).index()
+    metrics = instrumentation.start_metrics()
+    try:
+        paths = KShortestPaths(index, 0).path_ids(29)
+        next(paths)
+        assert metrics.counters['spur-searches'] == 1
+        assert len(list(itertools.islice(paths, 5))) == 5
+        assert metrics.counters['spur-searches'] > 5
+    finally:
+        instrumentation.stop_metrics()
+
+def test_k_shortest_routes():
+    """Test generating the routes for a path until one meets the requested fidelity."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    path = demand.paths['alice-to-erin-1']
+    routes = list(k_shortest_routes(network, path, FidelityModel(hop_fidelity=0.9)))
+    assert route_names(routes[0]) == ['alice', 'carol', 'erin']
+    assert routes[0].length == 200
+    assert abs(routes[0].fidelity - 0.81) < 1e-9
+    assert [route.length for route in routes] == sorted(route.length for route in routes)
+    assert all(route.path is path for route in routes)
+    assert len(routes) == len({tuple(id(link) for link in route.links) for route in routes})
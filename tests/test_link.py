@@ -38,3 +38,22 @@ def test_create_link_routers_in_different_networks():
     bob = Router(network_2, "bob")
     with pytest.raises(AssertionError):
         _link = Link(alice, bob, 100)
+
+def test_create_link_capacity():
+    """Test creation of a link with and without a capacity."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    assert Link(alice, bob, 100).capacity is None
+    assert Link(alice, bob, 100, 50).capacity == 50
+    with pytest.raises(AssertionError):
+        _link = Link(alice, bob, 100, 0)
+
+def test_link_is_compact():
+    """Test that links have no instance dictionary."""
+    network = Network()
+    alice = Router(network, "alice")
+    link = Link(alice, alice, 100)
+    assert not hasattr(link, '__dict__')
+    assert alice.links == {0: link, 1: link}
+    assert (link.port_1, link.port_2) == (0, 1)
@@ -1,7 +1,12 @@
 """Unit tests for module __main__."""
 
+import json
+import pstats
+
 import pytest
+import yaml
 
+import topology_generator
 from qpce.__main__ import parse_command_line_arguments
 from qpce.__main__ import main
 
@@ -31,3 +36,163 @@ def test_main():
     """Test main entry point function."""
     command_line_arguments = ['tests/network-valid.yaml']
     main(command_line_arguments)
+
+def test_demand_argument():
+    """Test the optional demand-file command line argument."""
+    command_line_arguments = ['network-valid.yaml', 'demand-valid.yaml', '-r', 'routes.yaml']
+    parsed_arguments = parse_command_line_arguments(command_line_arguments)
+    assert parsed_arguments.demand_file == 'demand-valid.yaml'
+    assert parsed_arguments.route_file == 'routes.yaml'
+
+def test_main_with_demand(capsys):
+    """Test main entry point function with a demand file, writing routes to standard output."""
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml', '--timing']
+    assert main(command_line_arguments) == 0
+    captured = capsys.readouterr()
+    assert "path: alice-to-bob" in captured.out
+    assert "Computed routes for 4 paths" in captured.err
+
+def test_main_with_route_file(tmpdir):
+    """Test main entry point function with a demand file, writing routes to a route file."""
+    route_file = str(tmpdir.join("routes.yaml"))
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml',
+                              '--route-file', route_file]
+    assert main(command_line_arguments) == 0
+    with open(route_file) as file:
+        assert "path: alice-to-erin-2" in file.read()
+
+def test_main_with_capacity(capsys):
+    """Test main entry point function with capacity-aware placement."""
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml', '--capacity']
+    assert main(command_line_arguments) == 0
+    captured = capsys.readouterr()
+    route_models = yaml.safe_load(captured.out)['routes']
+    assert route_models[1]['routers'] == ['bob', 'carol', 'alice']
+
+def test_main_with_jobs(capsys):
+    """Test main entry point function with multiple worker processes."""
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml', '--jobs', '2']
+    assert main(command_line_arguments) == 0
+    captured = capsys.readouterr()
+    assert "path: alice-to-erin-2" in captured.out
+
+def test_main_with_jobs_in_demand_order(tmpdir):
+    """Test that the routes computed by multiple worker processes are written in the order of the
+    demand, so that the route file is the same as the one computed in a single process."""
+    topology = topology_generator.generate_topology(topology_generator.RANDOM_GEOMETRIC, 60)
+    network_file = str(tmpdir.join("network.yaml"))
+    demand_file = str(tmpdir.join("demand.yaml"))
+    topology.write_yaml_file(network_file)
+    topology_generator.random_demand(topology, 80).write_yaml_file(demand_file)
+    route_contents = []
+    for jobs in ['1', '2']:
+        route_file = tmpdir.join(f"routes-{jobs}.yaml")
+        assert main([network_file, demand_file, '--route-file', str(route_file), '--jobs',
+                     jobs]) == 0
+        route_contents.append(route_file.read_binary())
+    assert route_contents[0] == route_contents[1]
+
+def test_main_with_snapshot(tmpdir, capsys):
+    """Test writing a network snapshot and then computing routes using the snapshot."""
+    snapshot_file = str(tmpdir.join("network.snapshot"))
+    assert main(['tests/network-valid.yaml', '--write-snapshot', snapshot_file]) == 0
+    assert main([snapshot_file, 'tests/demand-valid.yaml']) == 0
+    captured = capsys.readouterr()
+    assert "path: alice-to-erin-2" in captured.out
+
+def test_main_with_all_pairs(tmpdir, capsys):
+    """Test main entry point function with all-pairs shortest paths, reusing the matrices from a
+    file."""
+    all_pairs_file = str(tmpdir.join("all-pairs.npz"))
+    for _ in range(2):
+        command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml',
+                                  '--all-pairs-file', all_pairs_file]
+        assert main(command_line_arguments) == 0
+        captured = capsys.readouterr()
+        route_models = yaml.safe_load(captured.out)['routes']
+        assert [route_model['length'] for route_model in route_models] == [100, 100, 200, 200]
+    assert main(['tests/network-valid.yaml', 'tests/demand-valid.yaml', '--all-pairs']) == 0
+
+def test_main_with_metrics_json(tmpdir, capsys):
+    """Test writing the phase timings and counters to a JSON file."""
+    metrics_file = str(tmpdir.join("metrics.json"))
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml',
+                              '--metrics-json', metrics_file]
+    assert main(command_line_arguments) == 0
+    capsys.readouterr()
+    with open(metrics_file) as file:
+        metrics_dict = json.load(file)
+    for span_name in ['network-file-open', 'network-yaml-parse', 'network-validation',
+                      'network-normalization', 'network-construction', 'demand-read',
+                      'route-computation', 'route-output']:
+        assert metrics_dict['spans'][span_name]['count'] >= 1
+    counters = metrics_dict['counters']
+    assert counters['routers'] == 5
+    assert counters['links'] == 7
+    assert counters['paths'] == 4
+    assert counters['route-cache-misses'] == 4
+    assert counters['heap-pushes'] > 0
+
+def test_main_with_profile(tmpdir, capsys):
+    """Test running under the profiler."""
+    profile_file = str(tmpdir.join("qpce.prof"))
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml',
+                              '--profile', profile_file]
+    assert main(command_line_arguments) == 0
+    capsys.readouterr()
+    stats = pstats.Stats(profile_file)
+    assert stats.total_calls > 0
+
+def test_main_with_technology(capsys):
+    """Test main entry point function with a technology file, which adds the fidelity to the
+    routes and limits the capacity of links without a capacity to their elementary rate."""
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml',
+                              '--technology-file', 'tests/technology-valid.yaml']
+    assert main(command_line_arguments) == 0
+    route_models = yaml.safe_load(capsys.readouterr().out)['routes']
+    assert route_models[0]['fidelity'] == pytest.approx(0.97)
+    for option in ['--capacity', '--optimize']:
+        assert main(command_line_arguments + [option]) == 0
+        route_models = yaml.safe_load(capsys.readouterr().out)['routes']
+        assert route_models[0]['fidelity'] == pytest.approx(0.97)
+        assert route_models[2]['routers'] == ['alice', 'david', 'erin']
+
+def test_main_with_delta_file(tmpdir, capsys):
+    """Test main entry point function with a network delta file, which removes a link."""
+    delta_file = tmpdir.join("delta.yaml")
+    delta_file.write("remove-links:\n  - router-1: alice\n    router-2: bob\n")
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml',
+                              '--delta-file', str(delta_file)]
+    assert main(command_line_arguments) == 0
+    route_models = yaml.safe_load(capsys.readouterr().out)['routes']
+    assert route_models[0]['length'] == 200
+
+def test_watch_arguments(capsys):
+    """Test that watch mode requires a demand file and rejects options it does not support."""
+    parsed_arguments = parse_command_line_arguments(['network.yaml', 'demand.yaml', '--watch'])
+    assert parsed_arguments.watch
+    assert parsed_arguments.watch_interval == 1.0
+    assert parsed_arguments.debounce == 0.2
+    for command_line_arguments in [['network.yaml', '--watch'],
+                                   ['network.yaml', 'demand.yaml', '--watch', '--capacity']]:
+        with pytest.raises(SystemExit):
+            parse_command_line_arguments(command_line_arguments)
+        assert "--watch" in capsys.readouterr().err
+
+def test_main_with_optimize(capsys):
+    """Test main entry point function with placement optimization, which reports the objective of
+    each iteration."""
+    command_line_arguments = ['tests/network-valid.yaml', 'tests/demand-valid.yaml', '--optimize',
+                              '--time-budget', '5', '--timing']
+    assert main(command_line_arguments) == 0
+    captured = capsys.readouterr()
+    route_models = yaml.safe_load(captured.out)['routes']
+    assert [route_model['path'] for route_model in route_models] == \
+           ["alice-to-bob", "bob-to-alice", "alice-to-erin-1", "alice-to-erin-2"]
+    assert "Iteration 0 at " in captured.err
+
+def test_optimize_arguments(capsys):
+    """Test that placement optimization can not be combined with plain capacity placement."""
+    with pytest.raises(SystemExit):
+        parse_command_line_arguments(['network.yaml', 'demand.yaml', '--optimize', '--capacity'])
+    assert "--optimize" in capsys.readouterr().err
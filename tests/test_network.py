@@ -1,7 +1,94 @@
 """Unit tests for module network."""
 
+import pytest
+
+from link import Link
 from network import Network
+from router import Router
 
 def test_create_network():
     """Test creation of a network."""
     _network = Network()
+
+def test_remove_router_and_links():
+    """Test removing routers and links from a network."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    alice_bob = Link(alice, bob, 100)
+    alice_alice = Link(alice, alice, 10)
+    bob_bob = Link(bob, bob, 10)
+    assert alice.links == {0: alice_bob, 1: alice_alice, 2: alice_alice}
+    network.remove_link(alice_bob)
+    assert list(alice.link_items()) == [(1, alice_alice), (2, alice_alice)]
+    assert list(bob.link_items()) == [(1, bob_bob), (2, bob_bob)]
+    assert 0 not in bob.links
+    assert bob.next_available_port == 3
+    assert network.links == [bob_bob, alice_alice]
+    assert [link.link_id for link in network.links] == [0, 1]
+    assert alice_bob.link_id is None
+    assert network.remove_router(alice) == [alice_alice]
+    assert list(network.routers) == ["bob"]
+    assert network.links == [bob_bob]
+    assert bob_bob.link_id == 0
+    with pytest.raises(AssertionError):
+        network.remove_link(alice_bob)
+    with pytest.raises(AssertionError):
+        network.remove_router(alice)
+    with pytest.raises(AssertionError):
+        bob.remove_link(alice_bob)
+
+def test_change_link_length():
+    """Test changing the length of a link."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    link = Link(alice, bob, 100)
+    generation = network.generation
+    network.change_link_length(link, 200)
+    assert link.length == 200
+    assert network.generation > generation
+    assert list(network.index().lengths) == [200, 200]
+    with pytest.raises(AssertionError):
+        network.change_link_length(link, 0)
+
+def test_add_routers_and_links_bulk():
+    """Test adding routers and links to a network in bulk."""
+    # pylint:disable=unbalanced-tuple-unpacking
+    network = Network()
+    alice = Router(network, "alice")
+    bob, carol = network.add_routers_bulk(["bob", "carol"])
+    assert list(network.routers) == ["alice", "bob", "carol"]
+    assert network.routers["bob"] is bob
+    alice_bob, carol_carol = network.add_links_bulk([0, 2], [1, 2], [100, 10], [50, None])
+    assert network.links == [alice_bob, carol_carol]
+    assert (alice_bob.router_1, alice_bob.router_2) == (alice, bob)
+    assert alice_bob.capacity == 50
+    assert (carol_carol.port_1, carol_carol.port_2) == (0, 1)
+    assert carol.links == {0: carol_carol, 1: carol_carol}
+    link = Link(alice, carol, 20)
+    assert link.port_1 == 1
+    assert not network.add_links_bulk([], [], [])
+    assert list(network.index().neighbors) == [1, 2, 0, 2, 2, 0]
+
+def test_add_bulk_validation():
+    """Test that invalid bulk input is rejected without changing the network."""
+    network = Network()
+    network.add_routers_bulk(["alice", "bob"])
+    with pytest.raises(AssertionError):
+        network.add_routers_bulk(["carol", "carol"])
+    with pytest.raises(AssertionError):
+        network.add_routers_bulk(["carol", "alice"])
+    assert list(network.routers) == ["alice", "bob"]
+    with pytest.raises(AssertionError):
+        network.add_links_bulk([0, 1], [1, 2], [100, 100])
+    with pytest.raises(AssertionError):
+        network.add_links_bulk([0, -1], [1, 0], [100, 100])
+    with pytest.raises(AssertionError):
+        network.add_links_bulk([0, 1], [1, 0], [100, 0])
+    with pytest.raises(AssertionError):
+        network.add_links_bulk([0, 1], [1, 0], [100, 100], [None, 0])
+    with pytest.raises(AssertionError):
+        network.add_links_bulk([0, 1], [1], [100, 100])
+    assert not network.links
+    assert all(not router.links for router in network.routers.values())
@@ -0,0 +1,201 @@
+"""Unit tests for module network_delta."""
+
+import io
+import pytest
+
+import network_delta
+import network_yaml
+
+def read_network():
+    """Read the valid test network."""
+    return network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+
+def apply_delta(network, document):
+    """Apply a network delta YAML document to a network."""
+    return network_delta.apply_network_delta(network, io.StringIO(document))
+
+def test_apply_network_delta():
+    """Test applying a network delta which adds, changes, and removes routers and links, and
+    check that the ports of the untouched links do not change."""
+    network = read_network()
+    ports = {link: (link.port_1, link.port_2) for link in network.links}
+    generation = network.generation
+    changes = apply_delta(network, "add-routers:\n"
+                                   "  - name: frank\n"
+                                   "add-links:\n"
+                                   "  - router-1: frank\n"
+                                   "    router-2: alice\n"
+                                   "    length: 10\n"
+                                   "    capacity: 5\n"
+                                   "change-links:\n"
+                                   "  - router-1: bob\n"
+                                   "    router-2: alice\n"
+                                   "    length: 500\n"
+                                   "remove-links:\n"
+                                   "  - router-1: alice\n"
+                                   "    router-2: carol\n"
+                                   "remove-routers:\n"
+                                   "  - name: erin\n")
+    assert network.generation > generation
+    assert [router.name for router in changes.added_routers] == ['frank']
+    assert [router.name for router in changes.removed_routers] == ['erin']
+    assert 'erin' not in network.routers
+    frank_link = changes.added_links[0]
+    assert (frank_link.router_1.name, frank_link.length, frank_link.capacity) == \
+           ('frank', 10, 5)
+    assert frank_link.port_2 == network.routers['alice'].next_available_port - 1
+    changed_link, old_length, old_capacity = changes.changed_links[0]
+    assert (changed_link.length, old_length, old_capacity) == (500, 100, 150)
+    assert sorted((link.router_1.name, link.router_2.name) for link in changes.removed_links) == \
+           [('alice', 'carol'), ('carol', 'erin'), ('david', 'erin')]
+    for link in network.links:
+        if link in ports:
+            assert (link.port_1, link.port_2) == ports[link]
+    assert len(changes) == 7
+    assert changes.summary() == ("routers added: 1, routers removed: 1, links added: 1, "
+                                 "links removed: 3, links changed: 1")
+    index = network.index()
+    assert index.nr_routers == 5
+    assert index.nr_links == len(network.links) == 5
+
+def test_empty_network_delta():
+    """Test applying an empty network delta."""
+    network = read_network()
+    changes = apply_delta(network, "")
+    assert not changes
+    assert changes.summary() == "no changes"
+
+def test_parallel_links():
+    """Test that a link between routers with several links between them must be selected by port."""
+    network = read_network()
+    apply_delta(network, "add-links:\n"
+                         "  - router-1: alice\n"
+                         "    router-2: bob\n"
+                         "    length: 300\n")
+    document = ("change-links:\n"
+                "  - router-1: alice\n"
+                "    router-2: bob\n"
+                "    capacity: 7\n")
+    with pytest.raises(network_delta.ReadNetworkDeltaError, match="several such links"):
+        apply_delta(network, document)
+    port = network.routers['alice'].next_available_port - 1
+    changes = apply_delta(network, document + f"    port-1: {port}\n")
+    assert changes.changed_links[0][0].length == 300
+    assert changes.changed_links[0][0].capacity == 7
+
+@pytest.mark.parametrize("document,error", [
+    ("add-routers:\n  - name: alice\n", "already exists"),
+    ("add-links:\n  - router-1: alice\n    router-2: zoe\n    length: 1\n", "non-existent"),
+    ("change-links:\n  - router-1: alice\n    router-2: erin\n    length: 1\n",
+     "link does not exist"),
+    ("change-links:\n  - router-1: alice\n    router-2: bob\n    length: 300\n"
+     "  - router-1: bob\n    router-2: alice\n    capacity: 7\n", "change link between"),
+    ("remove-links:\n  - router-1: alice\n    router-2: zoe\n", "router does not exist"),
+    ("remove-links:\n  - router-1: alice\n    router-2: bob\n"
+     "  - router-1: bob\n    router-2: alice\n", "twice"),
+    ("remove-routers:\n  - name: zoe\n", "does not exist"),
+    ("remove-routers:\n  - name: bob\n  - name: bob\n", "twice"),
+    ("add-routers:\n  - name: frank\n    x: 0\n", "has x but no y"),
+    ("remove-links:\n  - router-1: alice\n", "Could not validate"),
+    ("nonsense: 1\n", "Could not validate"),
+    ("add-routers: [\n", "Could not parse"),
+])
+def test_bad_network_delta(document, error):
+    """Test that network deltas which are not valid, or which do not apply to the network, are
+    rejected without changing the network."""
+    network = read_network()
+    generation = network.generation
+    with pytest.raises(network_delta.ReadNetworkDeltaError, match=error):
+        apply_delta(network, "add-routers:\n  - name: yolanda\n" + document
+                    if document.startswith("remove") else document)
+    assert network.generation == generation
+    assert 'yolanda' not in network.routers
+
+def test_network_delta_coordinates():
+    """Test that added and changed links are checked against the coordinates of their routers."""
+    network = network_yaml.read_network_from_parsed_yaml({
+        'routers': [{'name': 'alice', 'x': 0, 'y': 0}, {'name': 'bob', 'x': 0, 'y': 1000}],
+        'links': [{'router-1': 'alice', 'router-2': 'bob', 'length': 1000}]})
+    with pytest.raises(network_delta.ReadNetworkDeltaError, match="shorter than the distance"):
+        apply_delta(network, "change-links:\n"
+                             "  - router-1: alice\n"
+                             "    router-2: bob\n"
+                             "    length: 900\n")
+    with pytest.raises(network_delta.ReadNetworkDeltaError, match="shorter than the distance"):
+        apply_delta(network, "add-routers:\n"
+                             "  - name: carol\n"
+                             "    x: 2000\n"
+                             "    y: 0\n"
+                             "add-links:\n"
+                             "  - router-1: alice\n"
+                             "    router-2: carol\n"
+                             "    length: 1500\n")
+    with pytest.raises(network_delta.ReadNetworkDeltaError, match="geographic coordinates"):
+        apply_delta(network, "add-routers:\n"
+                             "  - name: carol\n"
+                             "    latitude: 0\n"
+                             "    longitude: 0\n")
+    apply_delta(network, "add-routers:\n"
+                         "  - name: carol\n"
+                         "    x: 2000\n"
+                         "    y: 0\n"
+                         "add-links:\n"
+                         "  - router-1: alice\n"
+                         "    router-2: carol\n"
+                         "    length: 2000\n")
+    assert network.index().positions is not None
+
+def test_network_delta_file(tmpdir):
+    """Test applying a network delta file."""
+    network = read_network()
+    delta_file = tmpdir.join("delta.yaml")
+    delta_file.write("remove-routers:\n  - name: erin\n")
+    changes = network_delta.apply_network_delta_file(network, str(delta_file))
+    assert len(changes.removed_links) == 2
+    with pytest.raises(network_delta.ReadNetworkDeltaError):
+        network_delta.apply_network_delta_file(network, str(tmpdir.join("non-existent.yaml")))
+
+def test_plan_network_update():
+    """Test that applying the planned update of a network makes it equal to the new version of the
+    network, and keeps the links which did not change."""
+    network = read_network()
+    alice_bob = network.links[0]
+    new_network = network_yaml.read_network_from_yaml_stream(io.StringIO(
+        "routers:\n"
+        "  - name: alice\n"
+        "  - name: bob\n"
+        "  - name: carol\n"
+        "  - name: david\n"
+        "  - name: frank\n"
+        "links:\n"
+        "  - {router-1: bob, router-2: alice, length: 100, capacity: 150}\n"
+        "  - {router-1: alice, router-2: carol, length: 300}\n"
+        "  - {router-1: bob, router-2: carol, length: 100, capacity: 20}\n"
+        "  - {router-1: carol, router-2: david, length: 100}\n"
+        "  - {router-1: carol, router-2: david, length: 50}\n"
+        "  - {router-1: david, router-2: frank, length: 10}\n"))
+    changes = network_delta.plan_network_update(network, new_network).apply()
+    assert changes.summary() == ("routers added: 1, routers removed: 1, links added: 2, "
+                                 "links removed: 3, links changed: 2")
+    assert network.links[0] is alice_bob
+    def link_set(network):
+        return sorted((min(link.router_1.name, link.router_2.name),
+                       max(link.router_1.name, link.router_2.name), link.length, link.capacity)
+                      for link in network.links)
+    assert link_set(network) == link_set(new_network)
+    assert sorted(network.routers) == sorted(new_network.routers)
+    unchanged = network_delta.plan_network_update(network, new_network).apply()
+    assert unchanged.summary() == "no changes"
+
+def test_plan_network_update_coordinates():
+    """Test that a network update which changes the coordinates of a router can not be planned."""
+    def read(x_coordinate):
+        return network_yaml.read_network_from_yaml_stream(io.StringIO(
+            f"routers:\n"
+            f"  - {{name: alice, x: {x_coordinate}, y: 0}}\n"
+            f"  - {{name: bob, x: 100, y: 0}}\n"
+            f"links:\n"
+            f"  - {{router-1: alice, router-2: bob, length: 200}}\n"))
+    network = read(0)
+    assert network_delta.plan_network_update(network, read(0)).apply().summary() == "no changes"
+    assert network_delta.plan_network_update(network, read(10)) is None
@@ -0,0 +1,108 @@
+"""Unit tests for module network_snapshot."""
+
+import pickle
+import pytest
+
+import demand_yaml
+import network_snapshot
+import network_yaml
+from link import Link
+from network import Network
+from route_computation import compute_routes
+from router import Router
+
+def _write_and_read(tmpdir, network):
+    filename = str(tmpdir.join("network.snapshot"))
+    network_snapshot.write_network_snapshot_file(filename, network)
+    assert network_snapshot.is_network_snapshot_file(filename)
+    return network_snapshot.read_network_snapshot_file(filename)
+
+def _describe(network):
+    routers = [(name, [(port, link.router_1.name, link.router_2.name, link.length, link.capacity,
+                        link.port_1, link.port_2) for port, link in router.link_items()])
+               for name, router in network.routers.items()]
+    links = [(link.router_1.name, link.router_2.name, link.length) for link in network.links]
+    return (routers, links)
+
+def test_snapshot_round_trip(tmpdir):
+    """Test that a network read from a snapshot is the same as the original network."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    alice = network.routers["alice"]
+    network.remove_link(alice.links[1])
+    Link(alice, alice, 5)
+    snapshot_network = _write_and_read(tmpdir, network)
+    assert _describe(snapshot_network) == _describe(network)
+    index = network.index()
+    snapshot_index = snapshot_network.index()
+    assert snapshot_index.router_names == index.router_names
+    assert list(snapshot_index.offsets) == list(index.offsets)
+    assert list(snapshot_index.neighbors) == list(index.neighbors)
+    assert list(snapshot_index.link_ids) == list(index.link_ids)
+    assert list(snapshot_index.lengths) == list(index.lengths)
+    assert list(pickle.loads(pickle.dumps(snapshot_index)).offsets) == list(index.offsets)
+
+def test_snapshot_lazy_materialization(tmpdir):
+    """Test that routes can be computed on a snapshot network while only creating the touched
+    routers and links."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    snapshot_network = _write_and_read(tmpdir, network)
+    # pylint:disable=protected-access
+    assert not snapshot_network.routers._routers
+    assert "alice" in snapshot_network.routers
+    assert "mallory" not in snapshot_network.routers
+    assert len(snapshot_network.routers) == 5
+    assert len(snapshot_network.links) == 7
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", snapshot_network)
+    routes = compute_routes(snapshot_network, demand)
+    assert [router.name for router in routes["alice-to-erin-1"].routers] == \
+           ["alice", "carol", "erin"]
+    assert set(snapshot_network.routers._routers) == {"alice", "bob", "carol", "erin"}
+    assert snapshot_network.links._links.count(None) == 4
+    assert snapshot_network.links[0:2] == [snapshot_network.links[0], snapshot_network.links[1]]
+
+def test_snapshot_network_changes(tmpdir):
+    """Test changing the topology of a snapshot network."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    snapshot_network = _write_and_read(tmpdir, network)
+    alice = snapshot_network.routers["alice"]
+    frank = Router(snapshot_network, "frank")
+    link = Link(alice, frank, 10)
+    assert link.port_1 == 3
+    assert list(snapshot_network.routers)[-1] == "frank"
+    assert snapshot_network.links[-1] is link
+    assert snapshot_network.index().nr_links == 8
+    snapshot_network.change_link_length(link, 20)
+    snapshot_network.remove_link(link)
+    snapshot_network.remove_router(frank)
+    assert _describe(snapshot_network) == _describe(network)
+
+def test_empty_network_snapshot(tmpdir):
+    """Test a snapshot of an empty network."""
+    snapshot_network = _write_and_read(tmpdir, Network())
+    assert not snapshot_network.routers
+    assert not snapshot_network.links
+
+def test_bad_snapshot_files(tmpdir):
+    """Test reading files which are not valid network snapshots."""
+    with pytest.raises(network_snapshot.NetworkSnapshotError):
+        network_snapshot.read_network_snapshot_file("tests/non-existent-file.snapshot")
+    with pytest.raises(network_snapshot.NetworkSnapshotError):
+        network_snapshot.read_network_snapshot_file("tests/network-valid.yaml")
+    assert not network_snapshot.is_network_snapshot_file("tests/network-valid.yaml")
+    assert not network_snapshot.is_network_snapshot_file("tests/non-existent-file.snapshot")
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    filename = str(tmpdir.join("network.snapshot"))
+    network_snapshot.write_network_snapshot_file(filename, network)
+    with open(filename, 'rb') as file:
+        contents = file.read()
+    truncated_filename = str(tmpdir.join("truncated.snapshot"))
+    with open(truncated_filename, 'wb') as file:
+        file.write(contents[:-8])
+    with pytest.raises(network_snapshot.NetworkSnapshotError):
+        network_snapshot.read_network_snapshot_file(truncated_filename)
+    with pytest.raises(network_snapshot.NetworkSnapshotError):
+        network_snapshot.NetworkSnapshot(contents[:10])
+    with pytest.raises(network_snapshot.NetworkSnapshotError):
+        network_snapshot.NetworkSnapshot(contents[:8] + b'\x09' + contents[9:])
+    with pytest.raises(network_snapshot.NetworkSnapshotError):
+        network_snapshot.write_network_snapshot_file("tests/non-existent-directory/x", network)
@@ -3,6 +3,7 @@
 import io
 import pytest
 
+import coordinates
 import network_yaml
 
 def test_valid_network_file():
@@ -81,3 +82,110 @@ def test_validate_link_bad_lenght():
                            "    length: -100\n")
     with pytest.raises(network_yaml.ReadNetworkYamlError):
         _network = network_yaml.read_network_from_yaml_stream(document)
+
+def test_validate_link_bad_capacity():
+    """Test validation of a network YAML document containing a link with a bad capacity."""
+    document = io.StringIO("routers:\n"
+                           "  - name: alice\n"
+                           "  - name: bob\n"
+                           "links:\n"
+                           "  - router-1: alice\n"
+                           "    router-2: bob\n"
+                           "    length: 100\n"
+                           "    capacity: 0\n")
+    with pytest.raises(network_yaml.ReadNetworkYamlError):
+        _network = network_yaml.read_network_from_yaml_stream(document)
+
+def test_link_capacity():
+    """Test reading the optional capacity of links."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    assert network.links[0].capacity == 150
+    assert network.links[1].capacity is None
+
+def test_links_before_routers():
+    """Test reading a network YAML document in which the links are listed before the routers."""
+    document = io.StringIO("links:\n"
+                           "  - router-1: alice\n"
+                           "    router-2: bob\n"
+                           "    length: 10\n"
+                           "routers:\n"
+                           "  - name: alice\n"
+                           "  - name: bob\n")
+    network = network_yaml.read_network_from_yaml_stream(document)
+    assert list(network.routers) == ["alice", "bob"]
+    assert network.links[0].router_2 is network.routers["bob"]
+
+def test_validate_bad_structure():
+    """Test validation of network YAML documents with a bad overall structure."""
+    for text in ["",
+                 "- alice\n",
+                 "routers:\n",
+                 "routers:\n  - alice\n",
+                 "routers: []\nrouters: []\n",
+                 "switches: []\n",
+                 "routers: []\n---\nlinks: []\n"]:
+        document = io.StringIO(text)
+        with pytest.raises(network_yaml.ReadNetworkYamlError):
+            _network = network_yaml.read_network_from_yaml_stream(document)
+
+def test_router_coordinates():
+    """Test reading planar and geographic router coordinates."""
+    document = io.StringIO("routers:\n"
+                           "  - name: alice\n"
+                           "    x: 0\n"
+                           "    y: 0\n"
+                           "  - name: bob\n"
+                           "    x: 3000.5\n"
+                           "    y: 4000\n"
+                           "  - name: carol\n"
+                           "links:\n"
+                           "  - router-1: alice\n"
+                           "    router-2: bob\n"
+                           "    length: 5000\n")
+    network = network_yaml.read_network_from_yaml_stream(document)
+    assert network.coordinate_system == coordinates.PLANAR
+    assert network.routers['bob'].coordinates == (3000.5, 4000)
+    assert network.routers['carol'].coordinates is None
+    document = io.StringIO("routers:\n"
+                           "  - name: amsterdam\n"
+                           "    latitude: 52.37\n"
+                           "    longitude: 4.90\n"
+                           "  - name: paris\n"
+                           "    latitude: 48.86\n"
+                           "    longitude: 2.35\n"
+                           "links:\n"
+                           "  - router-1: amsterdam\n"
+                           "    router-2: paris\n"
+                           "    length: 500000\n")
+    network = network_yaml.read_network_from_yaml_stream(document)
+    assert network.coordinate_system == coordinates.GEOGRAPHIC
+    assert network.index().positions is not None
+
+@pytest.mark.parametrize("routers,error", [
+    ("  - name: alice\n    x: 0\n  - name: bob\n    x: 0\n    y: 0\n", "has x but no y"),
+    ("  - name: alice\n    x: 0\n    y: 0\n    latitude: 0\n    longitude: 0\n"
+     "  - name: bob\n", "both planar and geographic"),
+    ("  - name: alice\n    x: 0\n    y: 0\n  - name: bob\n    latitude: 0\n    longitude: 0\n",
+     "but other routers have planar coordinates"),
+    ("  - name: alice\n    x: .nan\n    y: 0\n  - name: bob\n", "not finite"),
+    ("  - name: alice\n    latitude: 91\n    longitude: 0\n  - name: bob\n", "latitude"),
+    ("  - name: alice\n    x: 0\n    y: 0\n  - name: bob\n    x: 0\n    y: 1002\n",
+     "shorter than the distance 1002"),
+])
+def test_validate_bad_router_coordinates(routers, error):
+    """Test validation of network YAML documents with bad router coordinates, including a link
+    which is shorter than the distance between its routers."""
+    document = io.StringIO("routers:\n" + routers +
+                           "links:\n"
+                           "  - router-1: alice\n"
+                           "    router-2: bob\n"
+                           "    length: 1000\n")
+    with pytest.raises(network_yaml.ReadNetworkYamlError, match=error):
+        _network = network_yaml.read_network_from_yaml_stream(document)
+
+def test_link_length_rounded_down():
+    """Test that a link whose length was rounded down to whole meters is accepted."""
+    network = network_yaml.read_network_from_parsed_yaml({
+        'routers': [{'name': 'alice', 'x': 0, 'y': 0}, {'name': 'bob', 'x': 0, 'y': 1000.4}],
+        'links': [{'router-1': 'alice', 'router-2': 'bob', 'length': 1000}]})
+    assert network.index().positions.scale < 1.0
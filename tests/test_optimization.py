@@ -0,0 +1,93 @@
+"""Unit tests for module optimization."""
+
+import pytest
+
+from demand import Demand
+from fidelity import FidelityModel
+from helpers import route_names
+from link import Link
+from network import Network
+from optimization import optimize_placement
+from path import Path
+from placement import place_demand
+from router import Router
+
+def _make_triangle():
+    # The route of the first path over bob blocks the second path, unless the first path takes the
+    # longer direct link.
+    network = Network()
+    alice, bob, carol = [Router(network, name) for name in ["alice", "bob", "carol"]]
+    for router_1, router_2, length in [(alice, bob, 100), (bob, carol, 100), (alice, carol, 250)]:
+        Link(router_1, router_2, length, 10)
+    return (network, alice, bob, carol)
+
+def test_optimize_unplaced_path():
+    """Test that a path which first-fit placement can not place is placed by ripping up the path
+    which blocks it."""
+    network, alice, bob, carol = _make_triangle()
+    demand = Demand(network)
+    Path(demand, "alice-to-carol", alice, carol, 10, 0.5)
+    Path(demand, "alice-to-bob", alice, bob, 10, 0.5)
+    Path(demand, "carol-to-bob", carol, bob, 20, 0.5)
+    assert not place_demand(network, demand).routes["alice-to-bob"].feasible
+    iterations = []
+    placement = optimize_placement(network, demand, report=iterations.append)
+    routes = placement.routes
+    assert list(routes) == list(demand.paths)
+    assert route_names(routes["alice-to-carol"]) == ["alice", "carol"]
+    assert route_names(routes["alice-to-bob"]) == ["alice", "bob"]
+    assert not routes["carol-to-bob"].feasible
+    assert list(placement.residual_capacities) == [0, 10, 0]
+    assert [(iteration.nr_unplaced, iteration.cost) for iteration in iterations] == \
+           [(2, 2000), (1, 3500), (1, 3500), (1, 3500), (1, 3500)]
+    assert iterations[1].improved
+    assert iterations[1].summary().endswith("1 paths not placed, cost 3500, improved")
+
+def _make_detour_network(bob_to_carol_fidelity=0.5):
+    # The route of the first path over bob forces the second path to take the detour over david,
+    # unless the first path takes the longer direct link.
+    network, alice, bob, carol = _make_triangle()
+    david = Router(network, "david")
+    Link(bob, david, 100, 10)
+    Link(david, carol, 150, 10)
+    demand = Demand(network)
+    Path(demand, "alice-to-carol", alice, carol, 10, 0.5)
+    Path(demand, "bob-to-carol", bob, carol, 10, bob_to_carol_fidelity)
+    return (network, demand)
+
+def test_optimize_detour():
+    """Test that the resource consumption of a path with a detour is reduced."""
+    network, demand = _make_detour_network()
+    assert route_names(place_demand(network, demand).routes["bob-to-carol"]) == \
+           ["bob", "david", "carol"]
+    routes = optimize_placement(network, demand).routes
+    assert route_names(routes["alice-to-carol"]) == ["alice", "carol"]
+    assert route_names(routes["bob-to-carol"]) == ["bob", "carol"]
+
+def test_optimize_fidelity():
+    """Test that paths are only placed on routes which meet their fidelity, so that a path which
+    can not take the detour is placed by ripping up the path which blocks it."""
+    network, demand = _make_detour_network(bob_to_carol_fidelity=0.85)
+    link_fidelities = FidelityModel(hop_fidelity=0.9).link_fidelities(network)
+    assert not place_demand(network, demand, link_fidelities=link_fidelities).routes[
+        "bob-to-carol"].feasible
+    routes = optimize_placement(network, demand, link_fidelities=link_fidelities).routes
+    assert route_names(routes["alice-to-carol"]) == ["alice", "carol"]
+    assert route_names(routes["bob-to-carol"]) == ["bob", "carol"]
+    assert routes["bob-to-carol"].fidelity == pytest.approx(0.9)
+
+def test_optimize_budget():
+    """Test that the initial placement is the first-fit placement, and that the optimizer stops
+    when the time budget or the maximum number of iterations is exhausted."""
+    network, demand = _make_detour_network()
+    first_fit_lengths = [route.length for route in place_demand(network, demand).routes.values()]
+    for arguments in [{'time_budget': 0.0}, {'max_iterations': 0}]:
+        iterations = []
+        placement = optimize_placement(network, demand, report=iterations.append, **arguments)
+        assert [route.length for route in placement.routes.values()] == first_fit_lengths
+        assert len(iterations) == 1
+        assert iterations[0].iteration == 0
+        assert iterations[0].cost == 4500
+    iterations = []
+    optimize_placement(network, demand, max_iterations=1, report=iterations.append)
+    assert [iteration.cost for iteration in iterations] == [4500, 3500]
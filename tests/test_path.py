@@ -1,5 +1,7 @@
 """Unit tests for module path."""
 
+import pytest
+
 from demand import Demand
 from network import Network
 from path import Path
@@ -17,3 +19,43 @@ def test_create_path():
                  end_point_2=bob,
                  bandwidth=10,
                  fidelity=0.95)
+
+def test_remove_path():
+    """Test removal of a path from a demand."""
+    network = Network()
+    demand = Demand(network)
+    alice = Router(network, "alice")
+    path = Path(demand, "alice-to-alice", alice, alice, 10, 0.95)
+    demand.remove_path(path)
+    assert not demand.paths
+
+def test_path_is_compact():
+    """Test that paths have no instance dictionary."""
+    network = Network()
+    demand = Demand(network)
+    alice = Router(network, "alice")
+    path = Path(demand, "alice-to-alice", alice, alice, 10, 0.95)
+    assert not hasattr(path, '__dict__')
+
+def test_add_paths_bulk():
+    """Test adding paths to a demand in bulk."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    demand = Demand(network)
+    Path(demand, "alice-to-bob", alice, bob, 10, 0.95)
+    paths = demand.add_paths_bulk(["bob-to-alice", "bob-to-bob"], [1, 1], [0, 1], [20, 30],
+                                  [0.9, 0.8])
+    assert list(demand.paths) == ["alice-to-bob", "bob-to-alice", "bob-to-bob"]
+    assert demand.paths["bob-to-alice"] is paths[0]
+    assert (paths[0].end_point_1, paths[0].end_point_2) == (bob, alice)
+    assert (paths[1].bandwidth, paths[1].fidelity) == (30, 0.8)
+    for columns in [(["x", "x"], [0, 0], [1, 1], [10, 10], [0.9, 0.9]),
+                    (["alice-to-bob"], [0], [1], [10], [0.9]),
+                    (["x"], [0], [2], [10], [0.9]),
+                    (["x"], [0], [1], [0], [0.9]),
+                    (["x"], [0], [1], [10], [0.0]),
+                    (["x"], [0], [1], [10], [])]:
+        with pytest.raises(AssertionError):
+            demand.add_paths_bulk(*columns)
+    assert len(demand.paths) == 3
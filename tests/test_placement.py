@@ -0,0 +1,87 @@
+"""Unit tests for module placement."""
+
+import pytest
+
+import demand_yaml
+import network_yaml
+from demand import Demand
+from fidelity import FidelityModel
+from helpers import route_names
+from link import Link
+from network import Network
+from path import Path
+from placement import capacitated_shortest_path, place_demand
+from router import Router
+
+def test_place_demand():
+    """Test that a path which does not fit on its shortest route is placed on another route."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    placement = place_demand(network, demand)
+    routes = placement.routes
+    assert list(routes) == list(demand.paths)
+    assert route_names(routes["alice-to-bob"]) == ["alice", "bob"]
+    assert route_names(routes["bob-to-alice"]) == ["bob", "carol", "alice"]
+    assert routes["bob-to-alice"].length == 200
+    alice_bob_link = network.routers["alice"].links[0]
+    assert placement.residual_capacity(network, alice_bob_link) == 50
+    assert placement.residual_capacity(network, network.links[1]) == float('inf')
+
+def test_place_demand_insufficient_capacity():
+    """Test that a path is not placed if there is no route with sufficient capacity."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    carol = Router(network, "carol")
+    Link(alice, bob, 100, 10)
+    demand = Demand(network)
+    Path(demand, "first", alice, bob, 6, 0.9)
+    Path(demand, "second", alice, bob, 6, 0.9)
+    Path(demand, "third", alice, bob, 4, 0.9)
+    Path(demand, "unreachable", alice, carol, 1, 0.9)
+    placement = place_demand(network, demand)
+    assert placement.routes["first"].feasible
+    assert not placement.routes["second"].feasible
+    assert placement.routes["third"].feasible
+    assert not placement.routes["unreachable"].feasible
+    assert list(placement.residual_capacities) == [0]
+
+def _make_fidelity_network():
+    # The direct link has the highest fidelity (one hop) but the lowest capacity.
+    network = Network()
+    alice, bob, carol = [Router(network, name) for name in ["alice", "bob", "carol"]]
+    Link(alice, carol, 100, 100)
+    Link(carol, bob, 100, 100)
+    Link(alice, bob, 300, 10)
+    demand = Demand(network)
+    Path(demand, "low", alice, bob, 10, 0.8)
+    Path(demand, "high-1", alice, bob, 10, 0.85)
+    Path(demand, "high-2", alice, bob, 10, 0.85)
+    return (network, demand, FidelityModel(hop_fidelity=0.9).link_fidelities(network))
+
+def test_place_demand_fidelity():
+    """Test that paths are only placed on routes which meet their fidelity."""
+    network, demand, link_fidelities = _make_fidelity_network()
+    placement = place_demand(network, demand, link_fidelities=link_fidelities)
+    routes = placement.routes
+    assert route_names(routes["low"]) == ["alice", "carol", "bob"]
+    assert routes["low"].fidelity == pytest.approx(0.81)
+    assert route_names(routes["high-1"]) == ["alice", "bob"]
+    assert routes["high-1"].fidelity == pytest.approx(0.9)
+    assert not routes["high-2"].feasible
+    assert list(placement.residual_capacities) == [90, 90, 0]
+    assert place_demand(network, demand).routes["high-2"].feasible
+
+def test_capacitated_shortest_path():
+    """Test the capacity-constrained shortest path search."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    carol = Router(network, "carol")
+    Link(alice, bob, 100, 10)
+    Link(alice, carol, 100, 20)
+    Link(carol, bob, 100, 20)
+    index = network.index()
+    assert capacitated_shortest_path(index, [10, 20, 20], 10, 0, 1) == (100, [0, 1], [0])
+    assert capacitated_shortest_path(index, [10, 20, 20], 15, 0, 1) == (200, [0, 2, 1], [1, 2])
+    assert capacitated_shortest_path(index, [10, 20, 20], 25, 0, 1) is None
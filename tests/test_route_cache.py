@@ -0,0 +1,111 @@
+"""Unit tests for module route_cache."""
+
+import pytest
+
+import demand_yaml
+import network_yaml
+from demand import Demand
+from link import Link
+from path import Path
+from route import Route
+from route_cache import RouteCache
+from route_computation import compute_routes, iter_routes
+from router import Router
+
+def test_cache_key_canonical():
+    """Test that paths in opposite directions have the same cache key."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    assert RouteCache.key(demand.paths["alice-to-bob"]) == ("alice", "bob", 100, 0.95)
+    assert RouteCache.key(demand.paths["bob-to-alice"]) == ("alice", "bob", 90, 0.80)
+
+def test_compute_routes_with_cache():
+    """Test that repeated and reversed paths are served from the cache."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = Demand(network)
+    alice = network.routers["alice"]
+    erin = network.routers["erin"]
+    Path(demand, "forward-1", alice, erin, 10, 0.9)
+    Path(demand, "forward-2", alice, erin, 10, 0.9)
+    Path(demand, "reverse", erin, alice, 10, 0.9)
+    cache = RouteCache(network)
+    routes = compute_routes(network, demand, cache=cache)
+    assert cache.misses == 3
+    assert cache.hits == 0
+    assert len(cache) == 1
+    assert routes["forward-1"].routers == routes["forward-2"].routers
+    assert routes["reverse"].routers == routes["forward-1"].routers[::-1]
+    routes_again = compute_routes(network, demand, cache=cache)
+    assert cache.hits == 3
+    assert routes_again["forward-1"].routers == routes["forward-1"].routers
+    assert routes_again["reverse"].routers == routes["reverse"].routers
+    assert routes_again["reverse"].path is demand.paths["reverse"]
+
+def test_iter_routes_with_cache_in_demand_order():
+    """Test that routes are generated in the order of the demand when only some of the paths are
+    served from the cache."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = Demand(network)
+    alice = network.routers["alice"]
+    bob = network.routers["bob"]
+    erin = network.routers["erin"]
+    Path(demand, "alice-to-erin", alice, erin, 10, 0.9)
+    cache = RouteCache(network)
+    compute_routes(network, demand, cache=cache)
+    demand = Demand(network)
+    Path(demand, "alice-to-bob-1", alice, bob, 10, 0.9)
+    Path(demand, "alice-to-erin", alice, erin, 10, 0.9)
+    Path(demand, "alice-to-bob-2", alice, bob, 10, 0.9)
+    Path(demand, "erin-to-alice", erin, alice, 10, 0.9)
+    routes = list(iter_routes(network, demand, cache=cache))
+    assert [route.path.name for route in routes] == list(demand.paths)
+    assert cache.hits == 2
+
+def test_cache_invalidated_on_topology_change():
+    """Test that the cache is invalidated when the topology of the network changes."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = Demand(network)
+    alice = network.routers["alice"]
+    erin = network.routers["erin"]
+    Path(demand, "alice-to-erin", alice, erin, 10, 0.9)
+    cache = RouteCache(network)
+    routes = compute_routes(network, demand, cache=cache)
+    assert routes["alice-to-erin"].length == 200
+    assert len(cache) == 1
+    Link(alice, erin, 150)
+    assert len(cache) == 0
+    routes = compute_routes(network, demand, cache=cache)
+    assert routes["alice-to-erin"].length == 150
+    assert cache.hits == 0
+    assert cache.misses == 2
+    _frank = Router(network, "frank")
+    assert cache.lookup(demand.paths["alice-to-erin"]) is None
+
+def test_cache_eviction():
+    """Test least-recently-used eviction."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = Demand(network)
+    routers = network.routers
+    path_1 = Path(demand, "path-1", routers["alice"], routers["bob"], 10, 0.9)
+    path_2 = Path(demand, "path-2", routers["alice"], routers["carol"], 10, 0.9)
+    path_3 = Path(demand, "path-3", routers["alice"], routers["david"], 10, 0.9)
+    cache = RouteCache(network, max_size=2)
+    cache.store(Route(path_1))
+    cache.store(Route(path_2))
+    assert cache.lookup(path_1) is not None
+    cache.store(Route(path_3))
+    assert len(cache) == 2
+    assert cache.lookup(path_2) is None
+    assert cache.lookup(path_1) is not None
+    assert not cache.lookup(path_3).feasible
+    with pytest.raises(AssertionError):
+        _cache = RouteCache(network, max_size=0)
+
+def test_compute_routes_with_small_cache():
+    """Test that duplicate paths are routed correctly if the cache is smaller than the demand."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    cache = RouteCache(network, max_size=1)
+    routes = compute_routes(network, demand, cache=cache)
+    assert routes["alice-to-erin-2"].routers == routes["alice-to-erin-1"].routers
+    assert routes["bob-to-alice"].routers[0].name == "bob"
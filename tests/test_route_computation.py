@@ -0,0 +1,62 @@
+"""Unit tests for module route_computation."""
+
+import demand_yaml
+import network_yaml
+from demand import Demand
+from link import Link
+from network import Network
+from path import Path
+from router import Router
+from route_computation import compute_routes
+
+def test_compute_routes():
+    """Test computing the routes for a valid demand file."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    routes = compute_routes(network, demand)
+    assert list(routes) == list(demand.paths)
+    route = routes["alice-to-bob"]
+    assert route.feasible
+    assert route.length == 100
+    assert [router.name for router in route.routers] == ["alice", "bob"]
+    assert route.links == [network.routers["alice"].links[0]]
+    route = routes["bob-to-alice"]
+    assert [router.name for router in route.routers] == ["bob", "alice"]
+    for path_name in ["alice-to-erin-1", "alice-to-erin-2"]:
+        route = routes[path_name]
+        assert route.length == 200
+        assert route.routers[0].name == "alice"
+        assert route.routers[-1].name == "erin"
+        assert len(route.links) == 2
+
+def test_compute_routes_unreachable():
+    """Test computing the route for a path whose end-points are not connected."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    carol = Router(network, "carol")
+    Link(alice, bob, 100)
+    demand = Demand(network)
+    Path(demand, "alice-to-carol", alice, carol, 10, 0.9)
+    Path(demand, "bob-to-alice", bob, alice, 10, 0.9)
+    routes = compute_routes(network, demand)
+    assert not routes["alice-to-carol"].feasible
+    assert routes["alice-to-carol"].routers is None
+    assert routes["bob-to-alice"].feasible
+    assert routes["bob-to-alice"].routers == [bob, alice]
+
+def test_compute_routes_parallel():
+    """Test that computing routes with multiple worker processes gives the same routes."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = Demand(network)
+    routers = list(network.routers.values())
+    for router_1 in routers:
+        for router_2 in routers:
+            Path(demand, f"{router_1.name}-to-{router_2.name}", router_1, router_2, 10, 0.9)
+    serial_routes = compute_routes(network, demand)
+    parallel_routes = compute_routes(network, demand, jobs=3)
+    assert list(parallel_routes) == list(serial_routes)
+    for path_name, route in serial_routes.items():
+        assert parallel_routes[path_name].routers == route.routers
+        assert parallel_routes[path_name].links == route.links
+        assert parallel_routes[path_name].length == route.length
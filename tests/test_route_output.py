@@ -0,0 +1,114 @@
+"""Unit tests for modules route_output and route_yaml (formatting of routes)."""
+
+import gzip
+import io
+import json
+
+import pytest
+import yaml
+
+import demand_yaml
+import network_yaml
+import route_output
+import route_yaml
+import topology_generator
+from demand import Demand
+from network import Network
+from path import Path
+from route import Route
+from route_computation import compute_routes, iter_routes
+from route_cache import RouteCache
+from router import Router
+
+def valid_routes():
+    """Compute the routes for the valid demand of the tests."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    return list(compute_routes(network, demand).values())
+
+def emitter_yaml(routes):
+    """Format routes using the YAML emitter."""
+    return "routes:\n" + "".join(
+        yaml.safe_dump([route_yaml.route_to_yaml_model(route)], default_flow_style=False,
+                       sort_keys=False) for route in routes)
+
+def test_yaml_same_as_emitter():
+    """Test that the route YAML document is the same as the one produced by the YAML emitter."""
+    topology = topology_generator.generate_topology(topology_generator.WAXMAN, 50)
+    network = topology.network()
+    demand = topology_generator.random_demand(topology, 50, seed=2).demand(network)
+    routes = list(compute_routes(network, demand).values())
+    routes.append(Route(routes[0].path))
+    routes.append(Route(routes[1].path, routes[1].routers, routes[1].links, routes[1].length,
+                        0.75))
+    routes.append(Route(routes[2].path, routes[2].routers, routes[2].links, routes[2].length,
+                        1e-05))
+    stream = io.StringIO()
+    assert route_yaml.write_routes_to_yaml_stream(stream, routes) == len(routes)
+    assert stream.getvalue() == emitter_yaml(routes)
+
+@pytest.mark.parametrize("name", ["yes", "No", "null", "~", "1", "1e3", "0x1f", "1_000", "12:30",
+                                  "a: b", "#a", "-a", "a b", "", "'a'", "\"a\"", "über",
+                                  "tab\there", ".inf", "router-1.eu/west"])
+def test_yaml_names(name):
+    """Test that names which are special in YAML are read back as the same string."""
+    network = Network()
+    router_1 = Router(network, name)
+    router_2 = Router(network, "other")
+    demand = Demand(network)
+    path = Path(demand, name, router_1, router_2, 1, 0.5)
+    route = Route(path, [router_1, router_2], [], 1, None)
+    stream = io.StringIO()
+    route_yaml.write_routes_to_yaml_stream(stream, [route])
+    route_model = yaml.safe_load(stream.getvalue())['routes'][0]
+    assert route_model == route_yaml.route_to_yaml_model(route)
+
+def test_route_format_of_filename():
+    """Test determining the route format from the filename."""
+    assert route_output.route_format_of_filename("routes.yaml") == route_output.YAML
+    assert route_output.route_format_of_filename("routes.yaml.gz") == route_output.YAML
+    assert route_output.route_format_of_filename("routes.jsonl") == route_output.JSON_LINES
+    assert route_output.route_format_of_filename("routes.ndjson.gz") == route_output.JSON_LINES
+
+def test_write_json_lines(tmpdir):
+    """Test writing routes to a JSON Lines file."""
+    routes = valid_routes()
+    route_file = str(tmpdir.join("routes.jsonl"))
+    assert route_output.write_routes_to_file(route_file, routes) == 4
+    with open(route_file) as file:
+        route_models = [json.loads(line) for line in file]
+    assert route_models == [route_yaml.route_to_yaml_model(route) for route in routes]
+
+def test_write_gzip(tmpdir):
+    """Test writing routes to compressed files."""
+    routes = valid_routes()
+    yaml_file = str(tmpdir.join("routes.yaml.gz"))
+    assert route_output.write_routes_to_file(yaml_file, routes) == 4
+    with gzip.open(yaml_file, 'rt') as file:
+        assert yaml.safe_load(file)['routes'][2]['routers'] == ['alice', 'carol', 'erin']
+    json_lines_file = str(tmpdir.join("routes.gz"))
+    route_output.write_routes_to_file(json_lines_file, routes, route_output.JSON_LINES)
+    with gzip.open(json_lines_file, 'rt') as file:
+        assert len(file.readlines()) == 4
+
+def test_write_routes_to_bad_file():
+    """Test writing routes to a file that cannot be opened."""
+    with pytest.raises(route_output.WriteRouteFileError):
+        route_output.write_routes_to_file("tests/non-existent-directory/routes.jsonl", [])
+
+def test_iter_routes_is_lazy():
+    """Test that routes are generated as they are computed, and that the generated routes are the
+    same as the computed routes, also when paths share cache entries."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    cache = RouteCache(network)
+    routes = iter_routes(network, demand, cache=cache)
+    first_route = next(routes)
+    assert cache.misses == 4
+    assert len(cache) == 1
+    routes = [first_route] + list(routes)
+    assert len(cache) == 3
+    expected_routes = compute_routes(network, demand)
+    assert sorted(route.path.name for route in routes) == sorted(expected_routes)
+    for route in routes:
+        assert route.routers == expected_routes[route.path.name].routers
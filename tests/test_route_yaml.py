@@ -0,0 +1,51 @@
+"""Unit tests for module route_yaml."""
+
+import io
+import pytest
+import yaml
+
+import demand_yaml
+import network_yaml
+import route_yaml
+from demand import Demand
+from route_computation import compute_routes
+
+def test_write_routes_to_stream():
+    """Test writing the computed routes to a stream."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    demand = demand_yaml.read_demand_from_yaml_file("tests/demand-valid.yaml", network)
+    routes = compute_routes(network, demand)
+    stream = io.StringIO()
+    route_yaml.write_routes_to_yaml_stream(stream, routes.values())
+    route_models = yaml.safe_load(stream.getvalue())['routes']
+    assert [route_model['path'] for route_model in route_models] == list(demand.paths)
+    assert route_models[0] == {'path': 'alice-to-bob',
+                               'end-point-1': 'alice',
+                               'end-point-2': 'bob',
+                               'feasible': True,
+                               'length': 100,
+                               'routers': ['alice', 'bob']}
+
+def test_write_no_routes_to_stream():
+    """Test that the routes for an empty demand are written as an empty list."""
+    network = network_yaml.read_network_from_yaml_file("tests/network-valid.yaml")
+    routes = compute_routes(network, Demand(network))
+    stream = io.StringIO()
+    assert route_yaml.write_routes_to_yaml_stream(stream, routes.values()) == 0
+    assert yaml.safe_load(stream.getvalue()) == {'routes': []}
+
+@pytest.mark.parametrize("string", ["alice", "yes", "1e3", "two words", "quote\"", "tab\t",
+                                    "caf\u00e9", "\U0001F600", "\x7f", "\u2028", "\ud83d",
+                                    "long " * 30])
+def test_yaml_scalars_round_trip(string):
+    """Test that strings which need quotes, including strings outside of ASCII, are read back as
+    the same string."""
+    scalars = route_yaml.YamlScalars()
+    text = scalars[string]
+    assert "\n" not in text
+    assert yaml.safe_load(f"name: {text}\n") == {'name': string}
+
+def test_write_routes_to_bad_file():
+    """Test writing the computed routes to a file that cannot be opened."""
+    with pytest.raises(route_yaml.WriteRouteYamlError):
+        route_yaml.write_routes_to_yaml_file("tests/non-existent-directory/routes.yaml", [])
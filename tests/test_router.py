@@ -1,5 +1,8 @@
 """Unit tests for module router."""
 
+import sys
+
+from link import Link
 from network import Network
 from router import Router
 
@@ -7,3 +10,26 @@ def test_create_router():
     """Test creation of a router."""
     network = Network()
     _router = Router(network, "router-name")
+
+def test_router_is_compact():
+    """Test that routers have no instance dictionary and have interned names."""
+    network = Network()
+    router = Router(network, "".join(["router", "-name"]))
+    assert not hasattr(router, '__dict__')
+    assert router.name is sys.intern("router-name")
+    assert not router.links
+    assert router.next_available_port == 0
+
+def test_ports_are_not_reused():
+    """Test that repeatedly adding and removing links does not grow the links of a router, and
+    that the ports of the remaining links do not change."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    alice_bob = Link(alice, bob, 100)
+    for _ in range(100):
+        network.remove_link(Link(alice, bob, 10))
+    assert alice.links == {0: alice_bob}
+    assert alice.next_available_port == 101
+    link = Link(alice, bob, 10)
+    assert list(alice.link_items()) == [(0, alice_bob), (101, link)]
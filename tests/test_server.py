@@ -0,0 +1,190 @@
+"""Unit tests for module server."""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+import network_yaml
+import server
+import topology_generator
+from qpce.__main__ import main
+
+PATH_MODELS = [
+    {'name': 'alice-to-erin', 'end-point-1': 'alice', 'end-point-2': 'erin', 'bandwidth': 10,
+     'fidelity': 0.9},
+    {'name': 'bob-to-alice', 'end-point-1': 'bob', 'end-point-2': 'alice', 'bandwidth': 10,
+     'fidelity': 0.9},
+]
+
+def run_with_server(client, network=None, socket_path=None, **server_arguments):
+    """Start a path computation server, run a client coroutine against it, and stop the server.
+
+    Args:
+        client: A function which takes the server and its address, and returns a coroutine.
+        network (Network): The network, or None to use the valid network of the tests.
+        socket_path (str): The path of a Unix domain socket, or None to use a TCP socket.
+    Returns:
+        The result of the client coroutine.
+    """
+    if network is None:
+        network = network_yaml.read_network_from_yaml_file('tests/network-valid.yaml')
+    path_server = server.PathServer(network, **server_arguments)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        address = loop.run_until_complete(path_server.start('127.0.0.1', 0, socket_path))
+        result = loop.run_until_complete(client(path_server, address))
+        path_server.stop()
+        loop.run_until_complete(path_server.wait_stopped())
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+    return result
+
+async def open_connection(address):
+    """Open a connection to a path computation server."""
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(address[0], address[1])
+
+async def exchange(address, requests):
+    """Send requests over one connection without waiting for the responses, then read the
+    responses.
+
+    Returns:
+        The responses indexed by request id.
+    """
+    reader, writer = await open_connection(address)
+    writer.write(b''.join(json.dumps(request).encode('utf-8') + b'\n' for request in requests))
+    await writer.drain()
+    responses = {}
+    for _ in requests:
+        response = json.loads((await reader.readline()).decode('utf-8'))
+        responses[response.get('id')] = response
+    writer.close()
+    return responses
+
+def test_route_request():
+    """Test computing routes over a TCP connection."""
+    async def client(_path_server, address):
+        return await exchange(address, [{'id': 1, 'method': 'route', 'paths': PATH_MODELS}])
+    responses = run_with_server(client)
+    routes = responses[1]['routes']
+    assert [route['path'] for route in routes] == ['alice-to-erin', 'bob-to-alice']
+    assert routes[0]['routers'] == ['alice', 'carol', 'erin']
+    assert routes[1]['routers'] == ['bob', 'alice']
+
+def test_route_request_over_unix_socket(tmpdir):
+    """Test computing routes over a Unix domain socket."""
+    if not hasattr(socket, 'AF_UNIX'):
+        pytest.skip("Unix domain sockets are not supported")
+    async def client(_path_server, address):
+        return await exchange(address, [{'id': 'a', 'method': 'route', 'paths': PATH_MODELS}])
+    responses = run_with_server(client, socket_path=str(tmpdir.join("qpce.sock")))
+    assert len(responses['a']['routes']) == 2
+
+def test_concurrent_requests_are_batched():
+    """Test that concurrent route requests are computed in fewer batches, and that paths with the
+    same name in different requests are kept apart."""
+    async def client(path_server, address):
+        requests = [{'id': request_id, 'method': 'route', 'paths': PATH_MODELS[request_id % 2:]}
+                    for request_id in range(10)]
+        responses = await asyncio.gather(exchange(address, requests[:5]),
+                                         exchange(address, requests[5:]))
+        return (responses, path_server.status())
+    (responses_1, responses_2), status = run_with_server(client)
+    responses_1.update(responses_2)
+    for request_id in range(10):
+        routes = responses_1[request_id]['routes']
+        assert [route['path'] for route in routes] == \
+               [path_model['name'] for path_model in PATH_MODELS[request_id % 2:]]
+    assert status['requests'] == 10
+    assert status['batches'] < 10
+
+def test_invalid_requests():
+    """Test the responses to invalid requests."""
+    async def client(_path_server, address):
+        reader, writer = await open_connection(address)
+        writer.write(b'not json\n')
+        writer.write(b'[1, 2]\n')
+        await writer.drain()
+        responses = [json.loads((await reader.readline()).decode('utf-8')) for _ in range(2)]
+        writer.close()
+        bad_router = dict(PATH_MODELS[0], **{'end-point-2': 'zoe'})
+        bad_fidelity = dict(PATH_MODELS[0], fidelity=0.0)
+        responses.extend((await exchange(address, [
+            {'id': 1, 'method': 'compute'},
+            {'id': 2, 'method': 'route', 'paths': [{'name': 'incomplete'}]},
+            {'id': 3, 'method': 'route', 'paths': [PATH_MODELS[0], bad_router]},
+            {'id': 4, 'method': 'route', 'paths': [bad_fidelity]},
+            {'id': 5, 'method': 'route', 'paths': PATH_MODELS},
+            {'id': 6, 'method': 'load-network', 'network-file': 'tests/does-not-exist.yaml'},
+        ])).values())
+        return responses
+    responses = run_with_server(client)
+    assert "Invalid request" in responses[0]['error']
+    assert "must be a JSON object" in responses[1]['error']
+    responses = {response['id']: response for response in responses[2:]}
+    assert "Unknown method compute" in responses[1]['error']
+    assert "Could not validate demand" in responses[2]['error']
+    assert "end-point 2 zoe must be an existing router" in responses[3]['error']
+    assert "fidelity must be > 0.0" in responses[4]['error']
+    assert len(responses[5]['routes']) == 2
+    assert "Could not open network file" in responses[6]['error']
+
+def test_load_network(tmpdir):
+    """Test replacing the network of a running server."""
+    network_file = str(tmpdir.join("ring.yaml"))
+    topology_generator.generate_topology(topology_generator.RING, 8).write_yaml_file(network_file)
+    ring_path = {'name': 'ring', 'end-point-1': 'router-0', 'end-point-2': 'router-3',
+                 'bandwidth': 1, 'fidelity': 0.5}
+    async def client(_path_server, address):
+        before = await exchange(address, [{'id': 1, 'method': 'route', 'paths': PATH_MODELS},
+                                          {'id': 2, 'method': 'route', 'paths': [ring_path]}])
+        after = await exchange(address, [{'id': 3, 'method': 'load-network',
+                                          'network-file': network_file}])
+        after.update(await exchange(address, [{'id': 4, 'method': 'route', 'paths': [ring_path]}]))
+        after.update(await exchange(address, [{'id': 5, 'method': 'status'}]))
+        return (before, after)
+    before, after = run_with_server(client)
+    assert len(before[1]['routes']) == 2
+    assert "router-0 must be an existing router" in before[2]['error']
+    assert after[3] == {'id': 3, 'routers': 8, 'links': 8}
+    assert after[4]['routes'][0]['routers'] == ['router-0', 'router-1', 'router-2', 'router-3']
+    assert after[5]['routers'] == 8
+    assert after[5]['cache-entries'] == 1
+
+def test_route_cache():
+    """Test that repeated requests are answered from the route cache."""
+    async def client(path_server, address):
+        await exchange(address, [{'id': 1, 'method': 'route', 'paths': PATH_MODELS}])
+        await exchange(address, [{'id': 2, 'method': 'route', 'paths': PATH_MODELS}])
+        return path_server.status()
+    status = run_with_server(client)
+    assert status['cache-misses'] == 2
+    assert status['cache-hits'] == 2
+
+def test_main_serve(tmpdir):
+    """Test running the server from the command line and stopping it with a shutdown request."""
+    if not hasattr(socket, 'AF_UNIX'):
+        pytest.skip("Unix domain sockets are not supported")
+    socket_path = str(tmpdir.join("qpce.sock"))
+    statuses = []
+    thread = threading.Thread(target=lambda: statuses.append(
+        main(['serve', 'tests/network-valid.yaml', '--socket', socket_path])))
+    thread.start()
+    deadline = time.monotonic() + 10.0
+    while not os.path.exists(socket_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+        client_socket.connect(socket_path)
+        client_socket.sendall(b'{"id": 1, "method": "shutdown"}\n')
+        response = json.loads(client_socket.makefile('rb').readline().decode('utf-8'))
+    thread.join(10.0)
+    assert response == {'id': 1, 'shutdown': True}
+    assert statuses == [0]
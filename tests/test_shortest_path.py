@@ -0,0 +1,143 @@
+"""Unit tests for module shortest_path."""
+
+import math
+import random
+
+import coordinates
+import instrumentation
+from link import Link
+from network import Network
+from router import Router
+from shortest_path import ShortestPathTree
+from shortest_path import astar_shortest_path, bidirectional_shortest_path
+
+def test_shortest_path_tree():
+    """Test computing a shortest path tree which prefers more hops with a shorter length."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    carol = Router(network, "carol")
+    _dave = Router(network, "dave")
+    Link(alice, bob, 500)
+    Link(alice, carol, 100)
+    Link(carol, bob, 100)
+    index = network.index()
+    tree = ShortestPathTree(index, index.router_ids["alice"])
+    assert tree.distances == [0, 200, 100, float('inf')]
+    assert tree.path_to(1) == ([0, 2, 1], [1, 2])
+    assert tree.path_to(0) == ([0], [])
+    assert not tree.reachable(3)
+    assert tree.path_to(3) is None
+
+def path_length(index, router_ids, link_ids):
+    """Get the length of a path, checking that its links connect its routers."""
+    length = 0
+    for router_id, neighbor_id, link_id in zip(router_ids, router_ids[1:], link_ids):
+        length += [link_length for neighbor, other_link_id, link_length
+                   in index.adjacencies(router_id)
+                   if neighbor == neighbor_id and other_link_id == link_id][0]
+    return length
+
+def test_point_to_point_searches():
+    """Test that bidirectional searches find shortest paths, on random networks with parallel
+    links."""
+    generator = random.Random(1)
+    for _ in range(50):
+        network = Network()
+        routers = [Router(network, f"router-{router_id}") for router_id in range(10)]
+        for _ in range(generator.randint(5, 25)):
+            router_1, router_2 = generator.sample(routers, 2)
+            Link(router_1, router_2, generator.randint(1, 5))
+        index = network.index()
+        for source_id in range(10):
+            tree = ShortestPathTree(index, source_id)
+            for target_id in range(10):
+                result = bidirectional_shortest_path(index, source_id, target_id)
+                if not tree.reachable(target_id):
+                    assert result is None
+                    continue
+                length, router_ids, link_ids = result
+                assert length == tree.distances[target_id]
+                assert router_ids[0] == source_id and router_ids[-1] == target_id
+                assert path_length(index, router_ids, link_ids) == length
+
+def test_bidirectional_settles_fewer_routers():
+    """Test that a bidirectional search settles fewer routers than a unidirectional search on a
+    large grid. A unidirectional search settles at least all routers which are closer to the source
+    than the target is."""
+    network = Network()
+    size = 80
+    routers = [[Router(network, f"router-{row}-{column}") for column in range(size)]
+               for row in range(size)]
+    for row in range(size):
+        for column in range(size):
+            if column + 1 < size:
+                Link(routers[row][column], routers[row][column + 1], 10)
+            if row + 1 < size:
+                Link(routers[row][column], routers[row + 1][column], 10)
+    index = network.index()
+    source_id = index.router_ids["router-30-30"]
+    tree = ShortestPathTree(index, source_id)
+    unidirectional_settled = sum(1 for distance in tree.distances if distance < 380)
+    metrics = instrumentation.start_metrics()
+    try:
+        assert bidirectional_shortest_path(index, source_id,
+                                           index.router_ids["router-49-49"])[0] == 380
+    finally:
+        instrumentation.stop_metrics()
+    assert metrics.counters['settled-routers'] < 0.75 * unidirectional_settled
+
+def test_astar_search():
+    """Test that A* searches find shortest paths, on random networks with router coordinates and
+    links which are at least as long as the distance between their routers."""
+    generator = random.Random(2)
+    for _ in range(50):
+        network = Network()
+        network.coordinate_system = coordinates.PLANAR
+        routers = [Router(network, f"router-{router_id}",
+                          (generator.uniform(0, 1000), generator.uniform(0, 1000)))
+                   for router_id in range(10)]
+        for _ in range(generator.randint(5, 25)):
+            router_1, router_2 = generator.sample(routers, 2)
+            distance = coordinates.planar_distance(router_1.coordinates, router_2.coordinates)
+            Link(router_1, router_2, math.ceil(distance) + generator.choice([0, 0, 100]))
+        index = network.index()
+        assert index.positions is not None
+        for source_id in range(10):
+            tree = ShortestPathTree(index, source_id)
+            for target_id in range(10):
+                result = astar_shortest_path(index, source_id, target_id)
+                if not tree.reachable(target_id):
+                    assert result is None
+                    continue
+                length, router_ids, link_ids = result
+                assert length == tree.distances[target_id]
+                assert router_ids[0] == source_id and router_ids[-1] == target_id
+                assert path_length(index, router_ids, link_ids) == length
+
+def test_astar_settles_fewer_routers():
+    """Test that an A* search settles far fewer routers than a bidirectional search on a large grid
+    with router coordinates."""
+    network = Network()
+    network.coordinate_system = coordinates.GEOGRAPHIC
+    size = 40
+    # Routers 0.1 degrees apart near the equator, linked by 12 km fibers.
+    routers = [[Router(network, f"router-{row}-{column}", (0.1 * row, 0.1 * column))
+                for column in range(size)] for row in range(size)]
+    for row in range(size):
+        for column in range(size):
+            if column + 1 < size:
+                Link(routers[row][column], routers[row][column + 1], 12000)
+            if row + 1 < size:
+                Link(routers[row][column], routers[row + 1][column], 12000)
+    index = network.index()
+    settled = []
+    for search in [bidirectional_shortest_path, astar_shortest_path]:
+        metrics = instrumentation.start_metrics()
+        try:
+            assert search(index, index.router_ids["router-5-20"],
+                          index.router_ids["router-34-20"])[0] == 29 * 12000
+        finally:
+            instrumentation.stop_metrics()
+        settled.append(metrics.counters['settled-routers'])
+    assert settled[1] < 0.25 * settled[0]
@@ -0,0 +1,51 @@
+"""Unit tests for module technology."""
+
+import math
+import pytest
+
+from link import Link
+from network import Network
+from router import Router
+from technology import FIBER_LIGHT_SPEED, Technology
+
+def test_link_rate_and_fidelity():
+    """Test computing the elementary Bell pair rate and fidelity of a link."""
+    technology = Technology("test", attempt_rate=1000.0, detection_efficiency=0.5,
+                            fiber_attenuation=0.2, initial_fidelity=0.9, coherence_time=0.01)
+    assert technology.link_rate(0) == pytest.approx(500.0)
+    # 50 km: 10 dB attenuation, and a round trip time of 0.5 ms.
+    assert technology.link_rate(50000) == pytest.approx(0.5 * 0.1 / (0.001 + 0.0005))
+    assert technology.link_fidelity(0) == pytest.approx(0.9)
+    round_trip_time = 2 * 50000 / FIBER_LIGHT_SPEED
+    assert technology.link_fidelity(50000) == pytest.approx(0.9 * math.exp(-round_trip_time / 0.01))
+    assert Technology("ideal").link_fidelity(50000) == 1.0
+
+def test_link_tables():
+    """Test that the rates and fidelities of all links are computed once per distinct length."""
+    network = Network()
+    alice = Router(network, "alice")
+    bob = Router(network, "bob")
+    for length in [100, 200, 100, 100]:
+        Link(alice, bob, length)
+    technology = Technology("test", coherence_time=0.001)
+    rates = technology.link_rates(network)
+    fidelities = technology.link_fidelities(network)
+    assert list(rates) == [pytest.approx(technology.link_rate(length))
+                           for length in [100, 200, 100, 100]]
+    assert list(fidelities) == [pytest.approx(technology.link_fidelity(length))
+                                for length in [100, 200, 100, 100]]
+    assert sorted(technology._link_rates) == [100, 200]   # pylint:disable=protected-access
+    assert sorted(technology._link_fidelities) == [100, 200]   # pylint:disable=protected-access
+
+def test_bad_technology():
+    """Attempt to create technologies with invalid parameters."""
+    with pytest.raises(AssertionError):
+        _technology = Technology("test", attempt_rate=0.0)
+    with pytest.raises(AssertionError):
+        _technology = Technology("test", detection_efficiency=1.5)
+    with pytest.raises(AssertionError):
+        _technology = Technology("test", fiber_attenuation=-0.1)
+    with pytest.raises(AssertionError):
+        _technology = Technology("test", coherence_time=0.0)
+    with pytest.raises(AssertionError):
+        _technology = Technology("test", initial_fidelity=0.0)
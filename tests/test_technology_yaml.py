@@ -0,0 +1,41 @@
+"""Unit tests for module technology_yaml."""
+
+import io
+import pytest
+
+import technology_yaml
+from technology import DEFAULT_ATTEMPT_RATE
+
+def test_valid_technology_file():
+    """Test reading a valid technology YAML file."""
+    technology = technology_yaml.read_technology_from_yaml_file("tests/technology-valid.yaml")
+    assert technology.name == "nv-centers"
+    assert technology.attempt_rate == 200
+    assert technology.detection_efficiency == 0.6
+    assert technology.fiber_attenuation == 0.2
+    assert technology.hop_fidelity == 0.97
+    assert technology.coherence_time == 1.0
+
+def test_non_existent_technology_file():
+    """Test reading a technology YAML file that does not exist."""
+    with pytest.raises(technology_yaml.ReadTechnologyYamlError):
+        _technology = technology_yaml.read_technology_from_yaml_file("tests/non-existent.yaml")
+
+def test_default_parameters():
+    """Test that parameters which are not in the technology YAML document get default values."""
+    technology = technology_yaml.read_technology_from_yaml_stream(io.StringIO("name: ion-traps\n"))
+    assert technology.attempt_rate == DEFAULT_ATTEMPT_RATE
+    assert technology.coherence_time is None
+
+@pytest.mark.parametrize("document", [
+    "name: test\nattempt-rate: 0\n",
+    "name: test\ndetection-efficiency: 1.5\n",
+    "name: test\nnonsense: 1\n",
+    "attempt-rate: 1000\n",
+    "- name: test\n",
+    "name: [test\n",
+])
+def test_bad_technology(document):
+    """Test reading technology YAML documents which are not valid."""
+    with pytest.raises(technology_yaml.ReadTechnologyYamlError):
+        _technology = technology_yaml.read_technology_from_yaml_stream(io.StringIO(document))
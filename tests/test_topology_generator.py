@@ -0,0 +1,82 @@
+"""Unit tests for module topology_generator."""
+
+import io
+
+import pytest
+
+import demand_yaml
+import network_yaml
+import topology_generator
+from route_computation import compute_routes
+
+def test_grid_and_ring_topologies():
+    """Test the structure of grid and ring topologies."""
+    grid = topology_generator.grid_topology(2, 3, link_length=10)
+    assert grid.nr_routers == 6
+    assert grid.nr_links == 7
+    assert set(zip(grid.router_1_ids, grid.router_2_ids)) == \
+           {(0, 1), (1, 2), (3, 4), (4, 5), (0, 3), (1, 4), (2, 5)}
+    assert set(grid.lengths) == {10}
+    ring = topology_generator.ring_topology(4)
+    assert list(zip(ring.router_1_ids, ring.router_2_ids)) == [(0, 1), (1, 2), (2, 3), (3, 0)]
+    with pytest.raises(AssertionError):
+        topology_generator.ring_topology(2)
+
+@pytest.mark.parametrize("kind", topology_generator.TOPOLOGY_KINDS)
+def test_generate_topology(kind):
+    """Test that generated topologies are valid, reproducible, and have the requested size and
+    (for random topologies) roughly the expected number of links per router."""
+    topology = topology_generator.generate_topology(kind, 400, seed=3)
+    assert topology.kind == kind
+    assert topology.nr_routers == 400
+    assert topology.nr_links > 0
+    assert min(topology.lengths) >= 1
+    for router_ids in (topology.router_1_ids, topology.router_2_ids):
+        assert 0 <= min(router_ids) and max(router_ids) < topology.nr_routers
+    if kind in (topology_generator.RANDOM_GEOMETRIC, topology_generator.WAXMAN,
+                topology_generator.SCALE_FREE):
+        assert 4.0 <= 2 * topology.nr_links / topology.nr_routers <= 8.0
+    again = topology_generator.generate_topology(kind, 400, seed=3)
+    assert again.router_2_ids == topology.router_2_ids
+    assert again.lengths == topology.lengths
+    if kind in (topology_generator.RANDOM_GEOMETRIC, topology_generator.WAXMAN):
+        stream = io.StringIO()
+        topology.write_yaml_stream(stream)
+        stream.seek(0)
+        network = network_yaml.read_network_from_yaml_stream(stream)
+        assert network.index().positions is not None
+        assert topology.network().index().positions is not None
+    else:
+        assert topology.coordinates is None
+
+def test_network_and_demand():
+    """Test that the in-memory and YAML forms of a generated network and demand agree."""
+    topology = topology_generator.generate_topology(topology_generator.SCALE_FREE, 50)
+    synthetic_demand = topology_generator.random_demand(topology, 30)
+    assert all(end_point_1 != end_point_2 for end_point_1, end_point_2
+               in zip(synthetic_demand.end_point_1_ids, synthetic_demand.end_point_2_ids))
+    network = topology.network()
+    demand = synthetic_demand.demand(network)
+    network_stream = io.StringIO()
+    topology.write_yaml_stream(network_stream)
+    network_stream.seek(0)
+    yaml_network = network_yaml.read_network_from_yaml_stream(network_stream)
+    demand_stream = io.StringIO()
+    synthetic_demand.write_yaml_stream(demand_stream)
+    demand_stream.seek(0)
+    yaml_demand = demand_yaml.read_demand_from_yaml_stream(demand_stream, yaml_network)
+    assert list(yaml_network.routers) == list(network.routers)
+    assert [link.length for link in yaml_network.links] == [link.length for link in network.links]
+    assert list(yaml_demand.paths) == list(demand.paths)
+    routes = compute_routes(network, demand)
+    yaml_routes = compute_routes(yaml_network, yaml_demand)
+    assert [route.length for route in routes.values()] == \
+           [route.length for route in yaml_routes.values()]
+    assert all(route.feasible for route in routes.values())
+
+def test_full_mesh_demand():
+    """Test a demand with a path between every pair of routers."""
+    topology = topology_generator.ring_topology(5)
+    synthetic_demand = topology_generator.full_mesh_demand(topology)
+    assert synthetic_demand.nr_paths == 10
+    assert len(set(zip(synthetic_demand.end_point_1_ids, synthetic_demand.end_point_2_ids))) == 10
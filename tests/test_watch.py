@@ -0,0 +1,106 @@
+"""Unit tests for module watch."""
+
+import os
+import threading
+import time
+
+import pytest
+
+import network_yaml
+import watch
+
+NETWORK = ("routers:\n"
+           "  - name: alice\n"
+           "  - name: bob\n"
+           "  - name: carol\n"
+           "links:\n"
+           "  - {router-1: alice, router-2: bob, length: 100}\n"
+           "  - {router-1: bob, router-2: carol, length: 100}\n")
+
+DEMAND = ("paths:\n"
+          "  - {name: alice-to-carol, end-point-1: alice, end-point-2: carol, bandwidth: 1, "
+          "fidelity: 0.5}\n"
+          "  - {name: alice-to-bob, end-point-1: alice, end-point-2: bob, bandwidth: 1, "
+          "fidelity: 0.5}\n")
+
+def _write(path, text):
+    # Make sure that the modification time changes, even on file systems with a coarse timestamp
+    # resolution.
+    old_signature = watch.file_signature(str(path))
+    path.write(text)
+    if old_signature is not None and watch.file_signature(str(path))[0] == old_signature[0]:
+        os.utime(str(path), ns=(old_signature[0] + 10 ** 9, old_signature[0] + 10 ** 9))
+
+@pytest.mark.parametrize('use_inotify', [False, True])
+def test_file_watcher(tmpdir, use_inotify):
+    """Test that the file watcher reports changed files, and ignores writes which do not change the
+    contents of a file."""
+    file_1 = tmpdir.join("file-1.yaml")
+    file_2 = tmpdir.join("file-2.yaml")
+    file_1.write("a")
+    file_2.write("b")
+    watcher = watch.FileWatcher([str(file_1), str(file_2)], poll_interval=0.01,
+                                debounce_time=0.01, use_inotify=use_inotify)
+    try:
+        assert watcher.wait_for_change(timeout=0.05) == []
+        _write(file_2, "c")
+        _write(file_1, "d")
+        assert watcher.wait_for_change(timeout=5.0) == [str(file_1), str(file_2)]
+        _write(file_1, "d")
+        assert watcher.wait_for_change(timeout=0.05) == []
+        file_2.remove()
+        assert watcher.wait_for_change(timeout=5.0) == [str(file_2)]
+    finally:
+        watcher.close()
+
+def test_watch(tmpdir):
+    """Test that the routes are written initially and after each change, and that a change which
+    can not be read keeps the current routes."""
+    network_file = tmpdir.join("network.yaml")
+    demand_file = tmpdir.join("demand.yaml")
+    network_file.write(NETWORK)
+    demand_file.write(DEMAND)
+    written_routes = []
+    def write_routes(routes):
+        written_routes.append([(route.path.name, route.length) for route in routes])
+    thread = threading.Thread(target=watch.watch,
+                              args=(str(network_file), str(demand_file), write_routes),
+                              kwargs={'max_updates': 3, 'poll_interval': 0.01,
+                                      'debounce_time': 0.01})
+    thread.start()
+    def wait_for_routes(count):
+        deadline = time.monotonic() + 10.0
+        while len(written_routes) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(written_routes) == count
+    wait_for_routes(1)
+    assert written_routes[0] == [("alice-to-carol", 200), ("alice-to-bob", 100)]
+    _write(network_file, NETWORK + "  - {router-1: alice, router-2: carol, length: 50}\n")
+    wait_for_routes(2)
+    assert written_routes[1] == [("alice-to-carol", 50), ("alice-to-bob", 100)]
+    _write(demand_file, "paths: [")
+    time.sleep(0.1)
+    _write(demand_file, DEMAND.replace("alice-to-bob, end-point-1: alice",
+                                       "carol-to-bob, end-point-1: carol"))
+    thread.join(10.0)
+    assert not thread.is_alive()
+    assert written_routes[2:] == [[("alice-to-carol", 50), ("carol-to-bob", 100)]]
+
+def test_route_watcher_retries_failed_update(tmpdir):
+    """Test that a demand change which is read together with a network which is not valid, is read
+    again by the next update."""
+    network_file = tmpdir.join("network.yaml")
+    demand_file = tmpdir.join("demand.yaml")
+    network_file.write(NETWORK)
+    demand_file.write(DEMAND)
+    route_watcher = watch.RouteWatcher(str(network_file), str(demand_file))
+    demand_file.write(DEMAND[:DEMAND.index("  - {name: alice-to-bob")])
+    network_file.write("routers: [")
+    with pytest.raises(network_yaml.ReadNetworkYamlError):
+        route_watcher.update([str(network_file), str(demand_file)])
+    assert list(route_watcher.routing.demand.paths) == ["alice-to-carol", "alice-to-bob"]
+    network_file.write(NETWORK)
+    route_watcher.update([str(network_file)])
+    assert list(route_watcher.routing.demand.paths) == ["alice-to-carol"]
+    assert [route.path.name for route in route_watcher.routes()] == ["alice-to-carol"]
+    assert not route_watcher.pending_filenames
@@ -0,0 +1,39 @@
+"""Unit tests for module yaml_stream."""
+
+import io
+import pytest
+import yaml
+
+from yaml_stream import SafeLoader, YamlNodeReader
+
+DOCUMENT = ("first: &anchor\n"
+            "  name: alice\n"
+            "  values: [1, 2.5, true, null, 'text']\n"
+            "second: *anchor\n"
+            "third: !!str 12\n")
+
+def _read_document(loader_class, text):
+    loader = loader_class(io.StringIO(text))
+    reader = YamlNodeReader(loader)
+    loader.get_event()
+    loader.get_event()
+    loader.get_event()
+    document = {}
+    try:
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = reader.read()
+            document[key] = reader.read()
+    finally:
+        loader.dispose()
+    return document
+
+def test_read_nodes():
+    """Test that reading a document one node at a time gives the same result as loading it."""
+    expected = yaml.safe_load(DOCUMENT)
+    assert _read_document(yaml.SafeLoader, DOCUMENT) == expected
+    assert _read_document(SafeLoader, DOCUMENT) == expected
+
+def test_undefined_alias():
+    """Test reading a document with an undefined alias."""
+    with pytest.raises(yaml.YAMLError):
+        _read_document(SafeLoader, "first: *undefined\n")